@@ -0,0 +1,81 @@
+# backend/app/account_wipe.py
+"""
+Server-side "clear all data" for a user: pets, notes, history, settings and feedback
+go with one delete_many each, and pet images are removed with Cloudinary's
+batched delete_resources (see cloudinary_config.delete_images). Accounts
+above the WIPE_SYNC_MAX_* limits are wiped by an "account.wipe" job instead
+of inside the request.
+"""
+import os
+
+from . import jobs
+from .cloudinary_config import delete_images
+from .database import db, feedback_collection, history_collection, pet_notes_collection, pets_collection
+from .http_cache import bump_user_version
+from .image_jobs import enqueue_image_delete
+
+# Wipe inline when the account is at most this big; otherwise queue a job
+WIPE_SYNC_MAX_IMAGES = int(os.getenv("WIPE_SYNC_MAX_IMAGES", 100))
+WIPE_SYNC_MAX_DOCS = int(os.getenv("WIPE_SYNC_MAX_DOCS", 1000))
+
+
+async def needs_background(user_id: str) -> bool:
+    pets = await pets_collection.count_documents({"user_id": user_id}, limit=WIPE_SYNC_MAX_IMAGES + 1)
+    if pets > WIPE_SYNC_MAX_IMAGES:
+        return True
+    # Every collection wiped by user_id counts towards the document budget.
+    docs = pets
+    for collection in (history_collection, pet_notes_collection, feedback_collection):
+        remaining = WIPE_SYNC_MAX_DOCS - docs
+        docs += await collection.count_documents({"user_id": user_id}, limit=remaining + 1)
+        if docs > WIPE_SYNC_MAX_DOCS:
+            return True
+    return False
+
+
+async def wipe_user_data(user_id: str) -> dict:
+    """Delete everything stored for `user_id`; returns per-collection counts."""
+    public_ids = [
+        pet["image_public_id"]
+        async for pet in pets_collection.find({"user_id": user_id}, {"image_public_id": 1})
+        if pet.get("image_public_id")
+    ]
+
+    pets = await pets_collection.delete_many({"user_id": user_id})
+    notes = await pet_notes_collection.delete_many({"user_id": user_id})
+    history = await history_collection.delete_many({"user_id": user_id})
+    settings = await db["user_settings"].delete_many({"user_id": user_id})
+    feedback = await feedback_collection.delete_many({"user_id": user_id})
+    # Bumped, not deleted: a reset counter could reissue an ETag a client still holds.
+    await bump_user_version(user_id)
+
+    failed = await delete_images(public_ids) if public_ids else []
+    # Leftovers get the regular per-image delete job, which retries with backoff.
+    for public_id in failed:
+        await enqueue_image_delete(public_id)
+
+    return {
+        "pets": pets.deleted_count,
+        "pet_notes": notes.deleted_count,
+        "history": history.deleted_count,
+        "settings": settings.deleted_count,
+        "feedback": feedback.deleted_count,
+        "images_deleted": len(public_ids) - len(failed),
+        "images_retrying": len(failed),
+    }
+
+
+@jobs.register("account.wipe")
+async def run_account_wipe(job: dict) -> dict:
+    return await wipe_user_data(job["payload"]["user_id"])
+
+
+async def enqueue_account_wipe(user_id: str) -> str:
+    """
+    Queue a wipe keyed by user, like the image jobs, so concurrent DELETEs
+    share one pending/running job. A finished wipe gives its key up first,
+    otherwise it would swallow a later request for newly added data.
+    """
+    key = f"account.wipe:{user_id}"
+    await jobs.release_key(key)
+    return await jobs.enqueue("account.wipe", {"user_id": user_id}, key=key)
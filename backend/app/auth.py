@@ -1,66 +1,169 @@
 import os
+import time
+import asyncio
+import hashlib
 import jwt
-import requests
+import httpx
+from collections import OrderedDict
 from fastapi import HTTPException, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from functools import lru_cache
 
 # Your Clerk instance domain from the publishable key
 CLERK_DOMAIN = "pretty-dragon-25.clerk.accounts.dev"
 CLERK_JWKS_URL = f"https://{CLERK_DOMAIN}/.well-known/jwks.json"
 CLERK_ISSUER = f"https://{CLERK_DOMAIN}"
 
+# JWKS is refreshed in the background; an unknown `kid` triggers an early
+# refetch, but at most once per JWKS_MIN_REFETCH_INTERVAL seconds.
+JWKS_REFRESH_INTERVAL = float(os.getenv("JWKS_REFRESH_INTERVAL", 3600))
+JWKS_MIN_REFETCH_INTERVAL = float(os.getenv("JWKS_MIN_REFETCH_INTERVAL", 30))
+# Verified token claims, keyed by token hash, kept until the token's `exp`
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 10000))
+
 security = HTTPBearer()
 
-@lru_cache(maxsize=1)
-def get_jwks():
-    """Fetch and cache JWKS keys from Clerk"""
+# kid -> parsed public key (RSAAlgorithm.from_jwk is only run once per key)
+_jwks_keys = {}
+_jwks_fetched_at = 0.0
+_jwks_attempted_at = 0.0
+_jwks_lock = asyncio.Lock()
+_jwks_refresh_task = None
+
+# sha256(token) -> (exp, kid, payload)
+_token_cache = OrderedDict()
+
+async def _fetch_jwks() -> dict:
     try:
-        response = requests.get(CLERK_JWKS_URL, timeout=10)
-        response.raise_for_status()
-        jwks = response.json()
-        if "keys" not in jwks:
-            raise HTTPException(
-                status_code=500, 
-                detail=f"JWKS endpoint did not return 'keys'. Response: {jwks}"
-            )
-        return jwks
-    except requests.RequestException as e:
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            response = await client.get(CLERK_JWKS_URL)
+            response.raise_for_status()
+            jwks = response.json()
+    except httpx.HTTPError as e:
         raise HTTPException(
             status_code=500,
             detail=f"Failed to fetch JWKS: {str(e)}"
         )
+    if "keys" not in jwks:
+        raise HTTPException(
+            status_code=500,
+            detail=f"JWKS endpoint did not return 'keys'. Response: {jwks}"
+        )
+    return jwks
+
+async def get_jwks(force: bool = False) -> dict:
+    """
+    Return the parsed public keys by kid, fetching from Clerk when we have
+    none or `force` is set. Routine refreshes belong to the background task;
+    only without it do keys older than JWKS_REFRESH_INTERVAL trigger a fetch.
+    If a fetch fails while we still hold keys, those keep being served.
+    Concurrent callers share a single fetch.
+    """
+    global _jwks_keys, _jwks_fetched_at, _jwks_attempted_at
+    refresher_running = _jwks_refresh_task is not None and not _jwks_refresh_task.done()
+    stale = not refresher_running and time.monotonic() - _jwks_fetched_at > JWKS_REFRESH_INTERVAL
+    if _jwks_keys and not stale and not force:
+        return _jwks_keys
+
+    fetched_at = _jwks_fetched_at
+    async with _jwks_lock:
+        if _jwks_fetched_at != fetched_at and _jwks_keys:
+            # Someone else refreshed while we waited for the lock.
+            return _jwks_keys
+        _jwks_attempted_at = time.monotonic()
+        try:
+            jwks = await _fetch_jwks()
+        except HTTPException as e:
+            if not _jwks_keys:
+                raise
+            print(f"[Auth] JWKS fetch failed, keeping {len(_jwks_keys)} cached keys: {e.detail}")
+            return _jwks_keys
+        keys = {}
+        for key in jwks["keys"]:
+            if key.get("kty") != "RSA" or "kid" not in key:
+                continue
+            keys[key["kid"]] = jwt.algorithms.RSAAlgorithm.from_jwk(key)
+        _jwks_keys = keys
+        _jwks_fetched_at = time.monotonic()
+        return _jwks_keys
+
+async def _get_signing_key(kid: str):
+    keys = await get_jwks()
+    if kid in keys:
+        return keys[kid]
+    # Unknown kid: Clerk may have rotated keys. Refetch, but rate-limited
+    # (failed attempts count too, so an outage doesn't mean a fetch per request).
+    if time.monotonic() - max(_jwks_fetched_at, _jwks_attempted_at) >= JWKS_MIN_REFETCH_INTERVAL:
+        keys = await get_jwks(force=True)
+    return keys.get(kid)
+
+async def _refresh_jwks_forever():
+    while True:
+        try:
+            await get_jwks(force=True)
+        except Exception as e:
+            print(f"[Auth] JWKS refresh failed: {e}")
+        await asyncio.sleep(JWKS_REFRESH_INTERVAL)
+
+def start_jwks_refresh():
+    """Start the background JWKS refresher (called from the app lifespan)."""
+    global _jwks_refresh_task
+    if _jwks_refresh_task is None or _jwks_refresh_task.done():
+        _jwks_refresh_task = asyncio.create_task(_refresh_jwks_forever())
+
+async def stop_jwks_refresh():
+    global _jwks_refresh_task
+    if _jwks_refresh_task is not None:
+        _jwks_refresh_task.cancel()
+        try:
+            await _jwks_refresh_task
+        except asyncio.CancelledError:
+            pass
+        _jwks_refresh_task = None
 
-def verify_token(token: str) -> dict:
+def _cached_claims(token_hash: str):
+    entry = _token_cache.get(token_hash)
+    if entry is None:
+        return None
+    exp, kid, payload = entry
+    # Drop expired tokens, and tokens whose signing key was rotated out.
+    if exp <= time.time() or kid not in _jwks_keys:
+        _token_cache.pop(token_hash, None)
+        return None
+    _token_cache.move_to_end(token_hash)
+    return payload
+
+def _cache_claims(token_hash: str, kid: str, payload: dict):
+    exp = payload.get("exp")
+    if TOKEN_CACHE_SIZE <= 0 or not isinstance(exp, (int, float)):
+        return
+    _token_cache[token_hash] = (float(exp), kid, payload)
+    _token_cache.move_to_end(token_hash)
+    while len(_token_cache) > TOKEN_CACHE_SIZE:
+        _token_cache.popitem(last=False)
+
+async def verify_token(token: str) -> dict:
     """Verify Clerk JWT token"""
+    token_hash = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    cached = _cached_claims(token_hash)
+    if cached is not None:
+        return cached
+
     try:
         # Get unverified header to find the key ID
         unverified_header = jwt.get_unverified_header(token)
-        jwks = get_jwks()
-        
-        # Find the matching key
-        rsa_key = {}
-        for key in jwks["keys"]:
-            if key["kid"] == unverified_header["kid"]:
-                rsa_key = {
-                    "kty": key["kty"],
-                    "kid": key["kid"],
-                    "use": key["use"],
-                    "n": key["n"],
-                    "e": key["e"]
-                }
-                break
-        
-        if not rsa_key:
+        kid = unverified_header.get("kid")
+        signing_key = await _get_signing_key(kid)
+
+        if signing_key is None:
             raise HTTPException(
-                status_code=401, 
+                status_code=401,
                 detail="Unable to find appropriate key"
             )
-        
+
         # Decode and verify the token with RS256
         payload = jwt.decode(
             token,
-            jwt.algorithms.RSAAlgorithm.from_jwk(rsa_key),
+            signing_key,
             algorithms=["RS256"],
             issuer=CLERK_ISSUER,
             options={
@@ -69,11 +172,14 @@ def verify_token(token: str) -> dict:
                 "verify_exp": True,   # Verify expiration
             }
         )
+        _cache_claims(token_hash, kid, payload)
         return payload
-        
+
+    except HTTPException:
+        raise
     except jwt.ExpiredSignatureError:
         raise HTTPException(
-            status_code=401, 
+            status_code=401,
             detail="Token has expired"
         )
     except jwt.InvalidIssuerError:
@@ -83,12 +189,12 @@ def verify_token(token: str) -> dict:
         )
     except jwt.exceptions.InvalidTokenError as e:
         raise HTTPException(
-            status_code=401, 
+            status_code=401,
             detail=f"Invalid token: {str(e)}"
         )
     except Exception as e:
         raise HTTPException(
-            status_code=401, 
+            status_code=401,
             detail=f"Unable to parse authentication token: {str(e)}"
         )
 
@@ -97,17 +203,16 @@ async def get_current_user(
 ) -> dict:
     """Extract and verify user from Clerk token"""
     token = credentials.credentials
-    payload = verify_token(token)
-    
+    payload = await verify_token(token)
+
     user_id = payload.get("sub")
     if not user_id:
         raise HTTPException(
-            status_code=401, 
+            status_code=401,
             detail="Invalid token: no user ID"
         )
-    
+
     return {
         "user_id": user_id,
         "payload": payload
     }
-
@@ -0,0 +1,131 @@
+# backend/app/batching.py
+import asyncio
+import time
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+import numpy as np
+
+from .metrics import PREDICT_STAGE_SECONDS
+
+# A batch runner takes a (B, H, W, 3) array and returns one (top_idx, top_prob) per row.
+BatchRunner = Callable[[np.ndarray], Awaitable[List[Tuple[int, float]]]]
+
+
+class MicroBatcher:
+    """
+    Collect prediction requests for up to `max_wait_ms` (or until
+    `max_batch_size` rows are queued) and run them as one forward pass.
+    Each caller awaits its own (top_idx, top_prob) result(s).
+    """
+
+    def __init__(self, runner: BatchRunner, max_batch_size: int = 8, max_wait_ms: float = 10.0):
+        self.runner = runner
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Stats exposed via /predict/stats
+        self.batches = 0
+        self.items = 0
+        self.requests = 0
+        self.max_batch_seen = 0
+        self.batch_size_hist = {}
+        self.total_queue_wait = 0.0
+        self.max_queue_wait = 0.0
+
+    def start(self):
+        """Start the collector task on the running event loop (idempotent)."""
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, img_array: np.ndarray) -> Tuple[int, float]:
+        """Queue a (1, H, W, 3) array and wait for its (top_idx, top_prob)."""
+        results = await self.submit_many(img_array)
+        return results[0]
+
+    async def submit_many(self, batch: np.ndarray) -> List[Tuple[int, float]]:
+        """Queue a (B, H, W, 3) array and wait for its B results, in order."""
+        self.start()
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((batch, fut, time.perf_counter()))
+        return await fut
+
+    async def _collect(self):
+        first = await self._queue.get()
+        batch = [first]
+        rows = first[0].shape[0]
+        deadline = time.perf_counter() + self.max_wait
+        while rows < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            rows += item[0].shape[0]
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            # Drop callers that went away (e.g. client disconnected) before we ran.
+            batch = [item for item in batch if not item[1].done()]
+            if not batch:
+                continue
+
+            started = time.perf_counter()
+            sizes = [arr.shape[0] for arr, _, _ in batch]
+            self._record(sum(sizes), [started - enqueued for _, _, enqueued in batch])
+            try:
+                arrays = np.concatenate([arr for arr, _, _ in batch], axis=0)
+                results = await self.runner(arrays)
+            except Exception as e:
+                for _, fut, _ in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+
+            offset = 0
+            for (_, fut, _), size in zip(batch, sizes):
+                if not fut.done():
+                    fut.set_result(list(results[offset:offset + size]))
+                offset += size
+
+    def _record(self, size: int, waits: List[float]):
+        for wait in waits:
+            PREDICT_STAGE_SECONDS.observe(wait, "batch_queue_wait")
+        self.batches += 1
+        self.items += size
+        self.requests += len(waits)
+        self.max_batch_seen = max(self.max_batch_seen, size)
+        self.batch_size_hist[size] = self.batch_size_hist.get(size, 0) + 1
+        self.total_queue_wait += sum(waits)
+        self.max_queue_wait = max(self.max_queue_wait, max(waits))
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self.batches,
+            "requests": self.requests,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 3) if self.batches else 0.0,
+            "max_batch_size_seen": self.max_batch_seen,
+            "batch_size_histogram": {str(k): v for k, v in sorted(self.batch_size_hist.items())},
+            "avg_queue_wait_ms": round(self.total_queue_wait / self.requests * 1000, 3) if self.requests else 0.0,
+            "max_queue_wait_ms": round(self.max_queue_wait * 1000, 3),
+        }
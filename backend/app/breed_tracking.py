@@ -0,0 +1,193 @@
+# backend/app/breed_tracking.py
+"""
+Write-coalescing buffer for breed search counts.
+
+POST /api/breeds/track only bumps an in-memory counter; a background task
+flushes the accumulated increments every BREED_TRACK_FLUSH_INTERVAL seconds
+(the maximum staleness) as unordered bulk_writes, so a popular breed costs
+one upsert per interval instead of one per click. Each flush updates the
+all-time totals in `breed_searches` and the hourly buckets in
+`breed_search_hourly` (read by app/trending.py). Increments that fail to
+flush are merged back and retried on the next flush.
+"""
+import asyncio
+import os
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from .database import breed_search_hourly_collection, breed_searches_collection
+from .metrics import Counter, Gauge
+
+# Maximum time an increment may sit in memory before it is written
+BREED_TRACK_FLUSH_INTERVAL = float(os.getenv("BREED_TRACK_FLUSH_INTERVAL", 5.0))
+# Distinct breed ids buffered before an early flush; twice this many and new ids are dropped
+BREED_TRACK_MAX_KEYS = int(os.getenv("BREED_TRACK_MAX_KEYS", 5000))
+
+BREED_TRACK_EVENTS = Counter(
+    "pawdentify_breed_track_total",
+    "Breed search tracking events by outcome (buffered, dropped, flushed).",
+    ("outcome",),
+)
+
+
+def hour_bucket(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def _total_op(breed_id: str, entry: dict) -> UpdateOne:
+    return UpdateOne(
+        {"breed_id": breed_id},
+        {
+            "$inc": {"count": entry["count"]},
+            "$set": {"breed_name": entry["breed_name"], "last_searched": entry["last_searched"]},
+        },
+        upsert=True,
+    )
+
+
+def _hourly_op(key: tuple, entry: dict) -> UpdateOne:
+    breed_id, hour = key
+    return UpdateOne(
+        {"_id": f"{breed_id}:{hour.strftime('%Y-%m-%dT%H')}"},
+        {
+            "$inc": {"count": entry["count"]},
+            "$set": {"breed_id": breed_id, "breed_name": entry["breed_name"], "hour": hour},
+        },
+        upsert=True,
+    )
+
+
+def _merge_back(target: dict, batch: dict):
+    """Return unwritten increments to the buffer; newer name/last_searched values win."""
+    for key, entry in batch.items():
+        current = target.get(key)
+        if current is None:
+            target[key] = entry
+        else:
+            current["count"] += entry["count"]
+
+
+class BreedSearchBuffer:
+    """In-memory per-breed increments, flushed by a background task."""
+
+    def __init__(self, flush_interval: float = BREED_TRACK_FLUSH_INTERVAL, max_keys: int = BREED_TRACK_MAX_KEYS):
+        self.flush_interval = max(0.05, float(flush_interval))
+        self.max_keys = max(1, int(max_keys))
+        # breed_id -> {"count", "breed_name", "last_searched"}
+        self._pending: Dict[str, dict] = {}
+        # (breed_id, hour) -> {"count", "breed_name"}
+        self._pending_hourly: Dict[tuple, dict] = {}
+        self._flush_lock = asyncio.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Stats
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.dropped = 0
+
+    def start(self):
+        """Start the flusher task on the running event loop (idempotent)."""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flusher and write whatever is still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def add(self, breed_id: str, breed_name: str, amount: int = 1) -> bool:
+        """Record a search; returns False when the buffer is full and it was dropped."""
+        entry = self._pending.get(breed_id)
+        if entry is None:
+            if len(self._pending) >= 2 * self.max_keys:
+                self.dropped += amount
+                BREED_TRACK_EVENTS.inc("dropped", amount=amount)
+                return False
+            entry = self._pending[breed_id] = {"count": 0}
+        entry["count"] += amount
+        entry["breed_name"] = breed_name
+        entry["last_searched"] = datetime.now().isoformat()
+
+        bucket = self._pending_hourly.setdefault((breed_id, hour_bucket(datetime.utcnow())), {"count": 0})
+        bucket["count"] += amount
+        bucket["breed_name"] = breed_name
+
+        BREED_TRACK_EVENTS.inc("buffered", amount=amount)
+        if len(self._pending) >= self.max_keys and self._wakeup is not None:
+            self._wakeup.set()
+        return True
+
+    def pending(self) -> int:
+        return sum(entry["count"] for entry in self._pending.values())
+
+    async def flush(self) -> int:
+        """Write buffered increments as unordered bulk_writes; returns the number of searches written."""
+        async with self._flush_lock:
+            if not self._pending and not self._pending_hourly:
+                return 0
+            totals, self._pending = self._pending, {}
+            hourly, self._pending_hourly = self._pending_hourly, {}
+            written = 0
+            try:
+                written = await self._write(breed_searches_collection, totals, _total_op, self._pending)
+                totals = {}
+                await self._write(breed_search_hourly_collection, hourly, _hourly_op, self._pending_hourly)
+            except asyncio.CancelledError:
+                # Shutdown mid-write: keep what wasn't confirmed for the final flush.
+                _merge_back(self._pending, totals)
+                _merge_back(self._pending_hourly, hourly)
+                raise
+            if written:
+                self.flushes += 1
+                BREED_TRACK_EVENTS.inc("flushed", amount=written)
+            return written
+
+    async def _write(self, collection, batch: dict, make_op: Callable, pending: dict) -> int:
+        """One unordered bulk_write; failed entries go back to `pending`. Returns searches written."""
+        if not batch:
+            return 0
+        keys = list(batch)
+        try:
+            await collection.bulk_write([make_op(key, batch[key]) for key in keys], ordered=False)
+        except BulkWriteError as e:
+            # Unordered: everything except the reported write errors was applied.
+            failed = {keys[err["index"]] for err in e.details.get("writeErrors", [])}
+            self.failed_flushes += 1
+            print(f"[BreedTrack] {len(failed)} of {len(keys)} upserts to {collection.name} failed, will retry")
+            _merge_back(pending, {key: batch[key] for key in failed})
+            return sum(entry["count"] for key, entry in batch.items() if key not in failed)
+        except Exception as e:
+            self.failed_flushes += 1
+            print(f"[BreedTrack] Flush of {len(keys)} entries to {collection.name} failed, will retry: {e}")
+            _merge_back(pending, batch)
+            return 0
+        return sum(entry["count"] for entry in batch.values())
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+
+SEARCH_BUFFER = BreedSearchBuffer()
+
+Gauge(
+    "pawdentify_breed_track_pending",
+    "Breed searches buffered in memory, not yet written to MongoDB.",
+    fn=SEARCH_BUFFER.pending,
+)
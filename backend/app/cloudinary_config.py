@@ -1,7 +1,15 @@
 import os
+import asyncio
+import uuid
+from io import BytesIO
+from pathlib import Path
 import cloudinary
+import cloudinary.api
 import cloudinary.uploader
 from dotenv import load_dotenv
+from PIL import Image, ImageOps
+
+from .metrics import IMAGE_UPLOAD_BYTES, IMAGE_UPLOAD_SECONDS, IMAGE_UPLOADS
 
 load_dotenv()
 
@@ -11,22 +19,180 @@ cloudinary.config(
     api_secret=os.getenv("CLOUDINARY_API_SECRET")
 )
 
-async def upload_image(file_bytes: bytes, folder: str = "pets") -> dict:
-    try:
-        result = cloudinary.uploader.upload(
-            file_bytes,
-            folder=folder,
-            resource_type="image"
-        )
+# The Cloudinary SDK is synchronous; calls run in worker threads, at most
+# CLOUDINARY_MAX_CONCURRENCY at a time.
+CLOUDINARY_MAX_CONCURRENCY = int(os.getenv("CLOUDINARY_MAX_CONCURRENCY", 4))
+# delete_resources accepts at most 100 public ids per call
+CLOUDINARY_DELETE_BATCH = 100
+
+# Recompression before upload: longest side capped at IMAGE_UPLOAD_MAX_DIM
+# (0 keeps the full resolution), EXIF applied then stripped, re-encoded as
+# IMAGE_UPLOAD_FORMAT ("jpeg" or "webp") at IMAGE_UPLOAD_QUALITY. The raw
+# upload is never stored, since it may carry EXIF/GPS metadata.
+IMAGE_UPLOAD_MAX_DIM = int(os.getenv("IMAGE_UPLOAD_MAX_DIM", 1600))
+IMAGE_UPLOAD_FORMAT = os.getenv("IMAGE_UPLOAD_FORMAT", "jpeg").strip().lower()
+IMAGE_UPLOAD_QUALITY = int(os.getenv("IMAGE_UPLOAD_QUALITY", 85))
+
+_upload_slots = asyncio.Semaphore(CLOUDINARY_MAX_CONCURRENCY)
+
+def _encode(img: Image.Image, fmt: str) -> bytes:
+    out = BytesIO()
+    # No exif/icc arguments, so no metadata is carried over.
+    if fmt == "webp":
+        img.save(out, format="WEBP", quality=IMAGE_UPLOAD_QUALITY, method=4)
+    else:
+        img.convert("RGB").save(out, format="JPEG", quality=IMAGE_UPLOAD_QUALITY, optimize=True, progressive=True)
+    return out.getvalue()
+
+def recompress_image(file_bytes: bytes) -> bytes:
+    """
+    Downscale, drop metadata and re-encode an uploaded photo. If the result
+    is larger than the original, the other format is tried too and the smaller
+    of the two (both stripped) is returned.
+    """
+    with Image.open(BytesIO(file_bytes)) as img:
+        if img.format == "JPEG" and IMAGE_UPLOAD_MAX_DIM > 0:
+            img.draft("RGB", (IMAGE_UPLOAD_MAX_DIM, IMAGE_UPLOAD_MAX_DIM))
+        img = ImageOps.exif_transpose(img)
+        if IMAGE_UPLOAD_FORMAT == "webp" and img.mode in ("RGBA", "LA", "P"):
+            img = img.convert("RGBA")
+        else:
+            img = img.convert("RGB")
+        if IMAGE_UPLOAD_MAX_DIM > 0:
+            img.thumbnail((IMAGE_UPLOAD_MAX_DIM, IMAGE_UPLOAD_MAX_DIM), Image.LANCZOS)
+
+        encoded = _encode(img, IMAGE_UPLOAD_FORMAT)
+        if len(encoded) >= len(file_bytes):
+            # Already small, well-compressed images can grow when re-encoded.
+            other = _encode(img, "jpeg" if IMAGE_UPLOAD_FORMAT == "webp" else "webp")
+            encoded = min(encoded, other, key=len)
+        return encoded
+
+class CloudinaryImageClient:
+    """Cloudinary SDK calls, run in worker threads under the concurrency limit."""
+
+    async def upload(self, file_bytes: bytes, folder: str, public_id: str = None) -> dict:
+        options = {"folder": folder, "resource_type": "image"}
+        if public_id:
+            # A fixed public_id makes retried uploads overwrite instead of duplicating.
+            options.update(public_id=public_id, overwrite=True)
+        async with _upload_slots:
+            with IMAGE_UPLOAD_SECONDS.time("upload"):
+                result = await asyncio.to_thread(cloudinary.uploader.upload, file_bytes, **options)
         return {
             "url": result["secure_url"],
             "public_id": result["public_id"]
         }
+
+    async def delete(self, public_id: str):
+        async with _upload_slots:
+            with IMAGE_UPLOAD_SECONDS.time("delete"):
+                result = await asyncio.to_thread(cloudinary.uploader.destroy, public_id)
+        if result.get("result") not in ("ok", "not found"):
+            raise Exception(f"destroy returned {result}")
+
+    async def delete_many(self, public_ids: list) -> list:
+        """Admin API batch delete (up to 100 ids); returns the ids that were not removed."""
+        async with _upload_slots:
+            with IMAGE_UPLOAD_SECONDS.time("delete_many"):
+                result = await asyncio.to_thread(cloudinary.api.delete_resources, public_ids)
+        deleted = result.get("deleted", {})
+        return [pid for pid in public_ids if deleted.get(pid) not in ("deleted", "not_found")]
+
+class LocalImageClient:
+    """Stand-in for Cloudinary that writes images to a local directory (IMAGE_CLIENT=local)."""
+
+    def __init__(self, root: str, base_url: str):
+        self.root = Path(root)
+        self.base_url = base_url.rstrip("/")
+
+    async def upload(self, file_bytes: bytes, folder: str, public_id: str = None) -> dict:
+        public_id = f"{folder}/{public_id or uuid.uuid4().hex}"
+        path = self.root.joinpath(public_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        await asyncio.to_thread(path.write_bytes, file_bytes)
+        return {"url": f"{self.base_url}/{public_id}", "public_id": public_id}
+
+    async def delete(self, public_id: str):
+        self.root.joinpath(public_id).unlink(missing_ok=True)
+
+    async def delete_many(self, public_ids: list) -> list:
+        for public_id in public_ids:
+            await self.delete(public_id)
+        return []
+
+# "cloudinary" (default) or "local" (LocalImageClient under LOCAL_IMAGE_DIR)
+IMAGE_CLIENT = os.getenv("IMAGE_CLIENT", "cloudinary").strip().lower()
+# The app serves LOCAL_IMAGE_DIR at the path of LOCAL_IMAGE_BASE_URL (see app.main)
+LOCAL_IMAGE_DIR = os.getenv("LOCAL_IMAGE_DIR", "local_images")
+LOCAL_IMAGE_BASE_URL = os.getenv("LOCAL_IMAGE_BASE_URL", "http://localhost:8000/local-images")
+
+if IMAGE_CLIENT == "local":
+    _image_client = LocalImageClient(LOCAL_IMAGE_DIR, LOCAL_IMAGE_BASE_URL)
+else:
+    _image_client = CloudinaryImageClient()
+
+def get_image_client():
+    return _image_client
+
+def set_image_client(client):
+    """Swap the image backend (any object with async upload()/delete())."""
+    global _image_client
+    _image_client = client
+
+async def prepare_image(file_bytes: bytes) -> bytes:
+    """
+    Recompress an upload (see IMAGE_UPLOAD_*). Raises ValueError for files
+    PIL can't decode, rather than storing them with their metadata intact.
+    """
+    IMAGE_UPLOAD_BYTES.inc("original", amount=len(file_bytes))
+    try:
+        with IMAGE_UPLOAD_SECONDS.time("recompress"):
+            return await asyncio.to_thread(recompress_image, file_bytes)
+    except Exception as e:
+        print(f"Image recompression failed: {str(e)}")
+        raise ValueError("Unsupported or corrupt image") from e
+
+async def upload_image(file_bytes: bytes, folder: str = "pets", public_id: str = None, prepared: bool = False) -> dict:
+    if not prepared:
+        file_bytes = await prepare_image(file_bytes)
+    try:
+        result = await get_image_client().upload(file_bytes, folder, public_id)
     except Exception as e:
+        IMAGE_UPLOADS.inc("upload", "error")
         raise Exception(f"Failed to upload image: {str(e)}")
+    IMAGE_UPLOADS.inc("upload", "ok")
+    IMAGE_UPLOAD_BYTES.inc("uploaded", amount=len(file_bytes))
+    return result
 
-async def delete_image(public_id: str):
+async def delete_image(public_id: str, raise_errors: bool = False):
     try:
-        cloudinary.uploader.destroy(public_id)
+        await get_image_client().delete(public_id)
+        IMAGE_UPLOADS.inc("delete", "ok")
     except Exception as e:
+        IMAGE_UPLOADS.inc("delete", "error")
+        if raise_errors:
+            raise
         print(f"Failed to delete image: {str(e)}")
+
+async def delete_images(public_ids: list) -> list:
+    """
+    Delete many images in batches of CLOUDINARY_DELETE_BATCH, with batches
+    running concurrently (bounded by CLOUDINARY_MAX_CONCURRENCY). Returns the
+    ids that could not be deleted.
+    """
+    client = get_image_client()
+    batches = [public_ids[i:i + CLOUDINARY_DELETE_BATCH] for i in range(0, len(public_ids), CLOUDINARY_DELETE_BATCH)]
+
+    async def run(batch):
+        try:
+            return await client.delete_many(batch)
+        except Exception as e:
+            print(f"Failed to delete {len(batch)} images: {str(e)}")
+            return batch
+
+    failed = [pid for result in await asyncio.gather(*(run(b) for b in batches)) for pid in result]
+    IMAGE_UPLOADS.inc("delete", "ok", amount=len(public_ids) - len(failed))
+    if failed:
+        IMAGE_UPLOADS.inc("delete", "error", amount=len(failed))
+    return failed
@@ -12,6 +12,12 @@ db = client[DATABASE_NAME]
 
 # Collections
 pets_collection = db["pets"]
+pet_notes_collection = db["pet_notes"]  # one document per note, keyed by pet_id
 history_collection = db["search_history"]
 feedback_collection = db["feedback"]
 breed_searches_collection = db["breed_searches"]  # <-- ADDED breed searches collection
+breed_search_hourly_collection = db["breed_search_hourly"]  # per (breed, hour) search counts for trending
+places_collection = db["places"]  # Mappls results, GeoJSON location (2dsphere)
+places_coverage_collection = db["places_coverage"]  # per (category, grid cell) fetch time
+jobs_collection = db["jobs"]  # background job queue (app/jobs.py)
+data_versions_collection = db["user_data_versions"]  # per-user write counters behind ETags (app/http_cache.py)
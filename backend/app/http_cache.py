@@ -0,0 +1,102 @@
+# backend/app/http_cache.py
+"""
+ETags and conditional GETs for read endpoints.
+
+Static payloads (e.g. /breeds) are serialized once and their ETag is the hash
+of those bytes. Per-user data gets a version-based ETag instead: every write
+to a user's pets, history or settings bumps a counter in `user_data_versions`,
+and the ETag is a hash of (resource, user, version, path + query). A matching
+If-None-Match is answered with 304 after that single _id lookup, before the
+listing query runs. Versions are bumped after the write, so a response can
+only ever be paired with a version older than its data, never newer.
+"""
+import hashlib
+import json
+from typing import Optional
+
+from fastapi import Request, Response
+
+from .database import data_versions_collection
+
+# Per-user responses: browsers may store them but must revalidate every time
+PRIVATE_REVALIDATE = "private, no-cache"
+
+USER_RESOURCES = ("pets", "history", "settings")
+
+
+def make_etag(*parts) -> str:
+    raw = json.dumps(parts, separators=(",", ":"), sort_keys=True, default=str).encode("utf-8")
+    return f'"{hashlib.sha256(raw).hexdigest()[:32]}"'
+
+
+def body_etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def serialize(content) -> bytes:
+    """Compact JSON body, as sent by precomputed responses."""
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match uses the weak comparison, so W/ prefixes are ignored."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+def _headers(etag: str, cache_control: str, private: bool) -> dict:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if private:
+        headers["Vary"] = "Authorization"
+    return headers
+
+
+def not_modified(etag: str, cache_control: str, private: bool = False) -> Response:
+    return Response(status_code=304, headers=_headers(etag, cache_control, private))
+
+
+def check(request: Request, etag: str, cache_control: str, private: bool = False) -> Optional[Response]:
+    """A 304 response when the client already has `etag`, else None."""
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control, private)
+    return None
+
+
+def json_response(content, etag: str, cache_control: str, private: bool = False) -> Response:
+    return Response(serialize(content), media_type="application/json",
+                    headers=_headers(etag, cache_control, private))
+
+
+class PrecomputedJSON:
+    """A JSON body serialized once, with its strong ETag."""
+
+    def __init__(self, content, cache_control: str):
+        self.body = serialize(content)
+        self.etag = body_etag(self.body)
+        self.cache_control = cache_control
+
+    def respond(self, request: Request) -> Response:
+        if etag_matches(request, self.etag):
+            return not_modified(self.etag, self.cache_control)
+        return Response(self.body, media_type="application/json",
+                        headers=_headers(self.etag, self.cache_control, False))
+
+
+async def bump_user_version(user_id: str, *resources: str):
+    """Invalidate ETags of `resources` for `user_id`; call after the write."""
+    await data_versions_collection.update_one(
+        {"_id": user_id},
+        {"$inc": {resource: 1 for resource in (resources or USER_RESOURCES)}},
+        upsert=True,
+    )
+
+
+async def user_etag(request: Request, user_id: str, resource: str) -> str:
+    doc = await data_versions_collection.find_one({"_id": user_id}, {resource: 1})
+    version = (doc or {}).get(resource, 0)
+    return make_etag(resource, user_id, version, request.url.path, str(request.url.query))
@@ -0,0 +1,78 @@
+# backend/app/http_clients.py
+"""
+App-wide pooled httpx clients, one per upstream. Created in the FastAPI
+lifespan (start_clients) and closed on shutdown (close_clients), so requests
+reuse keep-alive TCP/TLS connections instead of handshaking every call.
+"""
+import os
+from typing import Dict
+
+import httpx
+
+# Upstream base URLs (override to point at a local fake server, see scripts/fake_mappls.py)
+MAPPLS_OAUTH_URL = os.getenv("MAPPLS_OAUTH_URL", "https://outpost.mappls.com")
+MAPPLS_ATLAS_URL = os.getenv("MAPPLS_ATLAS_URL", "https://atlas.mappls.com")
+
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 5.0))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 15.0))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 50))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", 20))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 60.0))
+HTTP_VERIFY_TLS = os.getenv("HTTP_VERIFY_TLS", "1").strip().lower() not in ("0", "false", "no")
+
+UPSTREAMS = {
+    "mappls_oauth": MAPPLS_OAUTH_URL,
+    "mappls_atlas": MAPPLS_ATLAS_URL,
+}
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+
+
+def http2_available() -> bool:
+    """HTTP/2 needs the optional `h2` package (httpx[http2])."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def build_client(base_url: str, **overrides) -> httpx.AsyncClient:
+    options = dict(
+        base_url=base_url,
+        http2=http2_available(),
+        verify=HTTP_VERIFY_TLS,
+        timeout=httpx.Timeout(
+            connect=HTTP_CONNECT_TIMEOUT,
+            read=HTTP_READ_TIMEOUT,
+            write=HTTP_READ_TIMEOUT,
+            pool=HTTP_CONNECT_TIMEOUT,
+        ),
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+    )
+    options.update(overrides)
+    return httpx.AsyncClient(**options)
+
+
+async def start_clients():
+    for name, base_url in UPSTREAMS.items():
+        if name not in _clients or _clients[name].is_closed:
+            _clients[name] = build_client(base_url)
+
+
+def get_client(name: str) -> httpx.AsyncClient:
+    """Shared client for an upstream; created on first use outside the lifespan."""
+    client = _clients.get(name)
+    if client is None or client.is_closed:
+        client = _clients[name] = build_client(UPSTREAMS[name])
+    return client
+
+
+async def close_clients():
+    while _clients:
+        _, client = _clients.popitem()
+        await client.aclose()
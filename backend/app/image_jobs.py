@@ -0,0 +1,77 @@
+# backend/app/image_jobs.py
+"""
+Pet image side effects, run by the job queue (app/jobs.py).
+
+add_pet stores the pet with image_status "pending" and queues an upload
+keyed by pet id; the upload uses the pet id as its public_id, so a retried
+upload overwrites instead of leaving duplicates. delete_pet removes the
+document and queues the image delete.
+"""
+from bson import Binary
+
+from . import jobs
+from .cloudinary_config import delete_image, upload_image
+from .database import pets_collection
+from .http_cache import bump_user_version
+
+PET_IMAGE_FOLDER = "pets"
+# Queued bytes live in the job document, which MongoDB caps at 16 MB
+MAX_QUEUED_IMAGE_BYTES = 15 * 1024 * 1024
+
+
+async def enqueue_pet_image_upload(pet_id: str, image_bytes: bytes) -> str:
+    return await jobs.enqueue(
+        "pet_image.upload",
+        {"pet_id": pet_id},
+        key=f"pet_image.upload:{pet_id}",
+        data=Binary(image_bytes),
+    )
+
+
+async def enqueue_image_delete(public_id: str) -> str:
+    return await jobs.enqueue(
+        "image.delete",
+        {"public_id": public_id},
+        key=f"image.delete:{public_id}",
+    )
+
+
+def pet_image_public_id(pet_id: str) -> str:
+    return f"{PET_IMAGE_FOLDER}/{pet_id}"
+
+
+async def _mark_upload_failed(job: dict):
+    pet = await pets_collection.find_one_and_update(
+        {"_id": job["payload"]["pet_id"], "image_status": "pending"},
+        {"$set": {"image_status": "failed"}},
+        projection={"user_id": 1},
+    )
+    if pet is not None:
+        await bump_user_version(pet["user_id"], "pets")
+
+
+@jobs.register("pet_image.upload", on_failure=_mark_upload_failed)
+async def upload_pet_image(job: dict):
+    pet_id = job["payload"]["pet_id"]
+    pet = await pets_collection.find_one({"_id": pet_id}, {"user_id": 1})
+    if not pet:
+        return  # pet deleted before the upload ran
+    result = await upload_image(bytes(job["data"]), folder=PET_IMAGE_FOLDER, public_id=pet_id, prepared=True)
+    updated = await pets_collection.update_one(
+        {"_id": pet_id},
+        {"$set": {
+            "image_url": result["url"],
+            "image_public_id": result["public_id"],
+            "image_status": "ready",
+        }},
+    )
+    if updated.matched_count == 0:
+        # Deleted while we were uploading; don't leave the image behind.
+        await enqueue_image_delete(result["public_id"])
+        return
+    await bump_user_version(pet["user_id"], "pets")
+
+
+@jobs.register("image.delete")
+async def delete_uploaded_image(job: dict):
+    await delete_image(job["payload"]["public_id"], raise_errors=True)
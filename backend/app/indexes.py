@@ -0,0 +1,237 @@
+# backend/app/indexes.py
+"""
+Declarative MongoDB index registry.
+
+INDEXES lists every index the app relies on; ensure_indexes() creates them
+idempotently (run at startup from the lifespan, or on demand). An existing
+index with a declared name but different keys or options is rebuilt (a TTL
+change is applied in place with collMod). QUERIES lists
+the app's query shapes so check_queries() can explain them and report any
+that still scan the whole collection or sort in memory.
+
+    python -m app.indexes            # create missing indexes, report extras
+    python -m app.indexes --check    # also explain QUERIES and flag COLLSCANs
+"""
+import argparse
+import asyncio
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
+
+from .database import db
+from .jobs import JOB_RETENTION_DAYS
+from .trending import TRENDING_RETENTION_DAYS
+
+
+class IndexSpec(NamedTuple):
+    collection: str
+    keys: List[Tuple[str, object]]
+    options: dict = {}
+
+    @property
+    def name(self) -> str:
+        return self.options.get("name") or "_".join(f"{field}_{direction}" for field, direction in self.keys)
+
+
+class QueryShape(NamedTuple):
+    collection: str
+    description: str
+    filter: dict
+    sort: Optional[List[Tuple[str, int]]] = None
+    limit: int = 0
+
+
+INDEXES = [
+    # GET /api/history: by user, newest first
+    IndexSpec("search_history", [("user_id", 1), ("searched_on", -1), ("_id", -1)]),
+    # GET /api/pets: by user, in the order they were added (supersedes the plain user_id_1 index)
+    IndexSpec("pets", [("user_id", 1), ("added_on", 1), ("_id", 1)]),
+    # GET /api/pets/{id}/notes: newest first; account wipe deletes by user
+    IndexSpec("pet_notes", [("pet_id", 1), ("date", -1), ("_id", -1)]),
+    IndexSpec("pet_notes", [("user_id", 1)]),
+    # GET /api/admin/feedbacks: newest first; account wipe deletes by user
+    IndexSpec("feedback", [("timestamp", -1), ("_id", -1)]),
+    IndexSpec("feedback", [("user_id", 1)]),
+    # POST /api/breeds/track upserts by breed_id; GET /api/breeds/top sorts by count
+    IndexSpec("breed_searches", [("breed_id", 1)], {"unique": True}),
+    IndexSpec("breed_searches", [("count", -1)]),
+    # Trending buckets: read by hour range, expired after the retention period
+    IndexSpec("breed_search_hourly", [("hour", 1)], {"expireAfterSeconds": TRENDING_RETENTION_DAYS * 86400}),
+    # Settings are one document per user
+    IndexSpec("user_settings", [("user_id", 1)], {"unique": True}),
+    # Local Mappls store ($nearSphere needs the 2dsphere index)
+    IndexSpec("places", [("location", "2dsphere"), ("category", 1)]),
+    # Job queue claim: due pending jobs, oldest first
+    IndexSpec("jobs", [("status", 1), ("run_at", 1)]),
+    # Finished (done/failed) jobs are purged after the retention period
+    IndexSpec("jobs", [("finished_at", 1)], {"expireAfterSeconds": JOB_RETENTION_DAYS * 86400}),
+]
+
+QUERIES = [
+    QueryShape("search_history", "history by user", {"user_id": "?"}, [("searched_on", -1), ("_id", -1)], 51),
+    QueryShape("pets", "pets by user", {"user_id": "?"}, [("added_on", 1), ("_id", 1)], 51),
+    QueryShape("pet_notes", "notes by pet", {"pet_id": "?"}, [("date", -1), ("_id", -1)], 51),
+    QueryShape("feedback", "feedback newest first", {}, [("timestamp", -1), ("_id", -1)], 51),
+    QueryShape("feedback", "feedback by user", {"user_id": "?"}),
+    QueryShape("pet_notes", "notes by user", {"user_id": "?"}),
+    QueryShape("breed_searches", "track upsert by breed", {"breed_id": "?"}),
+    QueryShape("breed_searches", "top breeds", {}, [("count", -1)], 10),
+    QueryShape("breed_search_hourly", "trending hours", {"hour": {"$gte": datetime(2000, 1, 1)}}),
+    QueryShape("user_settings", "settings by user", {"user_id": "?"}),
+    QueryShape("jobs", "claim due job", {"status": "pending", "run_at": {"$lte": datetime(2000, 1, 1)}}, [("run_at", 1)], 1),
+]
+
+
+# Index options compared against the existing index; anything else is informational
+COMPARED_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+
+def _normalize_keys(keys) -> List[Tuple[str, object]]:
+    # Directions can come back as floats (1.0) from older servers.
+    return [(field, int(d) if isinstance(d, (int, float)) else d) for field, d in keys]
+
+
+def _differences(spec: IndexSpec, info: dict) -> List[str]:
+    """What differs between the declared spec and an existing index's info."""
+    diffs = []
+    if _normalize_keys(info.get("key", [])) != _normalize_keys(spec.keys):
+        diffs.append(f"keys {info.get('key')} != {spec.keys}")
+    for option in COMPARED_OPTIONS:
+        want, have = spec.options.get(option), info.get(option)
+        if option in ("unique", "sparse"):
+            want, have = bool(want), bool(have)
+        if want != have:
+            diffs.append(f"{option} {have!r} != {want!r}")
+    return diffs
+
+
+async def _rebuild(collection, spec: IndexSpec, info: dict, diffs: List[str]):
+    """Bring an existing index in line with its spec; raises OperationFailure if it can't."""
+    only_ttl = all(diff.startswith("expireAfterSeconds") for diff in diffs)
+    if only_ttl and "expireAfterSeconds" in info and "expireAfterSeconds" in spec.options:
+        await db.command("collMod", collection.name, index={
+            "name": spec.name, "expireAfterSeconds": spec.options["expireAfterSeconds"],
+        })
+        return
+    # Same-name indexes can't be altered (e.g. made unique): drop and build again,
+    # restoring the old definition if the new one can't be built.
+    await collection.drop_index(spec.name)
+    try:
+        await collection.create_indexes([IndexModel(spec.keys, name=spec.name, **spec.options)])
+    except OperationFailure:
+        old_options = {k: info[k] for k in COMPARED_OPTIONS if k in info}
+        await collection.create_indexes([IndexModel(info["key"], name=spec.name, **old_options)])
+        raise
+
+
+async def ensure_indexes(verbose: bool = False) -> Dict[str, list]:
+    """
+    Create every index in INDEXES (a no-op for ones that already exist) and
+    rebuild same-name indexes whose keys or options differ from the spec.
+    Returns {"created": [...], "rebuilt": [...], "errors": [...], "unmanaged": [...]};
+    an index that can't be built (e.g. unique over duplicate data) is
+    reported, not raised.
+    """
+    report = {"created": [], "rebuilt": [], "errors": [], "unmanaged": []}
+    by_collection: Dict[str, List[IndexSpec]] = {}
+    for spec in INDEXES:
+        by_collection.setdefault(spec.collection, []).append(spec)
+
+    for collection_name, specs in by_collection.items():
+        collection = db[collection_name]
+        existing = await collection.index_information()
+        for spec in specs:
+            if spec.name in existing:
+                diffs = _differences(spec, existing[spec.name])
+                if not diffs:
+                    continue
+                try:
+                    await _rebuild(collection, spec, existing[spec.name], diffs)
+                    report["rebuilt"].append(f"{collection_name}.{spec.name} ({'; '.join(diffs)})")
+                except OperationFailure as e:
+                    message = (e.details or {}).get("errmsg") or str(e)
+                    report["errors"].append(
+                        f"{collection_name}.{spec.name} differs from the registry ({'; '.join(diffs)}): {message}"
+                    )
+                continue
+            try:
+                await collection.create_indexes([IndexModel(spec.keys, name=spec.name, **spec.options)])
+                report["created"].append(f"{collection_name}.{spec.name}")
+            except OperationFailure as e:
+                message = (e.details or {}).get("errmsg") or str(e)
+                report["errors"].append(f"{collection_name}.{spec.name}: {message}")
+        declared = {spec.name for spec in specs} | {"_id_"}
+        report["unmanaged"].extend(f"{collection_name}.{name}" for name in existing if name not in declared)
+
+    for name in report["created"]:
+        print(f"[Indexes] Created {name}")
+    for name in report["rebuilt"]:
+        print(f"[Indexes] Rebuilt {name}")
+    for error in report["errors"]:
+        print(f"[Indexes] ❌ {error}")
+    if verbose:
+        for name in report["unmanaged"]:
+            print(f"[Indexes] Not in registry: {name}")
+    return report
+
+
+def _plan_stages(plan: dict) -> List[str]:
+    stages = [plan.get("stage")]
+    for child_key in ("inputStage", "queryPlan"):
+        if child_key in plan:
+            stages.extend(_plan_stages(plan[child_key]))
+    for child in plan.get("inputStages", []):
+        stages.extend(_plan_stages(child))
+    return [s for s in stages if s]
+
+
+async def check_queries() -> List[dict]:
+    """Explain every QueryShape; flag collection scans and in-memory sorts."""
+    results = []
+    for query in QUERIES:
+        cursor = db[query.collection].find(query.filter)
+        if query.sort:
+            cursor = cursor.sort(query.sort)
+        if query.limit:
+            cursor = cursor.limit(query.limit)
+        explain = await cursor.explain()
+        stages = _plan_stages(explain.get("queryPlanner", {}).get("winningPlan", {}))
+        results.append({
+            "collection": query.collection,
+            "query": query.description,
+            "stages": stages,
+            "collscan": "COLLSCAN" in stages,
+            "in_memory_sort": "SORT" in stages,
+        })
+    return results
+
+
+async def _main(check: bool):
+    report = await ensure_indexes(verbose=True)
+    print(
+        f"[Indexes] {len(INDEXES)} declared, {len(report['created'])} created, "
+        f"{len(report['rebuilt'])} rebuilt, {len(report['errors'])} failed"
+    )
+    if not check:
+        return 1 if report["errors"] else 0
+
+    unindexed = 0
+    for result in await check_queries():
+        flags = []
+        if result["collscan"]:
+            flags.append("COLLSCAN")
+        if result["in_memory_sort"]:
+            flags.append("in-memory SORT")
+        unindexed += bool(flags)
+        status = "❌ " + ", ".join(flags) if flags else "✅"
+        print(f"  {result['collection']:<16} {result['query']:<26} {' > '.join(result['stages']):<32} {status}")
+    return 1 if report["errors"] or unindexed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create the app's MongoDB indexes")
+    parser.add_argument("--check", action="store_true", help="explain known queries and report unindexed ones")
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(_main(args.check)))
@@ -0,0 +1,151 @@
+# backend/app/inference_backends.py
+"""
+Inference backends selected by INFERENCE_BACKEND. Every backend exposes
+`predict(batch, verbose=0)` like a Keras model, so `predict_top` and
+`predict_top_batch` work unchanged on any of them.
+
+  keras        the tf.keras model itself, via model.predict (default)
+  keras_xla    the Keras model called through an XLA-compiled tf.function
+  tflite       float TFLite model (see scripts/convert_model.py)
+  tflite_int8  int8-quantized TFLite model
+
+TensorFlow is only imported when a backend is actually built.
+"""
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+BACKENDS = ("keras", "keras_xla", "tflite", "tflite_int8")
+
+
+def tflite_path_for(model_path: str, int8: bool = False) -> str:
+    """Default location of the converted model next to the .keras file."""
+    p = Path(model_path)
+    suffix = "_int8.tflite" if int8 else ".tflite"
+    return str(p.with_name(p.stem + suffix))
+
+
+def main_tflite_path():
+    """TFLITE_MODEL_PATH: override for the main model's converted file only."""
+    return os.getenv("TFLITE_MODEL_PATH") or None
+
+
+def model_identity(model_path: str, backend: str = None, tflite_path: str = None) -> str:
+    """
+    Identify the model actually being served (path, backend, file mtime/size),
+    so caches keyed on predictions can tell when it changes. `tflite_path`
+    is the converted file in use, if it isn't next to model_path.
+    """
+    backend = (backend or os.getenv("INFERENCE_BACKEND", "keras")).strip().lower()
+    path = model_path
+    if backend in ("tflite", "tflite_int8"):
+        path = tflite_path or tflite_path_for(model_path, int8=backend == "tflite_int8")
+    try:
+        st = os.stat(path)
+        return f"{path}|{backend}|{int(st.st_mtime)}|{st.st_size}"
+    except OSError:
+        return f"{path}|{backend}"
+
+
+class KerasXLABackend:
+    """
+    Call the model directly through an XLA-compiled tf.function. This skips
+    model.predict's per-call data-adapter/callback overhead, which dominates
+    for one or a handful of images.
+    """
+    name = "keras_xla"
+
+    def __init__(self, model):
+        import tensorflow as tf
+
+        self.tf = tf
+        self.model = model
+        input_shape = tuple(model.inputs[0].shape[1:])
+        self._call = tf.function(
+            lambda x: model(x, training=False),
+            input_signature=[tf.TensorSpec((None,) + input_shape, tf.float32)],
+            jit_compile=True,
+        )
+
+    def predict(self, batch: np.ndarray, verbose: int = 0):
+        return self._call(self.tf.convert_to_tensor(batch, dtype=self.tf.float32)).numpy()
+
+
+class TFLiteBackend:
+    """
+    Run a .tflite model with tf.lite.Interpreter. Handles quantized inputs and
+    outputs by applying the tensors' scale/zero-point.
+    """
+
+    def __init__(self, tflite_path: str, name: str = "tflite", num_threads: int = None):
+        import tensorflow as tf
+
+        self.name = name
+        self.path = tflite_path
+        self.interpreter = tf.lite.Interpreter(model_path=tflite_path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self._batch_size = int(self._input["shape"][0])
+        # The interpreter holds mutable tensor state; one invoke at a time.
+        self._lock = threading.Lock()
+
+    def _resize(self, batch_size: int):
+        if batch_size == self._batch_size:
+            return
+        shape = list(self._input["shape"])
+        shape[0] = batch_size
+        self.interpreter.resize_tensor_input(self._input["index"], shape)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self._batch_size = batch_size
+
+    def predict(self, batch: np.ndarray, verbose: int = 0):
+        batch = np.asarray(batch, dtype=np.float32)
+        with self._lock:
+            self._resize(batch.shape[0])
+            in_dtype = self._input["dtype"]
+            if in_dtype != np.float32:
+                scale, zero_point = self._input["quantization"]
+                info = np.iinfo(in_dtype)
+                batch = np.clip(np.round(batch / scale + zero_point), info.min, info.max).astype(in_dtype)
+            self.interpreter.set_tensor(self._input["index"], batch)
+            self.interpreter.invoke()
+            out = self.interpreter.get_tensor(self._output["index"])
+            if self._output["dtype"] != np.float32:
+                scale, zero_point = self._output["quantization"]
+                out = (out.astype(np.float32) - zero_point) * scale
+            return np.array(out)
+
+
+def load_backend(model_path: str, backend: str = None, tflite_path: str = None):
+    """
+    Build the requested backend for model_path (the .keras file). TFLite
+    backends read `tflite_path`, or the converted file next to model_path.
+    """
+    backend = (backend or os.getenv("INFERENCE_BACKEND", "keras")).strip().lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown INFERENCE_BACKEND '{backend}'. Expected one of: {', '.join(BACKENDS)}")
+
+    if backend in ("tflite", "tflite_int8"):
+        int8 = backend == "tflite_int8"
+        tflite_path = tflite_path or tflite_path_for(model_path, int8=int8)
+        if not Path(tflite_path).exists():
+            raise FileNotFoundError(
+                f"TFLite model not found: {tflite_path} (create it with `python -m scripts.convert_model`)"
+            )
+        threads = os.getenv("TFLITE_NUM_THREADS")
+        return TFLiteBackend(tflite_path, name=backend, num_threads=int(threads) if threads else None)
+
+    p = Path(model_path)
+    if not p.exists():
+        raise FileNotFoundError(f"Model file not found: {model_path}")
+    import tensorflow as tf
+
+    model = tf.keras.models.load_model(str(p))
+    if backend == "keras_xla":
+        return KerasXLABackend(model)
+    return model
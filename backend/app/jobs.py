@@ -0,0 +1,253 @@
+# backend/app/jobs.py
+"""
+MongoDB-backed job queue for side effects that should not hold up a request
+(image uploads/deletes). Jobs are stored in `jobs`; worker tasks started from
+the app lifespan claim them with find_one_and_update, so several API
+processes can share the queue. A failed job is retried with exponential
+backoff until JOB_MAX_ATTEMPTS, and a worker that dies mid-job loses its
+lease after JOB_LEASE_SECONDS so another worker picks the job up.
+
+Enqueueing is idempotent: a job's `_id` is its idempotency key, and
+enqueueing an existing key returns the existing job instead of a new one.
+"""
+import asyncio
+import os
+import random
+import traceback
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from .database import jobs_collection
+from .metrics import JOBS_PROCESSED
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 2.0))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", 120))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 8))
+JOB_BACKOFF_BASE = float(os.getenv("JOB_BACKOFF_BASE", 5))
+JOB_BACKOFF_MAX = float(os.getenv("JOB_BACKOFF_MAX", 3600))
+# Done and failed jobs are expired this long after finishing (TTL index on finished_at, see app/indexes.py)
+JOB_RETENTION_DAYS = int(os.getenv("JOB_RETENTION_DAYS", 7))
+
+# A handler may return a dict, stored on the finished job as `result`
+Handler = Callable[[dict], Awaitable[Optional[dict]]]
+
+# job type -> (handler, on_failure); on_failure runs once when a job gives up
+HANDLERS: Dict[str, tuple] = {}
+
+_worker_tasks = []
+_wakeup: Optional[asyncio.Event] = None
+
+
+def register(job_type: str, on_failure: Handler = None):
+    """Decorator registering the coroutine that runs jobs of `job_type`."""
+    def decorator(fn: Handler) -> Handler:
+        HANDLERS[job_type] = (fn, on_failure)
+        return fn
+    return decorator
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Delay before retry number `attempts` (1-based), with +/-20% jitter."""
+    delay = min(JOB_BACKOFF_MAX, JOB_BACKOFF_BASE * (2 ** max(attempts - 1, 0)))
+    return delay * random.uniform(0.8, 1.2)
+
+
+async def enqueue(job_type: str, payload: dict, key: str = None, data: bytes = None,
+                  max_attempts: int = None, delay: float = 0) -> str:
+    """
+    Queue a job and return its id. `key` makes the call idempotent; `data`
+    carries a binary blob (e.g. image bytes) that is dropped once the job is done.
+    """
+    if job_type not in HANDLERS:
+        raise ValueError(f"No handler registered for job type {job_type!r}")
+    now = datetime.utcnow()
+    job_id = key or str(uuid.uuid4())
+    doc = {
+        "_id": job_id,
+        "type": job_type,
+        "payload": payload,
+        "status": "pending",
+        "attempts": 0,
+        "max_attempts": max_attempts or JOB_MAX_ATTEMPTS,
+        "run_at": now + timedelta(seconds=delay),
+        "locked_until": None,
+        "last_error": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+    if data is not None:
+        doc["data"] = data
+    try:
+        await jobs_collection.insert_one(doc)
+    except DuplicateKeyError:
+        return job_id
+    if _wakeup is not None and delay <= 0:
+        _wakeup.set()
+    return job_id
+
+
+async def find_active(job_type: str, payload_match: dict) -> Optional[dict]:
+    """A pending or running job of `job_type` whose payload matches, if any."""
+    query = {"type": job_type, "status": {"$in": ["pending", "running"]}}
+    query.update({f"payload.{field}": value for field, value in payload_match.items()})
+    return await jobs_collection.find_one(query, {"data": 0})
+
+
+async def release_key(key: str) -> bool:
+    """Drop a finished (done/failed) job so its idempotency key can be enqueued again."""
+    result = await jobs_collection.delete_one({"_id": key, "status": {"$in": ["done", "failed"]}})
+    return result.deleted_count > 0
+
+
+async def get_job(job_id: str) -> Optional[dict]:
+    return await jobs_collection.find_one({"_id": job_id}, {"data": 0})
+
+
+async def _claim(worker_id: str) -> Optional[dict]:
+    now = datetime.utcnow()
+    return await jobs_collection.find_one_and_update(
+        {
+            "$or": [
+                {"status": "pending", "run_at": {"$lte": now}},
+                # Lease expired: the worker that claimed it is gone.
+                {"status": "running", "locked_until": {"$lt": now}},
+            ]
+        },
+        {
+            "$set": {
+                "status": "running",
+                "locked_until": now + timedelta(seconds=JOB_LEASE_SECONDS),
+                "worker": worker_id,
+                "updated_at": now,
+            },
+            "$inc": {"attempts": 1},
+        },
+        sort=[("run_at", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def _run(job: dict, worker_id: str):
+    handler, on_failure = HANDLERS.get(job["type"], (None, None))
+    owned = {"_id": job["_id"], "worker": worker_id, "status": "running"}
+    try:
+        if handler is None:
+            raise RuntimeError(f"No handler registered for job type {job['type']!r}")
+        result = await handler(job)
+    except asyncio.CancelledError:
+        # Shutting down: hand the job back without counting the attempt.
+        await jobs_collection.update_one(
+            owned, {"$set": {"status": "pending", "locked_until": None}, "$inc": {"attempts": -1}}
+        )
+        raise
+    except Exception as e:
+        now = datetime.utcnow()
+        error = f"{type(e).__name__}: {e}"
+        if job["attempts"] >= job["max_attempts"]:
+            print(f"[Jobs] ❌ {job['type']} {job['_id']} failed permanently: {error}")
+            traceback.print_exc()
+            JOBS_PROCESSED.inc(job["type"], "failed")
+            await jobs_collection.update_one(
+                owned,
+                {"$set": {
+                    "status": "failed",
+                    "last_error": error,
+                    "locked_until": None,
+                    "finished_at": now,
+                    "updated_at": now,
+                }},
+            )
+            if on_failure is not None:
+                try:
+                    await on_failure(job)
+                except Exception as hook_error:
+                    print(f"[Jobs] on_failure for {job['_id']} raised: {hook_error}")
+        else:
+            delay = backoff_seconds(job["attempts"])
+            print(f"[Jobs] {job['type']} {job['_id']} attempt {job['attempts']} failed ({error}); retry in {delay:.0f}s")
+            JOBS_PROCESSED.inc(job["type"], "retry")
+            await jobs_collection.update_one(
+                owned,
+                {"$set": {
+                    "status": "pending",
+                    "run_at": now + timedelta(seconds=delay),
+                    "last_error": error,
+                    "locked_until": None,
+                    "updated_at": now,
+                }},
+            )
+        return
+
+    JOBS_PROCESSED.inc(job["type"], "done")
+    now = datetime.utcnow()
+    done = {"status": "done", "locked_until": None, "finished_at": now, "updated_at": now}
+    if result is not None:
+        done["result"] = result
+    await jobs_collection.update_one(owned, {"$set": done, "$unset": {"data": ""}})
+
+
+async def _worker(worker_id: str):
+    while True:
+        try:
+            job = await _claim(worker_id)
+        except Exception as e:
+            print(f"[Jobs] Claim failed: {e}")
+            job = None
+        if job is not None:
+            try:
+                await _run(job, worker_id)
+            except Exception as e:
+                # Bookkeeping failed (e.g. Mongo went away); the lease expires and the job is retried.
+                print(f"[Jobs] Worker {worker_id} failed to run {job['type']} {job['_id']}: {e}")
+                traceback.print_exc()
+            continue
+        _wakeup.clear()
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=JOB_POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+
+def start_workers(count: int = None):
+    """Start the worker tasks (called from the app lifespan)."""
+    global _wakeup
+    if _worker_tasks:
+        return
+    _wakeup = asyncio.Event()
+    prefix = uuid.uuid4().hex[:8]
+    for i in range(JOB_WORKERS if count is None else count):
+        _worker_tasks.append(asyncio.create_task(_worker(f"{prefix}-{i}")))
+
+
+async def stop_workers():
+    for task in _worker_tasks:
+        task.cancel()
+    for task in _worker_tasks:
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    _worker_tasks.clear()
+
+
+async def drain(timeout: float = None):
+    """
+    Run due jobs in the current task until none are left (scripts and local
+    checks, e.g. with IMAGE_CLIENT=local). Returns the number of jobs run.
+    """
+    worker_id = f"drain-{uuid.uuid4().hex[:8]}"
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else loop.time() + timeout
+    ran = 0
+    while deadline is None or loop.time() < deadline:
+        job = await _claim(worker_id)
+        if job is None:
+            break
+        await _run(job, worker_id)
+        ran += 1
+    return ran
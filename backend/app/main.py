@@ -1,17 +1,43 @@
 # backend/app/main.py
 import os
 import json
+import asyncio
+import shutil
+import tempfile
+import time
+import zipfile
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from fastapi.staticfiles import StaticFiles
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
+from urllib.parse import urlparse
 
-from .preprocessing import preprocess_image_bytes, load_model_from_path, predict_top
+import numpy as np
+
+from .preprocessing import (
+    IMG_SIZE,
+    decode_image_bytes,
+    preprocess_image,
+    preprocess_image_bytes,
+    load_model_from_path,
+    predict_top_batch,
+)
+from .batching import MicroBatcher
+from .model_server import RemoteModelClient
+from .prediction_cache import PredictionCache
+from .inference_backends import main_tflite_path, model_identity
+from .http_cache import PrecomputedJSON
+from . import auth, cloudinary_config, http_clients, indexes, jobs, metrics, pet_notes
+from .breed_tracking import SEARCH_BUFFER
+from .trending import LEADERBOARD
+from .metrics import PREDICT_IN_FLIGHT, PREDICT_REQUESTS, stage
 
 # --- Import routers ---
-from .routes import pets, history, settings, places, feedback, breeds  # <-- ADDED breeds
+from .routes import pets, history, settings, places, feedback, breeds, account  # <-- ADDED breeds
 
 # Load environment (expect backend/.env or backend/.env.example)
 BASE_DIR = Path(__file__).resolve().parent
@@ -19,10 +45,78 @@ load_dotenv(dotenv_path=BASE_DIR.parent.joinpath(".env"))
 
 MODEL_PATH = os.getenv("MODEL_PATH", str(BASE_DIR.joinpath("model/efficientnetv2b2_320.keras")))
 CONF_THRESHOLD = float(os.getenv("CONFIDENCE_THRESHOLD", 0.4))
+# Micro-batching: concurrent /predict calls are grouped into one forward pass
+PREDICT_MAX_BATCH_SIZE = int(os.getenv("PREDICT_MAX_BATCH_SIZE", 8))
+PREDICT_MAX_WAIT_MS = float(os.getenv("PREDICT_MAX_WAIT_MS", 10))
+# Shared model server (python -m app.model_server); when set, workers don't load the model
+MODEL_SERVER_ADDRESS = os.getenv("MODEL_SERVER_ADDRESS", "").strip()
+MODEL_SERVER_POOL_SIZE = int(os.getenv("MODEL_SERVER_POOL_SIZE", 4))
+# How often idle workers re-ask the model servers which model they serve (seconds)
+MODEL_SERVER_KEY_REFRESH = float(os.getenv("MODEL_SERVER_KEY_REFRESH", 30))
+# Prediction cache keyed by upload content ("sha256" exact bytes, "phash" near-identical images)
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", 1024))  # 0 disables
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", 3600))
+PREDICTION_CACHE_MODE = os.getenv("PREDICTION_CACHE_MODE", "sha256").strip().lower()
+# /predict/batch: images per forward pass, and limits on what one upload may contain
+PREDICT_BATCH_CHUNK = int(os.getenv("PREDICT_BATCH_CHUNK", 16))
+PREDICT_BATCH_MAX_FILES = int(os.getenv("PREDICT_BATCH_MAX_FILES", 500))
+PREDICT_BATCH_MAX_IMAGE_BYTES = int(os.getenv("PREDICT_BATCH_MAX_IMAGE_BYTES", 25 * 1024 * 1024))
+
+# Optional cascade: a small low-resolution model answers first; the main model runs
+# only when its top probability is below CASCADE_THRESHOLD (separate from CONF_THRESHOLD)
+CASCADE_MODEL_PATH = os.getenv("CASCADE_MODEL_PATH", "").strip()
+CASCADE_BACKEND = os.getenv("CASCADE_BACKEND", "keras").strip().lower()
+# Converted cascade model; defaults to <cascade stem>.tflite / _int8.tflite (TFLITE_MODEL_PATH is the main model's)
+CASCADE_TFLITE_PATH = os.getenv("CASCADE_TFLITE_PATH", "").strip() or None
+CASCADE_THRESHOLD = float(os.getenv("CASCADE_THRESHOLD", 0.85))
+CASCADE_IMG_SIZE = int(os.getenv("CASCADE_IMG_SIZE", 224))
+# Model loading happens in the background at startup; /predict answers 503 until ready
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "1").strip().lower() in ("1", "true", "yes")
+MODEL_RETRY_AFTER = int(os.getenv("MODEL_RETRY_AFTER", 5))
 
 BREED_INFO_PATH = BASE_DIR.joinpath("breed_info_final.json")
 
-app = FastAPI(title="Dog Breed Classifier API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # CRUD routers are served immediately; TensorFlow + model load run in the background.
+    load_tasks = [asyncio.create_task(_load_model_in_background())]
+    if CASCADE_MODEL_PATH and REMOTE_MODEL is not None:
+        # Workers in model-server mode hold no models; the cascade would load one into each.
+        print("[Model] CASCADE_MODEL_PATH is ignored with MODEL_SERVER_ADDRESS (cascade disabled)")
+    elif CASCADE_MODEL_PATH:
+        load_tasks.append(asyncio.create_task(_load_cascade_model()))
+    auth.start_jwks_refresh()
+    await http_clients.start_clients()
+    startup_tasks = [
+        asyncio.create_task(_run_startup_step("indexes", indexes.ensure_indexes)),
+        asyncio.create_task(_run_startup_step("pet notes migration", pet_notes.enqueue_migration)),
+    ]
+    jobs.start_workers()
+    SEARCH_BUFFER.start()
+    LEADERBOARD.start()
+    yield
+    for task in startup_tasks:
+        task.cancel()
+    await jobs.stop_workers()
+    await LEADERBOARD.stop()
+    await SEARCH_BUFFER.stop()
+    for task in load_tasks:
+        task.cancel()
+    await auth.stop_jwks_refresh()
+    await http_clients.close_clients()
+    await BATCHER.stop()
+    await CASCADE_BATCHER.stop()
+    if REMOTE_MODEL is not None:
+        await REMOTE_MODEL.close()
+
+async def _run_startup_step(name, step):
+    """Run a non-critical startup coroutine in the background, logging failures."""
+    try:
+        await step()
+    except Exception as e:
+        print(f"[Startup] {name} failed: {e}")
+
+app = FastAPI(title="Dog Breed Classifier API", lifespan=lifespan)
 
 # Allow CORS from dev frontend (adjust origin as needed)
 app.add_middleware(
@@ -31,6 +125,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 # --- Register routers ---
@@ -40,6 +135,16 @@ app.include_router(settings.router)
 app.include_router(places.router)
 app.include_router(feedback.router)
 app.include_router(breeds.router)  # <-- ADDED breeds router
+app.include_router(account.router)
+
+# IMAGE_CLIENT=local: serve the stored images at the URLs LocalImageClient hands out
+if cloudinary_config.IMAGE_CLIENT == "local":
+    Path(cloudinary_config.LOCAL_IMAGE_DIR).mkdir(parents=True, exist_ok=True)
+    app.mount(
+        urlparse(cloudinary_config.LOCAL_IMAGE_BASE_URL).path.rstrip("/") or "/local-images",
+        StaticFiles(directory=cloudinary_config.LOCAL_IMAGE_DIR),
+        name="local-images",
+    )
 
 # Load breed info
 if not BREED_INFO_PATH.exists():
@@ -63,20 +168,117 @@ for item in BREED_JSON.get("breeds", []):
     ID_TO_NAME[idx] = name
     ID_TO_PRETTY[idx] = prettify(name)
 
-# Load model
+# Model state: "loading" -> "ready" | "failed". Filled in by _load_model_in_background.
 MODEL = None
-try:
-    MODEL = load_model_from_path(MODEL_PATH)
-except Exception as e:
-    # keep MODEL as None; /predict will return 501 if model missing
-    print("Model load failed:", e)
-    MODEL = None
+MODEL_STATUS = "loading"
+MODEL_ERROR = None
+LOCAL_MODEL_KEY = None
+CASCADE_MODEL = None
+CASCADE_MODEL_KEY = None
+REMOTE_MODEL = None
+if MODEL_SERVER_ADDRESS:
+    REMOTE_MODEL = RemoteModelClient(
+        [a.strip() for a in MODEL_SERVER_ADDRESS.split(",") if a.strip()],
+        pool_size=MODEL_SERVER_POOL_SIZE,
+    )
 
-@app.get("/breeds")
-def get_breeds():
-    """
-    Return list of breeds with id, canonical name, pretty_name.
-    """
+async def _load_cascade_model():
+    """Load the optional small first-stage model; the cascade stays off if it fails."""
+    global CASCADE_MODEL, CASCADE_MODEL_KEY
+    try:
+        model = await asyncio.to_thread(load_model_from_path, CASCADE_MODEL_PATH, CASCADE_BACKEND, CASCADE_TFLITE_PATH)
+        if MODEL_WARMUP:
+            warmup = np.zeros((1, CASCADE_IMG_SIZE, CASCADE_IMG_SIZE, 3), dtype="float32")
+            await asyncio.to_thread(predict_top_batch, model, warmup)
+    except Exception as e:
+        print("Cascade model load failed (cascade disabled):", e)
+        return
+    CASCADE_MODEL = model
+    CASCADE_MODEL_KEY = model_identity(CASCADE_MODEL_PATH, CASCADE_BACKEND, CASCADE_TFLITE_PATH)
+    print(f"[Model] Cascade model {CASCADE_MODEL_PATH} ready (threshold {CASCADE_THRESHOLD})")
+
+async def _load_model_in_background():
+    """Import TensorFlow and load (and warm up) the model without blocking startup."""
+    global MODEL, MODEL_STATUS, MODEL_ERROR, LOCAL_MODEL_KEY
+    started = time.perf_counter()
+
+    if REMOTE_MODEL is not None:
+        # Nothing to load locally; ready once the model server answers.
+        while not await REMOTE_MODEL.ping():
+            await asyncio.sleep(2)
+        MODEL_STATUS = "ready"
+        print(f"[Model] Model server reachable after {time.perf_counter() - started:.1f}s")
+        # Cache hits never reach the model server, so keep its identity fresh
+        # even when every /predict is answered from the cache.
+        while True:
+            await REMOTE_MODEL.refresh_model_key()
+            PREDICTION_CACHE.set_model_key(_current_model_key())
+            await asyncio.sleep(MODEL_SERVER_KEY_REFRESH)
+
+    try:
+        model = await asyncio.to_thread(load_model_from_path, MODEL_PATH, None, main_tflite_path())
+        if MODEL_WARMUP:
+            # First call builds the graph / allocates buffers; pay that before serving.
+            warmup = np.zeros((1, IMG_SIZE[0], IMG_SIZE[1], 3), dtype="float32")
+            await asyncio.to_thread(predict_top_batch, model, warmup)
+    except Exception as e:
+        # keep MODEL as None; /predict will return 501 if model missing
+        print("Model load failed:", e)
+        MODEL_STATUS = "failed"
+        MODEL_ERROR = str(e)
+        return
+
+    MODEL = model
+    LOCAL_MODEL_KEY = model_identity(MODEL_PATH, tflite_path=main_tflite_path())
+    MODEL_STATUS = "ready"
+    print(f"[Model] Loaded {MODEL_PATH} in {time.perf_counter() - started:.1f}s")
+
+def _require_model():
+    """503 + Retry-After while the model is loading, 501 if it could not be loaded."""
+    if MODEL_STATUS == "loading":
+        raise HTTPException(
+            status_code=503,
+            detail="Model is still loading. Please retry shortly.",
+            headers={"Retry-After": str(MODEL_RETRY_AFTER)},
+        )
+    if MODEL_STATUS != "ready":
+        raise HTTPException(status_code=501, detail="Model not loaded on server.")
+
+async def _run_model_batch(batch):
+    if REMOTE_MODEL is not None:
+        with stage("model_server"):
+            return await REMOTE_MODEL.predict_batch(batch)
+    # model.predict is blocking; keep it off the event loop
+    return await asyncio.to_thread(predict_top_batch, MODEL, batch)
+
+BATCHER = MicroBatcher(
+    _run_model_batch,
+    max_batch_size=PREDICT_MAX_BATCH_SIZE,
+    max_wait_ms=PREDICT_MAX_WAIT_MS,
+)
+
+PREDICTION_CACHE = PredictionCache(
+    max_entries=PREDICTION_CACHE_SIZE,
+    ttl_seconds=PREDICTION_CACHE_TTL,
+    mode=PREDICTION_CACHE_MODE,
+)
+async def _run_cascade_batch(batch):
+    return await asyncio.to_thread(predict_top_batch, CASCADE_MODEL, batch)
+
+CASCADE_BATCHER = MicroBatcher(
+    _run_cascade_batch,
+    max_batch_size=PREDICT_MAX_BATCH_SIZE,
+    max_wait_ms=PREDICT_MAX_WAIT_MS,
+)
+
+def _current_model_key():
+    key = REMOTE_MODEL.model_key if REMOTE_MODEL is not None else LOCAL_MODEL_KEY
+    if CASCADE_MODEL is not None:
+        # Cached answers depend on the cascade model and threshold too.
+        key = f"{key}+cascade:{CASCADE_MODEL_KEY}@{CASCADE_THRESHOLD}"
+    return key
+
+def _breeds_payload() -> dict:
     out = []
     for item in BREED_JSON.get("breeds", []):
         idx = int(item["id"])
@@ -87,40 +289,330 @@ def get_breeds():
         })
     return {"breeds": out}
 
+# Breed data only changes with a deploy: serialize once, revalidate by ETag after an hour.
+BREEDS_RESPONSE = PrecomputedJSON(_breeds_payload(), "public, max-age=3600")
+
+@app.get("/breeds")
+def get_breeds(request: Request):
+    """
+    Return list of breeds with id, canonical name, pretty_name.
+    """
+    return BREEDS_RESPONSE.respond(request)
+
+@app.get("/healthz")
+def healthz():
+    """Liveness: the process is up and serving (model may still be loading)."""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+def readyz():
+    """Readiness: 200 once the model is loaded, 503 otherwise."""
+    body = {"status": MODEL_STATUS}
+    if MODEL_ERROR:
+        body["error"] = MODEL_ERROR
+    if MODEL_STATUS == "loading":
+        return JSONResponse(body, status_code=503, headers={"Retry-After": str(MODEL_RETRY_AFTER)})
+    if MODEL_STATUS != "ready":
+        return JSONResponse(body, status_code=503)
+    return body
+
+def _cache_gauge(field):
+    return lambda: PREDICTION_CACHE.stats()[field]
+
+for _field in ("hits", "misses", "coalesced", "evictions", "size"):
+    metrics.Gauge(f"pawdentify_prediction_cache_{_field}", f"Prediction cache {_field}.", fn=_cache_gauge(_field))
+metrics.Gauge("pawdentify_predict_batches", "Forward passes run by the /predict micro-batcher.", fn=lambda: BATCHER.batches)
+metrics.Gauge("pawdentify_predict_batch_queued", "Requests waiting in the /predict micro-batcher.", fn=lambda: BATCHER.stats()["queued"])
+metrics.Gauge("pawdentify_model_ready", "1 once the model is loaded and /predict can serve.", fn=lambda: int(MODEL_STATUS == "ready"))
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """
+    Prometheus text exposition: per-stage /predict latency histograms,
+    request counts by outcome, in-flight predictions, process memory.
+    """
+    return PlainTextResponse(metrics.render_latest(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/predict/stats")
+def predict_stats():
+    """
+    Return micro-batching numbers (batch sizes, queue wait) and prediction
+    cache counters (hits, misses, coalesced, evictions) for /predict.
+    """
+    out = {"batching": BATCHER.stats(), "cache": PREDICTION_CACHE.stats()}
+    if CASCADE_MODEL is not None:
+        out["cascade_batching"] = CASCADE_BATCHER.stats()
+    return out
+
+# /predict outcome label per HTTP error status
+_PREDICT_OUTCOMES = {
+    400: "invalid_image",
+    500: "prediction_failed",
+    501: "no_model",
+    503: "model_loading",
+}
+
 @app.post("/predict")
 async def predict(file: UploadFile = File(...)):
     """
     Accept an image file. If top prediction confidence >= CONF_THRESHOLD,
     return id, pretty name, confidence, and low_confidence flag.
     """
-    if MODEL is None:
-        raise HTTPException(status_code=501, detail="Model not loaded on server.")
+    PREDICT_IN_FLIGHT.inc()
+    try:
+        payload = await _predict_upload(file)
+    except HTTPException as e:
+        PREDICT_REQUESTS.inc(_PREDICT_OUTCOMES.get(e.status_code, str(e.status_code)))
+        raise
+    except Exception:
+        PREDICT_REQUESTS.inc("error")
+        raise
+    finally:
+        PREDICT_IN_FLIGHT.dec()
 
-    contents = await file.read()
+    PREDICT_REQUESTS.inc("low_confidence" if payload["low_confidence"] else "ok")
+    return JSONResponse(payload)
+
+async def _predict_upload(file: UploadFile) -> dict:
+    _require_model()
+
+    with stage("read"):
+        contents = await file.read()
+    model_key = _current_model_key()
+    if model_key is None:
+        # The model server hasn't said which model it serves; don't cache blind.
+        return _prediction_payload(*await _classify(contents))
+    PREDICTION_CACHE.set_model_key(model_key)
     try:
-        img_arr = preprocess_image_bytes(contents)
+        if PREDICTION_CACHE.mode == "phash":
+            cache_key = await asyncio.to_thread(PREDICTION_CACHE.key_for, contents)
+        else:
+            cache_key = PREDICTION_CACHE.key_for(contents)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid image: {e}")
 
+    top_idx, top_prob, stage_name = await PREDICTION_CACHE.get_or_compute(cache_key, lambda: _classify(contents))
+    return _prediction_payload(top_idx, top_prob, stage_name)
+
+async def _classify(contents: bytes):
+    """
+    Preprocess + run the model(s) for one upload and return
+    (top_idx, top_prob, stage); raises HTTPException on failure.
+    """
+    if CASCADE_MODEL is None:
+        try:
+            img_arr = await asyncio.to_thread(preprocess_image_bytes, contents)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Invalid image: {e}")
+        try:
+            top_idx, top_prob = await BATCHER.submit(img_arr)   # <-- top_idx is already 0-based
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Prediction failed: {e}")
+        return top_idx, top_prob, "full"
+
+    # Cascade: decode once, try the small model, fall back to the full model when unsure.
+    try:
+        img = await asyncio.to_thread(decode_image_bytes, contents)
+        small_arr = await asyncio.to_thread(preprocess_image, img, None, (CASCADE_IMG_SIZE, CASCADE_IMG_SIZE))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid image: {e}")
     try:
-        top_idx, top_prob = predict_top(MODEL, img_arr)   # <-- top_idx is already 0-based
+        top_idx, top_prob = await CASCADE_BATCHER.submit(small_arr)
+        if top_prob >= CASCADE_THRESHOLD:
+            return top_idx, top_prob, "cascade"
+        img_arr = await asyncio.to_thread(preprocess_image, img)
+        top_idx, top_prob = await BATCHER.submit(img_arr)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction failed: {e}")
+    return top_idx, top_prob, "full"
 
+def _prediction_payload(top_idx: int, top_prob: float, stage: str = "full") -> dict:
+    """
+    Shape a (top_idx, top_prob) result the way /predict returns it.
+    `stage` says which model answered: "cascade" (small model) or "full".
+    """
     # --- MODIFIED: Always return confidence score ---
     if top_prob >= CONF_THRESHOLD:
         pretty = ID_TO_PRETTY.get(top_idx, ID_TO_NAME.get(top_idx, "Unknown"))
-        return JSONResponse({
+        return {
             "low_confidence": False,
             "prediction": pretty,
             "prediction_id": int(top_idx),   # <-- added id
-            "confidence": round(float(top_prob), 4)
-        })
+            "confidence": round(float(top_prob), 4),
+            "stage": stage
+        }
     else:
-        return JSONResponse({
+        return {
             "low_confidence": True,
             "prediction_id": int(top_idx),  # still return id for debugging
             "prediction": ID_TO_PRETTY.get(top_idx, "Unknown"),
-            "confidence": round(float(top_prob), 4)
-        })
+            "confidence": round(float(top_prob), 4),
+            "stage": stage
+        }
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp", ".gif", ".tif", ".tiff")
+
+def _is_zip_upload(upload: UploadFile) -> bool:
+    name = (upload.filename or "").lower()
+    return name.endswith(".zip") or upload.content_type in ("application/zip", "application/x-zip-compressed")
+
+def _copy_capped(src, dst, limit: int) -> bool:
+    """Copy src into dst, stopping once more than `limit` bytes were seen; False if it was cut off."""
+    copied = 0
+    while chunk := src.read(1024 * 1024):
+        copied += len(chunk)
+        if copied > limit:
+            return False
+        dst.write(chunk)
+    return True
+
+def _spool_uploads(files: List[UploadFile]):
+    """
+    Copy uploads into temp files owned by the response stream: FastAPI may
+    close UploadFiles as soon as the handler returns, before streaming starts.
+    Returns [(filename, is_zip, file)]; small files stay in memory. Plain
+    images over PREDICT_BATCH_MAX_IMAGE_BYTES are not kept (file is None).
+    """
+    spooled = []
+    try:
+        for upload in files:
+            is_zip = _is_zip_upload(upload)
+            spool = tempfile.SpooledTemporaryFile(max_size=PREDICT_BATCH_MAX_IMAGE_BYTES)
+            spooled.append((upload.filename, is_zip, spool))
+            upload.file.seek(0)
+            if is_zip:
+                shutil.copyfileobj(upload.file, spool)
+            elif not _copy_capped(upload.file, spool, PREDICT_BATCH_MAX_IMAGE_BYTES):
+                spool.close()
+                spooled[-1] = (upload.filename, is_zip, None)
+                continue
+            spool.seek(0)
+    except BaseException:
+        for _, _, spool in spooled:
+            if spool is not None:
+                spool.close()
+        raise
+    return spooled
+
+def _too_large():
+    raise ValueError(f"image larger than {PREDICT_BATCH_MAX_IMAGE_BYTES} bytes")
+
+def _iter_batch_sources(spooled):
+    """
+    Yield (filename, read) pairs lazily; `read()` returns the image bytes.
+    Zip archives are expanded member by member, never fully into memory.
+    """
+    for filename, is_zip, spool in spooled:
+        if is_zip:
+            archive = zipfile.ZipFile(spool)
+            for info in archive.infolist():
+                if info.is_dir() or not info.filename.lower().endswith(IMAGE_EXTENSIONS):
+                    continue
+                if info.file_size > PREDICT_BATCH_MAX_IMAGE_BYTES:
+                    read = _too_large
+                else:
+                    def read(archive=archive, info=info):
+                        return archive.read(info)
+                yield info.filename, read
+        elif spool is None:
+            yield filename, _too_large
+        else:
+            def read(spool=spool):
+                spool.seek(0)
+                return spool.read()
+            yield filename, read
+
+def _load_and_preprocess(read):
+    return preprocess_image_bytes(read())
+
+async def _preprocess_chunk(chunk):
+    """Decode + preprocess one chunk of sources in parallel worker threads."""
+    return await asyncio.gather(
+        *(asyncio.to_thread(_load_and_preprocess, read) for _, _, read in chunk),
+        return_exceptions=True,
+    )
+
+async def _stream_batch_predictions(spooled):
+    sources = enumerate(_iter_batch_sources(spooled))
+    truncated = False
+
+    def next_chunk():
+        nonlocal truncated
+        chunk = []
+        for index, (filename, read) in sources:
+            if index >= PREDICT_BATCH_MAX_FILES:
+                truncated = True
+                break
+            chunk.append((index, filename, read))
+            if len(chunk) >= PREDICT_BATCH_CHUNK:
+                break
+        return chunk
+
+    pending = None
+    try:
+        try:
+            chunk = next_chunk()
+        except zipfile.BadZipFile as e:
+            yield json.dumps({"error": f"Invalid zip archive: {e}"}) + "\n"
+            return
+        pending = asyncio.create_task(_preprocess_chunk(chunk)) if chunk else None
+
+        while pending is not None:
+            arrays = await pending
+            current = chunk
+            # Start decoding the next chunk while this one runs through the model.
+            try:
+                chunk = next_chunk()
+            except zipfile.BadZipFile as e:
+                chunk = []
+                yield json.dumps({"error": f"Invalid zip archive: {e}"}) + "\n"
+            pending = asyncio.create_task(_preprocess_chunk(chunk)) if chunk else None
+
+            ok = [(item, arr) for item, arr in zip(current, arrays) if not isinstance(arr, BaseException)]
+            results = {}
+            error = None
+            if ok:
+                try:
+                    batch = np.concatenate([arr for _, arr in ok], axis=0)
+                    for (item, _), result in zip(ok, await _run_model_batch(batch)):
+                        results[item[0]] = result
+                except Exception as e:
+                    error = f"Prediction failed: {e}"
+
+            for (index, filename, _), arr in zip(current, arrays):
+                line = {"index": index, "filename": filename}
+                if isinstance(arr, BaseException):
+                    line["error"] = f"Invalid image: {arr}"
+                elif error is not None:
+                    line["error"] = error
+                else:
+                    line.update(_prediction_payload(*results[index]))
+                yield json.dumps(line) + "\n"
+
+        if truncated:
+            yield json.dumps({
+                "error": f"Only the first {PREDICT_BATCH_MAX_FILES} images were processed",
+                "truncated": True,
+                "max_files": PREDICT_BATCH_MAX_FILES,
+            }) + "\n"
+    finally:
+        # Client gone (or done): stop decoding ahead and release the spooled uploads.
+        if pending is not None and not pending.done():
+            pending.cancel()
+        for _, _, spool in spooled:
+            if spool is not None:
+                spool.close()
+
+@app.post("/predict/batch")
+async def predict_batch(files: List[UploadFile] = File(...)):
+    """
+    Accept many image files (or one zip archive of images) and stream one
+    NDJSON line per image as soon as its batch has been classified.
+    Each line has the /predict fields plus `index` and `filename`,
+    or an `error` for images that could not be processed. Past
+    PREDICT_BATCH_MAX_FILES images, a final line with `truncated: true` says so.
+    """
+    _require_model()
 
+    spooled = await asyncio.to_thread(_spool_uploads, files)
+    return StreamingResponse(_stream_batch_predictions(spooled), media_type="application/x-ndjson")
@@ -0,0 +1,232 @@
+# backend/app/mappls.py
+"""
+Mappls client: OAuth tokens and Nearby search across several API accounts.
+
+Token refresh is single-flight per account: concurrent requests wait for one
+OAuth call and share its outcome, failures included. The scheduler remembers 429/401 outcomes: an account that hits
+its daily quota is parked until the next quota reset, one whose credentials
+fail is parked for a short cool-down, and requests go straight to the first
+healthy account instead of learning about exhaustion from a wasted call.
+"""
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+from .http_clients import get_client
+
+# Daily quotas reset at this UTC time (default 18:30 UTC = midnight IST)
+MAPPLS_QUOTA_RESET_UTC = os.getenv("MAPPLS_QUOTA_RESET_UTC", "18:30")
+# Cool-down after auth failures (bad credentials, OAuth endpoint errors)
+MAPPLS_AUTH_COOLDOWN = float(os.getenv("MAPPLS_AUTH_COOLDOWN", 300))
+
+
+def _next_quota_reset(now: float = None) -> float:
+    """Epoch seconds of the next daily quota reset."""
+    hour, minute = (int(v) for v in MAPPLS_QUOTA_RESET_UTC.split(":"))
+    current = datetime.fromtimestamp(now or time.time(), tz=timezone.utc)
+    reset = current.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if reset <= current:
+        reset += timedelta(days=1)
+    return reset.timestamp()
+
+
+class MapplsAccount:
+    def __init__(self, index: int, name: str, client_id: str, client_secret: str):
+        self.index = index
+        self.name = name
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.token = None
+        self.token_expires_at = 0.0
+        self.unavailable_until = 0.0
+        self.unavailable_reason = None
+        self.quota_exhausted = False
+        self._token_lock = asyncio.Lock()
+        # Bumped by every finished refresh attempt, successful or not
+        self._token_generation = 0
+
+        # Usage counters (see usage())
+        self.requests = 0
+        self.successes = 0
+        self.rate_limited = 0
+        self.unauthorized = 0
+        self.errors = 0
+        self.token_refreshes = 0
+        self.last_used = None
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.client_id and self.client_secret)
+
+    def healthy(self, now: float = None) -> bool:
+        return self.configured and (now or time.time()) >= self.unavailable_until
+
+    def park(self, until: float, reason: str, quota_exhausted: bool = False):
+        self.unavailable_until = until
+        self.unavailable_reason = reason
+        self.quota_exhausted = quota_exhausted
+        resume = datetime.fromtimestamp(until, tz=timezone.utc).isoformat()
+        print(f"[Mappls] {self.name} parked until {resume} ({reason})")
+
+    async def get_token(self, force: bool = False):
+        """
+        Return a valid access token (None if the refresh failed). Concurrent
+        callers share one refresh: whoever queued behind a refresh gets its
+        outcome, success or failure, instead of sending another OAuth call.
+        """
+        if not force and self.token and self.token_expires_at > time.time():
+            return self.token
+        generation = self._token_generation
+        async with self._token_lock:
+            if self._token_generation != generation:
+                # A refresh finished while we waited: use its result.
+                return self.token if self.token and self.token_expires_at > time.time() else None
+
+            print(f"[Auth] Requesting new token from {self.name}...")
+            self.token_refreshes += 1
+            self.token = None
+            try:
+                client = get_client("mappls_oauth")
+                response = await client.post(
+                    "/api/security/oauth/token",
+                    data={
+                        "grant_type": "client_credentials",
+                        "client_id": self.client_id,
+                        "client_secret": self.client_secret
+                    },
+                    headers={"Content-Type": "application/x-www-form-urlencoded"}
+                )
+                print(f"[Auth] {self.name} token response: {response.status_code}")
+                if response.status_code != 200:
+                    print(f"[Auth] ❌ {self.name} failed: {response.text[:200]}")
+                    return None
+
+                data = response.json()
+                self.token = data.get("access_token")
+                self.token_expires_at = time.time() + data.get("expires_in", 3600) - 60
+                print(f"[Auth] ✅ Got token from {self.name}")
+                return self.token
+            finally:
+                self._token_generation += 1
+
+
+# Primary and fallback credentials
+MAPPLS_ACCOUNTS = [
+    MapplsAccount(0, "Primary", os.getenv("MAPPLS_CLIENT_ID"), os.getenv("MAPPLS_CLIENT_SECRET")),
+    MapplsAccount(1, "Fallback 1", os.getenv("MAPPLS_CLIENT_ID_2"), os.getenv("MAPPLS_CLIENT_SECRET_2")),
+    MapplsAccount(2, "Fallback 2", os.getenv("MAPPLS_CLIENT_ID_3"), os.getenv("MAPPLS_CLIENT_SECRET_3")),
+]
+
+
+def healthy_accounts():
+    now = time.time()
+    return [account for account in MAPPLS_ACCOUNTS if account.healthy(now)]
+
+
+async def nearby_search(keyword: str, lat: float, lon: float, radius: int, page: int = 1) -> dict:
+    """
+    Call the Nearby API on the first healthy account, moving on when an
+    account is rate limited or rejected. Returns {"status": ...} with
+    status "ok" (+ "results", "page_info", "account"), "no_results", "rate_limited",
+    "authentication_failed" or "api_error" (+ "code").
+    """
+    params = {
+        "keywords": keyword,
+        "refLocation": f"{lat},{lon}",
+        "radius": radius,
+        "page": page
+    }
+    saw_rate_limit = False
+    client = get_client("mappls_atlas")
+
+    for account in healthy_accounts():
+        try:
+            token = await account.get_token()
+        except Exception as e:
+            account.errors += 1
+            print(f"[Auth] ❌ {account.name} exception: {str(e)}")
+            continue
+        if not token:
+            account.park(time.time() + MAPPLS_AUTH_COOLDOWN, "token request failed")
+            continue
+
+        unauthorized_counted = False
+        for attempt in range(2):
+            account.requests += 1
+            account.last_used = time.time()
+            try:
+                response = await client.get(
+                    "/api/places/nearby/json",
+                    params=params,
+                    headers={"Authorization": f"Bearer {token}"},
+                )
+            except Exception:
+                account.errors += 1
+                raise
+            if response.status_code != 401 or attempt == 1:
+                break
+            # Token may have been revoked early; refresh once and retry.
+            account.unauthorized += 1
+            unauthorized_counted = True
+            token = await account.get_token(force=True)
+            if not token:
+                break
+
+        print(f"[Places] {account.name} Nearby status: {response.status_code} (page {page})")
+        if response.status_code == 429:
+            account.rate_limited += 1
+            saw_rate_limit = True
+            account.park(_next_quota_reset(), "daily limit exceeded (429)", quota_exhausted=True)
+            continue
+        if response.status_code == 401:
+            if not unauthorized_counted:
+                account.unauthorized += 1
+            account.park(time.time() + MAPPLS_AUTH_COOLDOWN, "unauthorized (401)")
+            continue
+        if response.status_code == 204:
+            account.successes += 1
+            return {"status": "no_results", "account": account.name}
+        if response.status_code != 200:
+            account.errors += 1
+            print(f"[Places] Response Body: {response.text[:500]}")
+            return {"status": "api_error", "code": response.status_code, "account": account.name}
+
+        account.successes += 1
+        data = response.json()
+        return {
+            "status": "ok",
+            "results": data.get("suggestedLocations", []),
+            "page_info": data.get("pageInfo") or {},
+            "account": account.name,
+        }
+
+    now = time.time()
+    if saw_rate_limit or any(a.configured and not a.healthy(now) and a.quota_exhausted for a in MAPPLS_ACCOUNTS):
+        return {"status": "rate_limited"}
+    return {"status": "authentication_failed"}
+
+
+def usage() -> list:
+    now = time.time()
+    out = []
+    for account in MAPPLS_ACCOUNTS:
+        out.append({
+            "name": account.name,
+            "configured": account.configured,
+            "healthy": account.healthy(now),
+            "unavailable_until": (
+                datetime.fromtimestamp(account.unavailable_until, tz=timezone.utc).isoformat()
+                if account.unavailable_until > now else None
+            ),
+            "unavailable_reason": account.unavailable_reason if account.unavailable_until > now else None,
+            "requests": account.requests,
+            "successes": account.successes,
+            "rate_limited": account.rate_limited,
+            "unauthorized": account.unauthorized,
+            "errors": account.errors,
+            "token_refreshes": account.token_refreshes,
+            "token_valid": bool(account.token and account.token_expires_at > now),
+            "last_used": datetime.fromtimestamp(account.last_used, tz=timezone.utc).isoformat() if account.last_used else None,
+        })
+    return out
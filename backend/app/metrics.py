@@ -0,0 +1,211 @@
+# backend/app/metrics.py
+"""
+Minimal in-process metrics rendered in Prometheus text format at /metrics.
+Recording is a perf_counter() pair plus a locked bucket increment, cheap
+enough to leave on in production.
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Tuple
+
+# Latency buckets (seconds) covering ~0.1 ms decode steps up to multi-second inference.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_REGISTRY = []
+
+
+def _fmt_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name, self.help, self.labelnames = name, help_text, tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+        _REGISTRY.append(self)
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        # Snapshot under the lock: inc() runs on worker threads (to_thread, batcher).
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in sorted(values):
+            yield f"{self.name}{_fmt_labels(self.labelnames, labels)} {_fmt_value(value)}"
+
+
+class Gauge:
+    """Settable gauge, or a callback gauge when `fn` is given."""
+
+    def __init__(self, name: str, help_text: str, fn: Callable[[], float] = None):
+        self.name, self.help, self.fn = name, help_text, fn
+        self._value = 0
+        self._lock = threading.Lock()
+        _REGISTRY.append(self)
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1):
+        self.inc(-amount)
+
+    def set(self, value: float):
+        with self._lock:
+            self._value = value
+
+    def render(self) -> Iterable[str]:
+        if self.fn is not None:
+            value = self.fn()
+        else:
+            with self._lock:
+                value = self._value
+        if value is None:
+            return
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} gauge"
+        yield f"{self.name} {_fmt_value(value)}"
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.labelnames = name, help_text, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], list] = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+        _REGISTRY.append(self)
+
+    def observe(self, value: float, *labels: str):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            if i < len(self.buckets):
+                series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, *labels: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            snapshot = [(labels, list(series)) for labels, series in self._series.items()]
+        for labels, series in sorted(snapshot):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = 'le="%s"' % _fmt_value(float(bound))
+                yield f"{self.name}_bucket{_fmt_labels(self.labelnames, labels, le)} {cumulative}"
+            le = 'le="+Inf"'
+            yield f"{self.name}_bucket{_fmt_labels(self.labelnames, labels, le)} {series[-1]}"
+            yield f"{self.name}_sum{_fmt_labels(self.labelnames, labels)} {_fmt_value(series[-2])}"
+            yield f"{self.name}_count{_fmt_labels(self.labelnames, labels)} {series[-1]}"
+
+
+def process_resident_memory_bytes():
+    """Current RSS from /proc on Linux, falling back to peak RSS elsewhere."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        try:
+            import resource
+            import sys
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return peak if sys.platform == "darwin" else peak * 1024
+        except Exception:
+            return None
+
+
+def render_latest() -> str:
+    lines = []
+    for metric in _REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# --- Prediction hot path ---------------------------------------------------
+
+PREDICT_STAGE_SECONDS = Histogram(
+    "pawdentify_predict_stage_seconds",
+    "Time spent per /predict stage (read, decode, resize, preprocess_input, model_predict, softmax, ...).",
+    ("stage",),
+)
+PREDICT_REQUESTS = Counter(
+    "pawdentify_predict_requests_total",
+    "Prediction requests by outcome.",
+    ("outcome",),
+)
+PREDICT_IN_FLIGHT = Gauge(
+    "pawdentify_predict_in_flight",
+    "Predictions currently being processed.",
+)
+PROCESS_MEMORY = Gauge(
+    "process_resident_memory_bytes",
+    "Resident memory size in bytes.",
+    fn=process_resident_memory_bytes,
+)
+PROCESS_START = Gauge(
+    "process_start_time_seconds",
+    "Start time of the process since unix epoch in seconds.",
+)
+PROCESS_START.set(time.time())
+
+
+def stage(name: str):
+    """Context manager timing one prediction stage."""
+    return PREDICT_STAGE_SECONDS.time(name)
+
+
+# --- Image uploads (Cloudinary) ---------------------------------------------
+
+IMAGE_UPLOAD_SECONDS = Histogram(
+    "pawdentify_image_upload_seconds",
+    "Time spent per image-upload operation (recompress, upload, delete).",
+    ("operation",),
+)
+IMAGE_UPLOAD_BYTES = Counter(
+    "pawdentify_image_upload_bytes_total",
+    "Image bytes received from clients (original) and sent to Cloudinary (uploaded).",
+    ("kind",),
+)
+IMAGE_UPLOADS = Counter(
+    "pawdentify_image_uploads_total",
+    "Cloudinary operations by outcome.",
+    ("operation", "outcome"),
+)
+
+
+# --- Background jobs ---------------------------------------------------------
+
+JOBS_PROCESSED = Counter(
+    "pawdentify_jobs_total",
+    "Background job attempts by type and outcome (done, retry, failed).",
+    ("type", "outcome"),
+)
@@ -0,0 +1,224 @@
+# backend/app/model_server.py
+"""
+Standalone inference process that holds the model once and serves
+preprocessed tensors from any number of API workers.
+
+Run from backend/:
+    python -m app.model_server --address unix:/tmp/pawdentify-model.sock
+
+API workers then set MODEL_SERVER_ADDRESS to the same address (comma-separate
+several addresses to spread load over a small pool of model servers).
+
+Wire format (both directions): 4-byte big-endian header length, a JSON header,
+then `nbytes` of raw payload.
+  request header:  {"shape": [B, H, W, 3], "dtype": "float32", "nbytes": N}
+  response header: {"results": [[top_idx, top_prob], ...], "model_key": "..."}
+                   or {"error": "..."}
+A request with an empty shape is a ping and gets back {"results": []}.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import struct
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+_HEADER = struct.Struct("!I")
+
+
+def parse_address(address: str):
+    """Return ("unix", path) or ("tcp", (host, port)) for an address string."""
+    if address.startswith("unix:"):
+        return "unix", address[len("unix:"):]
+    host, _, port = address.rpartition(":")
+    return "tcp", (host or "127.0.0.1", int(port))
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> Tuple[dict, bytes]:
+    (hlen,) = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    header = json.loads(await reader.readexactly(hlen))
+    nbytes = int(header.get("nbytes", 0))
+    payload = await reader.readexactly(nbytes) if nbytes else b""
+    return header, payload
+
+
+def _write_frame(writer: asyncio.StreamWriter, header: dict, payload: bytes = b""):
+    header = dict(header, nbytes=len(payload))
+    raw = json.dumps(header).encode("utf-8")
+    writer.write(_HEADER.pack(len(raw)) + raw)
+    if payload:
+        writer.write(payload)
+
+
+# ---------------------------------------------------------------------------
+# Client side (used by API workers)
+# ---------------------------------------------------------------------------
+
+class RemoteModelClient:
+    """
+    Async client for one or more model servers. Keeps a small pool of open
+    connections per server and never blocks the event loop.
+    """
+
+    def __init__(self, addresses: List[str], pool_size: int = 4, timeout: float = 30.0):
+        if not addresses:
+            raise ValueError("At least one model server address is required")
+        self.addresses = addresses
+        self.pool_size = max(1, pool_size)
+        self.timeout = timeout
+        self._idle = {addr: [] for addr in addresses}
+        self._slots = {addr: asyncio.Semaphore(self.pool_size) for addr in addresses}
+        self._next = itertools.cycle(addresses)
+        # Identity of the model each server reported last (see model_identity)
+        self._model_keys = {}
+
+    async def _connect(self, address: str):
+        kind, target = parse_address(address)
+        if kind == "unix":
+            return await asyncio.open_unix_connection(target)
+        return await asyncio.open_connection(*target)
+
+    @property
+    def model_key(self) -> Optional[str]:
+        """
+        Identity of the model(s) behind this client, or None until every
+        server has reported one. Servers with different models are combined.
+        """
+        keys = [self._model_keys.get(addr) for addr in self.addresses]
+        if not all(keys):
+            return None
+        return "|".join(sorted(set(keys)))
+
+    async def _request(self, header: dict, payload: bytes = b"", address: str = None) -> dict:
+        address = address or next(self._next)
+        async with self._slots[address]:
+            idle = self._idle[address]
+            conn = idle.pop() if idle else await self._connect(address)
+            reader, writer = conn
+            try:
+                _write_frame(writer, header, payload)
+                await writer.drain()
+                response, _ = await asyncio.wait_for(_read_frame(reader), timeout=self.timeout)
+            except BaseException:
+                # Connection state is unknown after a failure; never reuse it.
+                writer.close()
+                raise
+            idle.append(conn)
+
+        # Every answer carries the server's model identity, so a swap is seen right away.
+        self._model_keys[address] = response.get("model_key")
+        if "error" in response:
+            raise RuntimeError(f"Model server error: {response['error']}")
+        return response
+
+    async def predict_batch(self, batch: np.ndarray) -> List[Tuple[int, float]]:
+        batch = np.ascontiguousarray(batch, dtype=np.float32)
+        header = {"shape": list(batch.shape), "dtype": "float32"}
+        response = await self._request(header, batch.tobytes())
+        return [(int(idx), float(prob)) for idx, prob in response["results"]]
+
+    async def ping(self) -> bool:
+        try:
+            await self._request({"shape": []})
+            return True
+        except Exception:
+            return False
+
+    async def refresh_model_key(self) -> Optional[str]:
+        """Ping every server to pick up its current model identity."""
+        for address in self.addresses:
+            try:
+                await self._request({"shape": []}, address=address)
+            except Exception as e:
+                print(f"[ModelServer] {address} unreachable: {e}")
+        return self.model_key
+
+    async def close(self):
+        for idle in self._idle.values():
+            while idle:
+                _, writer = idle.pop()
+                writer.close()
+
+
+# ---------------------------------------------------------------------------
+# Server side
+# ---------------------------------------------------------------------------
+
+class ModelServer:
+    def __init__(self, model, max_batch_size: int, max_wait_ms: float, model_key: str = None):
+        from .batching import MicroBatcher
+        from .preprocessing import predict_top_batch
+
+        async def run_batch(batch):
+            return await asyncio.to_thread(predict_top_batch, model, batch)
+
+        self.model_key = model_key
+        # Batches arriving from different API workers are coalesced again here.
+        self.batcher = MicroBatcher(run_batch, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    header, payload = await _read_frame(reader)
+                except asyncio.IncompleteReadError:
+                    break
+                shape = header.get("shape") or []
+                if not shape:
+                    _write_frame(writer, {"results": [], "model_key": self.model_key})
+                    await writer.drain()
+                    continue
+                try:
+                    batch = np.frombuffer(payload, dtype=np.dtype(header.get("dtype", "float32")))
+                    batch = batch.reshape(shape)
+                    results = await self.batcher.submit_many(batch)
+                    _write_frame(writer, {
+                        "results": [[idx, prob] for idx, prob in results],
+                        "model_key": self.model_key,
+                    })
+                except Exception as e:
+                    _write_frame(writer, {"error": str(e)})
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, address: str):
+        kind, target = parse_address(address)
+        if kind == "unix":
+            if os.path.exists(target):
+                os.unlink(target)
+            server = await asyncio.start_unix_server(self.handle, path=target)
+        else:
+            server = await asyncio.start_server(self.handle, *target)
+        print(f"[ModelServer] Listening on {address}")
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv: Optional[List[str]] = None):
+    base_dir = Path(__file__).resolve().parent
+    load_dotenv(dotenv_path=base_dir.parent.joinpath(".env"))
+
+    parser = argparse.ArgumentParser(description="Serve the breed classifier to API workers.")
+    parser.add_argument("--address", default=os.getenv("MODEL_SERVER_ADDRESS", "unix:/tmp/pawdentify-model.sock").split(",")[0])
+    parser.add_argument("--model-path", default=os.getenv("MODEL_PATH", str(base_dir.joinpath("model/efficientnetv2b2_320.keras"))))
+    parser.add_argument("--max-batch-size", type=int, default=int(os.getenv("PREDICT_MAX_BATCH_SIZE", 8)))
+    parser.add_argument("--max-wait-ms", type=float, default=float(os.getenv("PREDICT_MAX_WAIT_MS", 10)))
+    args = parser.parse_args(argv)
+
+    from .inference_backends import main_tflite_path, model_identity
+    from .preprocessing import load_model_from_path
+
+    model = load_model_from_path(args.model_path, tflite_path=main_tflite_path())
+    print(f"[ModelServer] Loaded model from {args.model_path}")
+    server = ModelServer(model, args.max_batch_size, args.max_wait_ms, model_key=model_identity(args.model_path, tflite_path=main_tflite_path()))
+    asyncio.run(server.serve(args.address))
+
+
+if __name__ == "__main__":
+    main()
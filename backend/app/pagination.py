@@ -0,0 +1,83 @@
+# backend/app/pagination.py
+"""
+Keyset (cursor) pagination for list endpoints.
+
+Pages are ordered by (sort_field, _id) and the cursor is the last row's
+values for both, so each page is an index range scan that stays fast however
+deep the client pages, and rows inserted meanwhile don't shift later pages.
+"""
+import base64
+import binascii
+import json
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, Query
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def limit_param(default: int = DEFAULT_PAGE_SIZE):
+    return Query(default, ge=1, le=MAX_PAGE_SIZE, description="Items per page")
+
+
+def cursor_param():
+    return Query(None, description="next_cursor from the previous page")
+
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != 2:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+async def paginate(
+    collection,
+    query: dict,
+    sort_field: str,
+    direction: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    projection: Optional[dict] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    One page of `collection` matching `query`, ordered by (sort_field, _id)
+    in `direction` (1 or -1). Returns (docs, next_cursor); next_cursor is
+    None on the last page. `projection` limits the fields deserialized.
+    """
+    if cursor:
+        last_value, last_id = decode_cursor(cursor)
+        op = "$gt" if direction == 1 else "$lt"
+        query = {
+            "$and": [
+                query,
+                {"$or": [
+                    {sort_field: {op: last_value}},
+                    {sort_field: last_value, "_id": {op: last_id}},
+                ]},
+            ]
+        }
+    if projection is not None:
+        projection = {**projection, sort_field: 1}
+
+    docs = await (
+        collection.find(query, projection)
+        .sort([(sort_field, direction), ("_id", direction)])
+        .limit(limit + 1)
+        .to_list(length=limit + 1)
+    )
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        last = docs[-1]
+        next_cursor = encode_cursor([last.get(sort_field), last["_id"]])
+    return docs, next_cursor
@@ -0,0 +1,132 @@
+# backend/app/pet_notes.py
+"""
+Pet notes live in their own collection (`pet_notes`, one document per note,
+indexed by pet_id + date). Each pet document only carries `notes_count` and
+`recent_notes` (the latest PET_RECENT_NOTES, newest first) so the pet listing
+stays one small read; the full list is paged from GET /api/pets/{id}/notes.
+
+migrate_embedded_notes() moves notes from the old embedded `pets.notes`
+arrays. Notes are upserted on their id, or on one derived from pet id + array
+index when they have none, so reruns and concurrent runs never duplicate them.
+At startup each worker only enqueues it as a "pet_notes.migrate" job under a
+fixed key, so a single worker runs it; it can also be run by hand:
+
+    python -m app.pet_notes
+"""
+import asyncio
+import os
+import uuid
+
+from pymongo import ReturnDocument, UpdateOne
+
+from . import jobs
+from .database import pet_notes_collection, pets_collection
+from .http_cache import bump_user_version
+
+PET_RECENT_NOTES = int(os.getenv("PET_RECENT_NOTES", 3))
+
+# Fields of a note as returned by the API
+NOTE_PROJECTION = {"text": 1, "category": 1, "date": 1}
+
+
+def format_note(doc: dict) -> dict:
+    return {
+        "id": doc["_id"],
+        "text": doc["text"],
+        "category": doc.get("category", "other"),
+        "date": doc["date"]
+    }
+
+
+async def latest_notes(pet_id: str, limit: int = PET_RECENT_NOTES) -> list:
+    cursor = pet_notes_collection.find({"pet_id": pet_id}, NOTE_PROJECTION).sort([("date", -1), ("_id", -1)]).limit(limit)
+    return [format_note(doc) async for doc in cursor]
+
+
+async def refresh_pet_summary(pet_id: str):
+    """Recompute notes_count and recent_notes for a pet from the notes collection."""
+    count = await pet_notes_collection.count_documents({"pet_id": pet_id})
+    await pets_collection.update_one(
+        {"_id": pet_id},
+        {"$set": {"notes_count": count, "recent_notes": await latest_notes(pet_id)}}
+    )
+
+
+async def add_note(pet_id: str, user_id: str, note: dict):
+    await pet_notes_collection.insert_one({
+        "_id": note["id"],
+        "pet_id": pet_id,
+        "user_id": user_id,
+        "text": note["text"],
+        "category": note["category"],
+        "date": note["date"],
+    })
+    await pets_collection.update_one(
+        {"_id": pet_id},
+        {
+            "$inc": {"notes_count": 1},
+            "$push": {"recent_notes": {"$each": [note], "$position": 0, "$slice": PET_RECENT_NOTES}},
+        }
+    )
+    await bump_user_version(user_id, "pets")
+
+
+async def delete_note(pet_id: str, user_id: str, note_id: str):
+    result = await pet_notes_collection.delete_one({"_id": note_id, "pet_id": pet_id, "user_id": user_id})
+    if result.deleted_count == 0:
+        return
+    pet = await pets_collection.find_one_and_update(
+        {"_id": pet_id},
+        {"$inc": {"notes_count": -1}, "$pull": {"recent_notes": {"id": note_id}}},
+        projection={"notes_count": 1, "recent_notes": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    # Refill the preview if it lost a note that older ones can replace.
+    if pet and len(pet.get("recent_notes", [])) < min(PET_RECENT_NOTES, pet.get("notes_count", 0)):
+        await refresh_pet_summary(pet_id)
+    await bump_user_version(user_id, "pets")
+
+
+async def migrate_embedded_notes(batch_size: int = 500) -> int:
+    """Copy embedded pets.notes into pet_notes and replace them with the summary fields."""
+    migrated = 0
+    cursor = pets_collection.find({"notes": {"$exists": True}}, {"user_id": 1, "notes": 1})
+    async for pet in cursor:
+        ops = []
+        for index, note in enumerate(pet.get("notes") or []):
+            note_id = note.get("id") or str(uuid.uuid5(uuid.NAMESPACE_OID, f"{pet['_id']}:{index}"))
+            ops.append(UpdateOne(
+                {"_id": note_id},
+                {"$setOnInsert": {
+                    "pet_id": pet["_id"],
+                    "user_id": pet["user_id"],
+                    "text": note.get("text", ""),
+                    "category": note.get("category", "other"),
+                    "date": note.get("date", ""),
+                }},
+                upsert=True,
+            ))
+        for i in range(0, len(ops), batch_size):
+            await pet_notes_collection.bulk_write(ops[i:i + batch_size], ordered=False)
+        await refresh_pet_summary(pet["_id"])
+        await pets_collection.update_one({"_id": pet["_id"]}, {"$unset": {"notes": ""}})
+        await bump_user_version(pet["user_id"], "pets")
+        migrated += 1
+    if migrated:
+        print(f"[PetNotes] Migrated embedded notes of {migrated} pets")
+    return migrated
+
+
+@jobs.register("pet_notes.migrate")
+async def run_migration(job: dict) -> dict:
+    return {"pets": await migrate_embedded_notes()}
+
+
+async def enqueue_migration() -> str:
+    """Queue the migration once for all workers (the fixed key dedupes concurrent startups)."""
+    return await jobs.enqueue("pet_notes.migrate", {}, key="pet_notes.migrate")
+
+
+if __name__ == "__main__":
+    count = asyncio.run(migrate_embedded_notes())
+    print(f"[PetNotes] {count} pets migrated")
@@ -0,0 +1,179 @@
+# backend/app/places_store.py
+"""
+Local geospatial store for Mappls Nearby results.
+
+Fetched `suggestedLocations` are saved in `places` (GeoJSON point, 2dsphere
+index), and every upstream fetch marks its grid cell as covered for that
+category in `places_coverage`. Requests from a covered, fresh cell are then
+answered with a local $nearSphere query; the hottest cells are also kept in
+an in-memory LRU so repeat lookups skip MongoDB too.
+
+An upstream search that found nothing still marks its cell (count 0), as a
+negative entry: lookup() then returns [] and callers report "no_results"
+without going upstream again until the TTL runs out.
+"""
+import math
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from pymongo import UpdateOne
+
+from .database import places_collection, places_coverage_collection
+
+# Grid cell size in degrees (~2.2 km N-S at 0.02); a fetch covers its cell
+PLACES_CELL_DEG = float(os.getenv("PLACES_CELL_DEG", 0.02))
+# How long a covered cell is trusted before going back upstream
+PLACES_TTL_HOURS = float(os.getenv("PLACES_TTL_HOURS", 24 * 7))
+# In-memory front cache of per-cell candidates
+PLACES_FRONT_CACHE_SIZE = int(os.getenv("PLACES_FRONT_CACHE_SIZE", 512))
+PLACES_FRONT_CACHE_TTL = float(os.getenv("PLACES_FRONT_CACHE_TTL", 600))
+
+EARTH_RADIUS_M = 6371008.8
+
+# (category, cell) -> (expires_at, [place docs])
+_front_cache = OrderedDict()
+
+
+def cell_for(lat: float, lon: float) -> str:
+    return f"{math.floor(lat / PLACES_CELL_DEG)}:{math.floor(lon / PLACES_CELL_DEG)}"
+
+
+def _cell_center(cell: str):
+    i, j = (int(v) for v in cell.split(":"))
+    return (i + 0.5) * PLACES_CELL_DEG, (j + 0.5) * PLACES_CELL_DEG
+
+
+def _cell_half_diagonal_m(lat: float) -> float:
+    dlat = PLACES_CELL_DEG * 111_320
+    dlon = PLACES_CELL_DEG * 111_320 * math.cos(math.radians(lat))
+    return math.hypot(dlat, dlon) / 2
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def _front_get(key):
+    entry = _front_cache.get(key)
+    if entry is None:
+        return None
+    if entry[0] < time.monotonic():
+        _front_cache.pop(key, None)
+        return None
+    _front_cache.move_to_end(key)
+    return entry[1]
+
+
+def _front_put(key, docs):
+    if PLACES_FRONT_CACHE_SIZE <= 0:
+        return
+    _front_cache[key] = (time.monotonic() + PLACES_FRONT_CACHE_TTL, docs)
+    _front_cache.move_to_end(key)
+    while len(_front_cache) > PLACES_FRONT_CACHE_SIZE:
+        _front_cache.popitem(last=False)
+
+
+async def lookup(category: str, lat: float, lon: float, radius_m: float) -> Optional[List[dict]]:
+    """
+    Return stored places for (category, lat, lon) when the cell is covered and
+    fresh, or None when the caller has to go upstream.
+    """
+    cell = cell_for(lat, lon)
+    key = (category, cell)
+    docs = _front_get(key)
+    if docs is None:
+        cutoff = datetime.utcnow() - timedelta(hours=PLACES_TTL_HOURS)
+        coverage = await places_coverage_collection.find_one({"_id": f"{category}:{cell}"})
+        if not coverage or coverage["fetched_at"] < cutoff:
+            return None
+        # Candidates for any point in this cell: search from the centre, widened by half the cell.
+        c_lat, c_lon = _cell_center(cell)
+        cursor = places_collection.find(
+            {
+                "category": category,
+                "fetched_at": {"$gte": cutoff},
+                "location": {
+                    "$nearSphere": {
+                        "$geometry": {"type": "Point", "coordinates": [c_lon, c_lat]},
+                        "$maxDistance": radius_m + _cell_half_diagonal_m(c_lat),
+                    }
+                },
+            },
+            {"eloc": 1, "name": 1, "address": 1, "type": 1, "location": 1},
+        ).limit(200)
+        docs = await cursor.to_list(length=200)
+        _front_put(key, docs)
+
+    places = []
+    for doc in docs:
+        p_lon, p_lat = doc["location"]["coordinates"]
+        distance = haversine_m(lat, lon, p_lat, p_lon)
+        if distance > radius_m:
+            continue
+        places.append({
+            "id": doc["eloc"] or str(doc["_id"]),
+            "name": doc.get("name", "Unknown"),
+            "address": doc.get("address", "No address"),
+            "latitude": p_lat,
+            "longitude": p_lon,
+            "distance": int(distance),
+            "eloc": doc["eloc"],
+            "type": doc.get("type", category),
+        })
+    places.sort(key=lambda place: place["distance"])
+    return places
+
+
+async def covered_pages(category: str, lat: float, lon: float) -> Optional[int]:
+    """Upstream page count recorded when the cell was covered (None if unknown)."""
+    coverage = await places_coverage_collection.find_one(
+        {"_id": f"{category}:{cell_for(lat, lon)}"}, {"total_pages": 1}
+    )
+    return (coverage or {}).get("total_pages")
+
+
+async def save(category: str, lat: float, lon: float, suggested_locations: List[dict],
+               total_pages: Optional[int] = None):
+    """
+    Store upstream results and mark the request's cell as covered for category
+    (with no results this is the negative entry that lookup() returns as []).
+    `total_pages` (from the first page's pageInfo) lets later searches keep
+    paging upstream after being answered locally.
+    """
+    now = datetime.utcnow()
+    ops = []
+    for item in suggested_locations:
+        try:
+            p_lat, p_lon = float(item["latitude"]), float(item["longitude"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        eloc = item.get("eLoc", "")
+        doc_id = f"{category}:{eloc}" if eloc else f"{category}:{p_lat:.6f},{p_lon:.6f}"
+        ops.append(UpdateOne(
+            {"_id": doc_id},
+            {"$set": {
+                "category": category,
+                "eloc": eloc,
+                "name": item.get("placeName", "Unknown"),
+                "address": item.get("placeAddress", "No address"),
+                "type": item.get("type", category),
+                "location": {"type": "Point", "coordinates": [p_lon, p_lat]},
+                "fetched_at": now,
+            }},
+            upsert=True,
+        ))
+    if ops:
+        await places_collection.bulk_write(ops, ordered=False)
+
+    cell = cell_for(lat, lon)
+    coverage = {"category": category, "cell": cell, "fetched_at": now, "count": len(ops)}
+    if total_pages is not None:
+        coverage["total_pages"] = total_pages
+    await places_coverage_collection.update_one({"_id": f"{category}:{cell}"}, {"$set": coverage}, upsert=True)
+    _front_cache.pop((category, cell), None)
@@ -0,0 +1,151 @@
+# backend/app/prediction_cache.py
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from io import BytesIO
+from typing import Awaitable, Callable, Optional, Tuple
+
+from PIL import Image
+
+# (top_idx, top_prob, ...) as returned by the predict path
+Result = Tuple
+
+
+def dhash(file_bytes: bytes, hash_size: int = 8) -> str:
+    """
+    Difference hash: near-identical images (re-encoded, resized, lightly
+    compressed) map to the same 64-bit value.
+    """
+    img = Image.open(BytesIO(file_bytes))
+    img.draft("L", (hash_size * 4, hash_size * 4))  # cheap JPEG decode, hash needs few pixels
+    img = img.convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR)
+    px = list(img.getdata())
+    bits = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = px[row * (hash_size + 1) + col]
+            right = px[row * (hash_size + 1) + col + 1]
+            bits = (bits << 1) | (left > right)
+    return f"{bits:0{hash_size * hash_size // 4}x}"
+
+
+class PredictionCache:
+    """
+    LRU + TTL cache of prediction results keyed by the uploaded content.
+    Concurrent lookups of the same key share one in-flight computation.
+    Entries belong to a model identity; changing it drops the whole cache.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600.0, mode: str = "sha256"):
+        if mode not in ("sha256", "phash"):
+            raise ValueError(f"Unknown prediction cache mode '{mode}' (expected sha256 or phash)")
+        self.max_entries = max(0, int(max_entries))
+        self.ttl = float(ttl_seconds)
+        self.mode = mode
+        self.model_key: Optional[str] = None
+        self._entries: "OrderedDict[str, Tuple[float, Result]]" = OrderedDict()
+        self._inflight = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def key_for(self, file_bytes: bytes) -> str:
+        """Cache key for upload bytes. phash mode decodes the image (may raise)."""
+        if self.mode == "phash":
+            return "p:" + dhash(file_bytes)
+        return "s:" + hashlib.sha256(file_bytes).hexdigest()
+
+    def set_model_key(self, model_key: Optional[str]):
+        """Record the current model identity; a different one invalidates everything."""
+        if model_key != self.model_key:
+            if self.model_key is not None:
+                self.invalidations += 1
+                print(f"[PredictionCache] Model changed ({self.model_key} -> {model_key}); cache cleared")
+            self._entries.clear()
+            self.model_key = model_key
+
+    def _get(self, key: str) -> Optional[Result]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return result
+
+    def _put(self, key: str, result: Result):
+        self._entries[key] = (time.monotonic() + self.ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Result]]) -> Result:
+        if not self.enabled:
+            return await compute()
+
+        cached = self._get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            await asyncio.wait([inflight])
+            if inflight.cancelled():
+                # The request doing the work went away; take over.
+                return await self.get_or_compute(key, compute)
+            return inflight.result()
+
+        self.misses += 1
+        model_key = self.model_key
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            result = await compute()
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except Exception as e:
+            fut.set_exception(e)
+            fut.exception()  # mark retrieved when nobody else was waiting
+            raise
+        else:
+            fut.set_result(result)
+            # Don't store results computed against a model that has since changed.
+            if model_key == self.model_key:
+                self._put(key, result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "enabled": self.enabled,
+            "mode": self.mode,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "hit_ratio": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+            "inflight": len(self._inflight),
+        }
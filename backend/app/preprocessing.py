@@ -1,32 +1,70 @@
 # backend/app/preprocessing.py
+import os
 from io import BytesIO
-from pathlib import Path
-from PIL import Image
+from PIL import Image, ImageOps
 import numpy as np
-import tensorflow as tf
 
-from tensorflow.keras.applications.efficientnet_v2 import preprocess_input
+from .metrics import stage
 
 IMG_SIZE = (320, 320)
 
-def preprocess_image(image: Image.Image) -> np.ndarray:
+# PREPROCESS_MODE: "exact" (default) is the full-size decode (reference path);
+# "fast" is reduced-resolution JPEG decode + EXIF orientation + reducing resize.
+# See scripts/check_preprocess_parity.py.
+def preprocess_mode() -> str:
+    # Read per call: app.main imports this module before load_dotenv() runs.
+    return os.getenv("PREPROCESS_MODE", "exact").strip().lower()
+
+def preprocess_input(arr: np.ndarray) -> np.ndarray:
+    """
+    EfficientNetV2 preprocess_input. Keras' version is a pass-through (the
+    model rescales 0..255 inputs itself), so it is reproduced here rather
+    than imported: API workers in model-server mode never load TensorFlow.
+    """
+    return arr
+
+def _fast_mode(fast) -> bool:
+    return preprocess_mode() == "fast" if fast is None else bool(fast)
+
+def preprocess_image(image: Image.Image, fast: bool = None, size=IMG_SIZE) -> np.ndarray:
     """
     Resize image and return float32 array shape (1, H, W, 3) suitable for EfficientNetV2 preprocessing.
+    `size` defaults to the main model's IMG_SIZE (the cascade model uses a smaller one).
     """
     if not isinstance(image, Image.Image):
         raise TypeError("Expected PIL.Image.Image")
-    image = image.resize(IMG_SIZE, Image.BILINEAR)
-    arr = np.asarray(image).astype("float32")  # 0..255
-    if arr.ndim == 2:
-        arr = np.stack((arr,) * 3, axis=-1)
-    arr = np.expand_dims(arr, axis=0)  # (1, H, W, 3)
-    arr = preprocess_input(arr)
+    with stage("resize"):
+        if _fast_mode(fast):
+            # Box-reduce by an integer factor first, keeping >= 2x the target, then bilinear.
+            image = image.resize(size, Image.BILINEAR, reducing_gap=2.0)
+        else:
+            image = image.resize(size, Image.BILINEAR)
+        arr = np.asarray(image).astype("float32")  # 0..255
+        if arr.ndim == 2:
+            arr = np.stack((arr,) * 3, axis=-1)
+        arr = np.expand_dims(arr, axis=0)  # (1, H, W, 3)
+    with stage("preprocess_input"):
+        arr = preprocess_input(arr)
     return arr
 
-def preprocess_image_bytes(file_bytes: bytes) -> np.ndarray:
+def decode_image_bytes(file_bytes: bytes, fast: bool = None) -> Image.Image:
+    """
+    Decode upload bytes to an RGB PIL image.
+    In fast mode JPEGs are decoded via DCT scaling (1/2, 1/4 or 1/8) to the
+    smallest size still >= IMG_SIZE, and EXIF orientation is applied.
+    """
+    with stage("decode"):
+        img = Image.open(BytesIO(file_bytes))
+        if _fast_mode(fast):
+            if img.format == "JPEG":
+                img.draft("RGB", IMG_SIZE)
+            img = ImageOps.exif_transpose(img)
+        return img.convert("RGB")
+
+def preprocess_image_bytes(file_bytes: bytes, fast: bool = None) -> np.ndarray:
     """Convenience: accept raw bytes (from upload) and return model-ready array."""
-    img = Image.open(BytesIO(file_bytes)).convert("RGB")
-    return preprocess_image(img)
+    img = decode_image_bytes(file_bytes, fast=fast)
+    return preprocess_image(img, fast=fast)
 
 def _is_probabilities(arr: np.ndarray, tol: float = 1e-3) -> bool:
     """Return True if arr looks like probabilities: all in [0,1] and sums ~1."""
@@ -38,15 +76,8 @@ def _is_probabilities(arr: np.ndarray, tol: float = 1e-3) -> bool:
     s = float(arr.sum())
     return abs(s - 1.0) <= tol
 
-def predict_top(model, img_array: np.ndarray):
-    """
-    Run model.predict and return (top_index:int, top_prob:float).
-    top_prob is in 0..1.
-    Robustly handles models that already output probabilities.
-    """
-    raw = model.predict(img_array, verbose=0)
-    preds = np.asarray(raw).squeeze()  # shape -> (N,) or scalar
-
+def _probabilities(preds: np.ndarray) -> np.ndarray:
+    """Return preds as probabilities, applying a stable softmax only when needed."""
     # If scalar output (binary/single-value), convert to 1-element array
     if preds.ndim == 0:
         preds = np.array([float(preds)])
@@ -54,26 +85,55 @@ def predict_top(model, img_array: np.ndarray):
     # If preds already look like probabilities, use them directly.
     # Otherwise compute a numerically stable softmax.
     if _is_probabilities(preds):
-        probs = preds.astype(float)
-    else:
-        # numerically stable softmax
-        maxv = np.max(preds)
-        exp = np.exp(preds - maxv)
-        probs = exp / np.sum(exp)
-
-    top_idx = int(np.argmax(probs))
-    top_prob = float(probs[top_idx])
+        return preds.astype(float)
+    maxv = np.max(preds)
+    exp = np.exp(preds - maxv)
+    return exp / np.sum(exp)
+
+def predict_top(model, img_array: np.ndarray):
+    """
+    Run model.predict and return (top_index:int, top_prob:float).
+    top_prob is in 0..1.
+    Robustly handles models that already output probabilities.
+    """
+    with stage("model_predict"):
+        raw = model.predict(img_array, verbose=0)
+    with stage("softmax"):
+        preds = np.asarray(raw).squeeze()  # shape -> (N,) or scalar
+        probs = _probabilities(preds)
+
+        top_idx = int(np.argmax(probs))
+        top_prob = float(probs[top_idx])
     return top_idx, top_prob
 
-def load_model_from_path(model_path: str):
+def predict_top_batch(model, batch: np.ndarray):
     """
-    Load a Keras model from a .keras or .h5 file.
+    Run a single model.predict over a (B, H, W, 3) batch and return one
+    (top_index:int, top_prob:float) tuple per row, in input order.
     """
-    p = Path(model_path)
-    if not p.exists():
-        raise FileNotFoundError(f"Model file not found: {model_path}")
+    with stage("model_predict"):
+        raw = np.asarray(model.predict(batch, verbose=0))
+    with stage("softmax"):
+        raw = raw.reshape(raw.shape[0], -1)  # (B, N)
+        results = []
+        for row in raw:
+            probs = _probabilities(row.squeeze())
+            top_idx = int(np.argmax(probs))
+            results.append((top_idx, float(probs[top_idx])))
+    return results
+
+def load_model_from_path(model_path: str, backend: str = None, tflite_path: str = None):
+    """
+    Load the model for the configured INFERENCE_BACKEND (default: a Keras
+    model from a .keras or .h5 file). Whatever is returned supports
+    .predict(batch, verbose=0), so predict_top works with every backend.
+    TFLite backends use `tflite_path`, else the converted file next to model_path.
+    """
+    from .inference_backends import load_backend
+
     try:
-        model = tf.keras.models.load_model(str(p))
-        return model
+        return load_backend(model_path, backend, tflite_path)
+    except (FileNotFoundError, ValueError):
+        raise
     except Exception as e:
         raise RuntimeError(f"Error loading model from {model_path}: {e}")
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import JSONResponse
+
+from ..auth import get_current_user
+from ..account_wipe import enqueue_account_wipe, needs_background, wipe_user_data
+from .. import jobs
+
+router = APIRouter(prefix="/api/account", tags=["account"])
+
+@router.delete("/data")
+async def delete_account_data(current_user: dict = Depends(get_current_user)):
+    """
+    Delete all of the user's pets (and their images), history, settings and feedback.
+    Large accounts are wiped in the background: 202 with a job id to poll.
+    """
+    user_id = current_user["user_id"]
+
+    if await needs_background(user_id):
+        job_id = await enqueue_account_wipe(user_id)
+        return JSONResponse(
+            status_code=202,
+            content={"status": "queued", "job_id": job_id}
+        )
+
+    summary = await wipe_user_data(user_id)
+    return {"status": "done", "deleted": summary}
+
+@router.get("/data/jobs/{job_id}")
+async def get_wipe_status(job_id: str, current_user: dict = Depends(get_current_user)):
+    job = await jobs.get_job(job_id)
+    if not job or job["type"] != "account.wipe" or job["payload"].get("user_id") != current_user["user_id"]:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {
+        "status": job["status"],
+        "deleted": job.get("result"),
+        "error": job.get("last_error") if job["status"] == "failed" else None
+    }
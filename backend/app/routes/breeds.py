@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from pydantic import BaseModel
-from datetime import datetime
 
 from ..auth import get_current_user
-from ..database import breed_searches_collection
+from ..breed_tracking import SEARCH_BUFFER
+from ..http_cache import check
+from ..trending import LEADERBOARD, TRENDING_REFRESH_INTERVAL
+
+# Shared caches may hold a board for one refresh interval
+TOP_CACHE_CONTROL = f"public, max-age={int(TRENDING_REFRESH_INTERVAL)}"
 
 router = APIRouter(prefix="/api", tags=["breeds"])
 
@@ -19,49 +23,37 @@ async def track_breed_search(
 ):
     """
     Track when a user searches for a specific breed.
-    Increments the search count for that breed.
+    The increment is buffered in memory and written in the next periodic flush.
     """
-    try:
-        # Increment count for this breed, create if doesn't exist
-        await breed_searches_collection.update_one(
-            {"breed_id": data.breed_id},
-            {
-                "$inc": {"count": 1},
-                "$set": {
-                    "breed_name": data.breed_name,
-                    "last_searched": datetime.now().isoformat()
-                }
-            },
-            upsert=True
-        )
-        return {"message": "Search tracked successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to track search: {str(e)}")
+    if not SEARCH_BUFFER.add(data.breed_id, data.breed_name):
+        raise HTTPException(status_code=503, detail="Search tracking is temporarily overloaded")
+    return {"message": "Search tracked successfully"}
 
 @router.get("/breeds/top")
-async def get_top_searched_breeds():
+async def get_top_searched_breeds(
+    request: Request,
+    window: str = Query("all", description="Leaderboard window, e.g. 24h, 7d or all")
+):
     """
-    Get top 10 most searched breeds.
-    Returns list sorted by search count (descending).
+    Get top 10 most searched breeds in a time window.
+    Served from the in-memory trending snapshot (refreshed in the background),
+    whose body and ETag are precomputed; If-None-Match gets a 304.
     """
+    if window not in LEADERBOARD.windows:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown window. Available: {', '.join(LEADERBOARD.windows)}"
+        )
     try:
-        cursor = breed_searches_collection.find().sort("count", -1).limit(10)
-        top_breeds = await cursor.to_list(length=10)
-        
-        # Format response
-        result = [
-            {
-                "breed_id": item["breed_id"],
-                "breed_name": item["breed_name"],
-                "count": item["count"],
-                "last_searched": item.get("last_searched")
-            }
-            for item in top_breeds
-        ]
-        
-        return {
-            "top_searched": result,
-            "count": len(result)
-        }
+        board = await LEADERBOARD.get(window)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch top breeds: {str(e)}")
+    
+    unchanged = check(request, board["etag"], TOP_CACHE_CONTROL)
+    if unchanged is not None:
+        return unchanged
+    return Response(
+        board["body"],
+        media_type="application/json",
+        headers={"ETag": board["etag"], "Cache-Control": TOP_CACHE_CONTROL}
+    )
@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Optional
+import csv
+import io
+import json
 import uuid
 
 from ..auth import get_current_user
 from ..database import feedback_collection
+from ..pagination import cursor_param, limit_param, paginate
 
 router = APIRouter(prefix="/api", tags=["feedback"])
 
@@ -43,9 +49,11 @@ async def submit_feedback(
         "message": "Feedback submitted successfully"
     }
 
-@router.get("/admin/feedbacks")
-async def get_all_feedbacks(current_user: dict = Depends(get_current_user)):
-    # Check if user is admin
+# Export reads the cursor in batches of this many documents
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FIELDS = ["id", "user_id", "predicted_breed", "vote_type", "feedback_message", "timestamp"]
+
+def require_admin(current_user: dict):
     payload = current_user["payload"]
     public_metadata = payload.get("public_metadata", {})
     role = public_metadata.get("role") or payload.get("role")
@@ -53,17 +61,144 @@ async def get_all_feedbacks(current_user: dict = Depends(get_current_user)):
     if role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
 
-    cursor = feedback_collection.find().sort("timestamp", -1)
-    feedbacks = await cursor.to_list(length=1000)
-    return [
-        {
-            "id": item["_id"],
-            "user_id": item["user_id"],
-            "predicted_breed": item["prediction"],
-            "vote_type": item["vote"],
-            "feedback_message": item["message"],
-            "timestamp": item["timestamp"]
-        }
-        for item in feedbacks
+def _format_feedback(item: dict) -> dict:
+    return {
+        "id": item["_id"],
+        "user_id": item["user_id"],
+        "predicted_breed": item["prediction"],
+        "vote_type": item["vote"],
+        "feedback_message": item["message"],
+        "timestamp": item["timestamp"]
+    }
+
+def _date_range_filter(date_from: Optional[str], date_to: Optional[str]) -> dict:
+    """
+    Filter on the ISO `timestamp` string for YYYY-MM-DD bounds (both inclusive).
+    String comparison matches date order for ISO timestamps, and uses the timestamp index.
+    """
+    bounds = {}
+    try:
+        if date_from:
+            bounds["$gte"] = datetime.strptime(date_from, "%Y-%m-%d").date().isoformat()
+        if date_to:
+            end = datetime.strptime(date_to, "%Y-%m-%d").date() + timedelta(days=1)
+            bounds["$lt"] = end.isoformat()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be YYYY-MM-DD")
+    return {"timestamp": bounds} if bounds else {}
+
+@router.get("/admin/feedbacks")
+async def get_all_feedbacks(
+    limit: int = limit_param(),
+    cursor: Optional[str] = cursor_param(),
+    current_user: dict = Depends(get_current_user)
+):
+    require_admin(current_user)
+
+    feedbacks, next_cursor = await paginate(
+        feedback_collection,
+        {},
+        "timestamp", -1,
+        limit, cursor,
+        projection={"user_id": 1, "prediction": 1, "vote": 1, "message": 1},
+    )
+    return {
+        "items": [_format_feedback(item) for item in feedbacks],
+        "next_cursor": next_cursor
+    }
+
+async def _export_ndjson(cursor):
+    lines = []
+    async for item in cursor:
+        lines.append(json.dumps(_format_feedback(item), ensure_ascii=False))
+        if len(lines) >= EXPORT_BATCH_SIZE:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+async def _export_csv(cursor):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    rows = 0
+    async for item in cursor:
+        writer.writerow(_format_feedback(item))
+        rows += 1
+        if rows % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+@router.get("/admin/feedbacks/export")
+async def export_feedbacks(
+    format: str = Query("ndjson", description="ndjson or csv"),
+    date_from: Optional[str] = Query(None, alias="from", description="YYYY-MM-DD (inclusive)"),
+    date_to: Optional[str] = Query(None, alias="to", description="YYYY-MM-DD (inclusive)"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Stream every matching feedback, newest first, without loading them all into memory."""
+    require_admin(current_user)
+    if format not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="format must be ndjson or csv")
+
+    cursor = feedback_collection.find(
+        _date_range_filter(date_from, date_to),
+        {"user_id": 1, "prediction": 1, "vote": 1, "message": 1, "timestamp": 1},
+    ).sort([("timestamp", -1), ("_id", -1)]).batch_size(EXPORT_BATCH_SIZE)
+
+    filename = f"feedback-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{format}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if format == "csv":
+        return StreamingResponse(_export_csv(cursor), media_type="text/csv; charset=utf-8", headers=headers)
+    return StreamingResponse(_export_ndjson(cursor), media_type="application/x-ndjson", headers=headers)
+
+@router.get("/admin/feedbacks/stats")
+async def get_feedback_stats(
+    date_from: Optional[str] = Query(None, alias="from", description="YYYY-MM-DD (inclusive)"),
+    date_to: Optional[str] = Query(None, alias="to", description="YYYY-MM-DD (inclusive)"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Upvote/downvote counts overall, per predicted breed and per day, computed in MongoDB."""
+    require_admin(current_user)
+
+    votes = {
+        "total": {"$sum": 1},
+        "upvotes": {"$sum": {"$cond": [{"$eq": ["$vote", "upvote"]}, 1, 0]}},
+        "downvotes": {"$sum": {"$cond": [{"$eq": ["$vote", "downvote"]}, 1, 0]}},
+    }
+    pipeline = [
+        {"$match": _date_range_filter(date_from, date_to)},
+        {"$project": {"_id": 0, "prediction": 1, "vote": 1, "day": {"$substrCP": ["$timestamp", 0, 10]}}},
+        {"$facet": {
+            "overall": [{"$group": {"_id": None, **votes}}],
+            "by_breed": [
+                {"$group": {"_id": "$prediction", **votes}},
+                {"$sort": {"total": -1, "_id": 1}},
+            ],
+            "by_day": [
+                {"$group": {"_id": "$day", **votes}},
+                {"$sort": {"_id": 1}},
+            ],
+        }},
     ]
+    result = await feedback_collection.aggregate(pipeline, allowDiskUse=True).to_list(length=1)
+    facets = result[0] if result else {"overall": [], "by_breed": [], "by_day": []}
 
+    def counts(row: dict) -> dict:
+        return {
+            "total": row["total"],
+            "upvotes": row["upvotes"],
+            "downvotes": row["downvotes"],
+            "upvote_rate": round(row["upvotes"] / row["total"], 4) if row["total"] else None
+        }
+
+    overall = facets["overall"][0] if facets["overall"] else {"total": 0, "upvotes": 0, "downvotes": 0}
+    return {
+        "from": date_from,
+        "to": date_to,
+        "overall": counts(overall),
+        "by_breed": [{"predicted_breed": row["_id"], **counts(row)} for row in facets["by_breed"]],
+        "by_day": [{"date": row["_id"], **counts(row)} for row in facets["by_day"]]
+    }
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
 from datetime import datetime
+from typing import Optional
 import uuid
 
 from ..auth import get_current_user
+from ..http_cache import PRIVATE_REVALIDATE, bump_user_version, check, json_response, user_etag
+from ..pagination import cursor_param, limit_param, paginate
 from ..database import history_collection
 
 router = APIRouter(prefix="/api/history", tags=["history"])
@@ -30,6 +33,7 @@ async def save_history(
         "searched_on": datetime.now().isoformat().split('T')[0]
     }
     await history_collection.insert_one(history_doc)
+    await bump_user_version(user_id, "history")
     return {
         "id": history_id,
         "breed": history_data.breed,
@@ -39,20 +43,37 @@ async def save_history(
     }
 
 @router.get("")
-async def get_history(current_user: dict = Depends(get_current_user)):
+async def get_history(
+    request: Request,
+    limit: int = limit_param(),
+    cursor: Optional[str] = cursor_param(),
+    current_user: dict = Depends(get_current_user)
+):
     user_id = current_user["user_id"]
-    cursor = history_collection.find({"user_id": user_id}).sort("searched_on", -1)
-    history = await cursor.to_list(length=100)
-    return [
-        {
-            "id": item["_id"],
-            "breed": item["breed"],
-            "confidence": item["confidence"],
-            "image": item["image_url"],
-            "searchedOn": item["searched_on"]
-        }
-        for item in history
-    ]
+    etag = await user_etag(request, user_id, "history")
+    unchanged = check(request, etag, PRIVATE_REVALIDATE, private=True)
+    if unchanged is not None:
+        return unchanged
+    history, next_cursor = await paginate(
+        history_collection,
+        {"user_id": user_id},
+        "searched_on", -1,
+        limit, cursor,
+        projection={"breed": 1, "confidence": 1, "image_url": 1},
+    )
+    return json_response({
+        "items": [
+            {
+                "id": item["_id"],
+                "breed": item["breed"],
+                "confidence": item["confidence"],
+                "image": item["image_url"],
+                "searchedOn": item["searched_on"]
+            }
+            for item in history
+        ],
+        "next_cursor": next_cursor
+    }, etag, PRIVATE_REVALIDATE, private=True)
 
 @router.delete("/{history_id}")
 async def delete_history(
@@ -63,5 +84,6 @@ async def delete_history(
     result = await history_collection.delete_one({"_id": history_id, "user_id": user_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="History item not found")
+    await bump_user_version(user_id, "history")
     return {"message": "History item deleted successfully"}
 
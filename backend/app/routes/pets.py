@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, Request
 from datetime import datetime
+from typing import Optional
 import uuid
 
 from ..auth import get_current_user
-from ..database import pets_collection
-from ..cloudinary_config import upload_image, delete_image
+from ..database import pet_notes_collection, pets_collection
+from ..http_cache import PRIVATE_REVALIDATE, bump_user_version, check, json_response, user_etag
+from ..pagination import cursor_param, limit_param, paginate
+from .. import pet_notes
+from ..cloudinary_config import prepare_image
+from ..image_jobs import MAX_QUEUED_IMAGE_BYTES, enqueue_image_delete, enqueue_pet_image_upload
 
 router = APIRouter(prefix="/api/pets", tags=["pets"])
 
@@ -17,40 +22,73 @@ async def add_pet(
     current_user: dict = Depends(get_current_user)
 ):
     user_id = current_user["user_id"]
-    image_bytes = await image.read()
-    # Upload image to Cloudinary
-    upload_result = await upload_image(image_bytes, folder="pets")
+    try:
+        image_bytes = await prepare_image(await image.read())
+    except ValueError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    if len(image_bytes) > MAX_QUEUED_IMAGE_BYTES:
+        raise HTTPException(status_code=413, detail="Image is too large")
     pet_id = str(uuid.uuid4())
     added_date = datetime.now().isoformat().split('T')[0]
     
+    # The image is uploaded by a background job; the pet exists right away.
     pet_doc = {
         "_id": pet_id,
         "user_id": user_id,
         "name": name,
         "breed": breed,
         "birthday": birthday,
-        "image_url": upload_result["url"],
-        "image_public_id": upload_result["public_id"],
+        "image_url": None,
+        "image_public_id": None,
+        "image_status": "pending",
         "added_on": added_date,
-        "notes": []
+        "notes_count": 0,
+        "recent_notes": []
     }
     await pets_collection.insert_one(pet_doc)
+    try:
+        await enqueue_pet_image_upload(pet_id, image_bytes)
+    except Exception as e:
+        # Without its upload job the pet would stay "pending" forever.
+        await pets_collection.delete_one({"_id": pet_id})
+        print(f"[Pets] Failed to queue image upload for {pet_id}: {e}")
+        raise HTTPException(status_code=503, detail="Could not queue the image upload, please retry")
+    await bump_user_version(user_id, "pets")
     
     return {
         "id": pet_id,
         "name": name,
         "breed": breed,
         "birthday": birthday,
-        "image": upload_result["url"],
+        # No "image" until the background upload has finished
+        "imageStatus": "pending",
         "addedOn": added_date,  # Return in camelCase
-        "notes": []
+        "notes": [],
+        "notesCount": 0
     }
 
 @router.get("")
-async def get_pets(current_user: dict = Depends(get_current_user)):
+async def get_pets(
+    request: Request,
+    limit: int = limit_param(),
+    cursor: Optional[str] = cursor_param(),
+    current_user: dict = Depends(get_current_user)
+):
     user_id = current_user["user_id"]
-    cursor = pets_collection.find({"user_id": user_id})
-    pets = await cursor.to_list(length=100)
+    etag = await user_etag(request, user_id, "pets")
+    unchanged = check(request, etag, PRIVATE_REVALIDATE, private=True)
+    if unchanged is not None:
+        return unchanged
+    pets, next_cursor = await paginate(
+        pets_collection,
+        {"user_id": user_id},
+        "added_on", 1,
+        limit, cursor,
+        projection={
+            "name": 1, "breed": 1, "birthday": 1, "image_url": 1, "image_status": 1,
+            "notes_count": 1, "recent_notes": 1,
+        },
+    )
     
     # Transform to frontend format
     result = []
@@ -60,23 +98,61 @@ async def get_pets(current_user: dict = Depends(get_current_user)):
             "name": pet["name"],
             "breed": pet["breed"],
             "birthday": pet.get("birthday"),
-            "image": pet["image_url"],
+            "image": pet.get("image_url"),
+            "imageStatus": pet.get("image_status", "ready"),
             "addedOn": pet.get("added_on"),  # Convert snake_case to camelCase
-            "notes": pet.get("notes", [])
+            "notes": pet.get("recent_notes", []),  # latest few; the rest via /{pet_id}/notes
+            "notesCount": pet.get("notes_count", 0)
         })
     
-    return result
+    return json_response({"items": result, "next_cursor": next_cursor}, etag, PRIVATE_REVALIDATE, private=True)
 
 @router.delete("/{pet_id}")
 async def delete_pet(pet_id: str, current_user: dict = Depends(get_current_user)):
     user_id = current_user["user_id"]
-    pet = await pets_collection.find_one({"_id": pet_id, "user_id": user_id})
+    # One atomic step, so a concurrent upload either sees the pet (and its
+    # public_id is deleted below) or sees it gone and cleans up after itself.
+    pet = await pets_collection.find_one_and_delete({"_id": pet_id, "user_id": user_id})
     if not pet:
         raise HTTPException(status_code=404, detail="Pet not found")
-    await delete_image(pet["image_public_id"])
-    await pets_collection.delete_one({"_id": pet_id})
+    await pet_notes_collection.delete_many({"pet_id": pet_id})
+    await bump_user_version(user_id, "pets")
+    if pet.get("image_public_id"):
+        await enqueue_image_delete(pet["image_public_id"])
     return {"message": "Pet deleted successfully"}
 
+@router.get("/{pet_id}/notes")
+async def get_notes(
+    request: Request,
+    pet_id: str,
+    limit: int = limit_param(),
+    cursor: Optional[str] = cursor_param(),
+    current_user: dict = Depends(get_current_user)
+):
+    """A pet's notes, newest first."""
+    user_id = current_user["user_id"]
+    # Note writes bump the "pets" version; the ETag also covers the path.
+    etag = await user_etag(request, user_id, "pets")
+    unchanged = check(request, etag, PRIVATE_REVALIDATE, private=True)
+    if unchanged is not None:
+        return unchanged
+
+    pet = await pets_collection.find_one({"_id": pet_id, "user_id": user_id}, {"_id": 1})
+    if not pet:
+        raise HTTPException(status_code=404, detail="Pet not found")
+
+    notes, next_cursor = await paginate(
+        pet_notes_collection,
+        {"pet_id": pet_id},
+        "date", -1,
+        limit, cursor,
+        projection=pet_notes.NOTE_PROJECTION,
+    )
+    return json_response(
+        {"items": [pet_notes.format_note(note) for note in notes], "next_cursor": next_cursor},
+        etag, PRIVATE_REVALIDATE, private=True
+    )
+
 @router.post("/{pet_id}/notes")
 async def add_note(
     pet_id: str,
@@ -86,7 +162,7 @@ async def add_note(
 ):
     user_id = current_user["user_id"]
 
-    pet = await pets_collection.find_one({"_id": pet_id, "user_id": user_id})
+    pet = await pets_collection.find_one({"_id": pet_id, "user_id": user_id}, {"_id": 1})
     if not pet:
         raise HTTPException(status_code=404, detail="Pet not found")
 
@@ -98,10 +174,7 @@ async def add_note(
         "date": datetime.utcnow().isoformat()
     }
 
-    await pets_collection.update_one(
-        {"_id": pet_id},
-        {"$push": {"notes": note_doc}}
-    )
+    await pet_notes.add_note(pet_id, user_id, note_doc)
 
     return note_doc
 
@@ -113,16 +186,10 @@ async def delete_note(
 ):
     user_id = current_user["user_id"]
 
-    pet = await pets_collection.find_one({"_id": pet_id, "user_id": user_id})
+    pet = await pets_collection.find_one({"_id": pet_id, "user_id": user_id}, {"_id": 1})
     if not pet:
         raise HTTPException(status_code=404, detail="Pet not found")
 
-    await pets_collection.update_one(
-        {"_id": pet_id},
-        {"$pull": {"notes": {"id": note_id}}}
-    )
+    await pet_notes.delete_note(pet_id, user_id, note_id)
 
     return {"message": "Note deleted successfully"}
-
-
-
@@ -1,91 +1,18 @@
+import asyncio
+import base64
+import binascii
+import hashlib
+import json
+import re
+
 from fastapi import APIRouter, Depends, Query, HTTPException
 from typing import Optional
-import httpx
-import os
 
 from ..auth import get_current_user
+from .. import mappls, places_store
 
 router = APIRouter(prefix="/api/places", tags=["places"])
 
-# Primary and fallback credentials
-MAPPLS_ACCOUNTS = [
-    {
-        "client_id": os.getenv("MAPPLS_CLIENT_ID"),
-        "client_secret": os.getenv("MAPPLS_CLIENT_SECRET"),
-        "name": "Primary"
-    },
-    {
-        "client_id": os.getenv("MAPPLS_CLIENT_ID_2"),
-        "client_secret": os.getenv("MAPPLS_CLIENT_SECRET_2"),
-        "name": "Fallback 1"
-    },
-    {
-        "client_id": os.getenv("MAPPLS_CLIENT_ID_3"),
-        "client_secret": os.getenv("MAPPLS_CLIENT_SECRET_3"),
-        "name": "Fallback 2"
-    }
-]
-
-# Cache for access tokens
-_token_cache = {}
-
-async def get_access_token(account_index=0):
-    """Get OAuth2 access token with fallback support"""
-    import time
-    
-    for i in range(account_index, len(MAPPLS_ACCOUNTS)):
-        account = MAPPLS_ACCOUNTS[i]
-        
-        if not account["client_id"] or not account["client_secret"]:
-            print(f"[Auth] Skipping {account['name']} - credentials not set")
-            continue
-        
-        cache_key = f"token_{i}"
-        
-        # Check cache
-        if cache_key in _token_cache and _token_cache[cache_key]["expires_at"] > time.time():
-            print(f"[Auth] ✅ Using cached token from {account['name']}")
-            return _token_cache[cache_key]["token"], i
-        
-        try:
-            print(f"[Auth] Requesting new token from {account['name']}...")
-            
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    "https://outpost.mappls.com/api/security/oauth/token",
-                    data={
-                        "grant_type": "client_credentials",
-                        "client_id": account["client_id"],
-                        "client_secret": account["client_secret"]
-                    },
-                    headers={"Content-Type": "application/x-www-form-urlencoded"}
-                )
-                
-                print(f"[Auth] {account['name']} token response: {response.status_code}")
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    token = data.get("access_token")
-                    expires_in = data.get("expires_in", 3600)
-                    
-                    _token_cache[cache_key] = {
-                        "token": token,
-                        "expires_at": time.time() + expires_in - 60
-                    }
-                    
-                    print(f"[Auth] ✅ Got token from {account['name']}")
-                    return token, i
-                else:
-                    print(f"[Auth] ❌ {account['name']} failed: {response.text[:200]}")
-                    continue
-                    
-        except Exception as e:
-            print(f"[Auth] ❌ {account['name']} exception: {str(e)}")
-            continue
-    
-    print(f"[Auth] ❌ All accounts failed")
-    return None, -1
-
 # Category keywords
 PLACE_CATEGORIES = {
     "vet": "veterinary clinic",
@@ -96,6 +23,45 @@ PLACE_CATEGORIES = {
 }
 
 MAX_RADIUS = 10000
+# Upper bound on upstream pages followed per category via /search cursors
+MAX_PAGES = 5
+# Cap on place digests carried in a /search cursor (oldest are dropped first)
+MAX_SEEN = 1000
+_SEEN_HASH = re.compile(r"[0-9a-f]{10}")
+
+def format_place(item: dict, idx: int, category: str, lat: float, lon: float) -> dict:
+    """Convert one Mappls suggestedLocations item to our place shape."""
+    return {
+        "id": item.get("eLoc", f"{category}_{idx}"),
+        "name": item.get("placeName", "Unknown"),
+        "address": item.get("placeAddress", "No address"),
+        "latitude": float(item.get("latitude", lat)),
+        "longitude": float(item.get("longitude", lon)),
+        "distance": int(item.get("distance", 0)),
+        "eloc": item.get("eLoc", ""),
+        "type": item.get("type", category)
+    }
+
+ERROR_MESSAGES = {
+    "rate_limited": "Daily API limit reached on all accounts. Please try again tomorrow or add more fallback accounts.",
+    "authentication_failed": "Unable to authenticate. All API accounts failed.",
+    "server_error": "Something went wrong. Please try again.",
+}
+
+def error_message(status: str, keyword: str, code: Optional[int] = None) -> str:
+    if status == "no_results":
+        return f"No {keyword}s found within 10km."
+    if status == "api_error":
+        return f"Service error ({code}). Please try again."
+    return ERROR_MESSAGES.get(status, ERROR_MESSAGES["server_error"])
+
+def error_response(status: str, keyword: str, code: Optional[int] = None) -> dict:
+    return {
+        "places": [],
+        "total": 0,
+        "error": status,
+        "message": error_message(status, keyword, code)
+    }
 
 @router.get("/nearby")
 async def get_nearby_places(
@@ -116,150 +82,236 @@ async def get_nearby_places(
     print(f"[Places] Location: {lat}, {lon}")
     print(f"{'='*60}\n")
     
-    # Get token with fallback support
-    access_token, account_index = await get_access_token()
+    # Serve from the local store when this area was fetched recently
+    try:
+        local_places = await places_store.lookup(category, lat, lon, MAX_RADIUS)
+    except Exception as e:
+        print(f"[Places] Local store lookup failed: {str(e)}")
+        local_places = None
+    
+    if local_places == []:
+        # Covered cell with nothing within range (or a stored empty upstream answer)
+        print(f"[Places] No {category} places in local store for this area")
+        return error_response("no_results", keyword)
     
-    if not access_token:
-        print(f"[Places] ❌ No valid access token")
+    if local_places is not None:
+        places = local_places[:10]
+        print(f"[Places] ✅ Served {len(places)} places from local store")
         return {
-            "places": [],
-            "total": 0,
-            "error": "authentication_failed",
-            "message": "Unable to authenticate. All API accounts failed."
+            "places": places,
+            "total": len(places),
+            "category": category
         }
     
-    print(f"[Places] Using {MAPPLS_ACCOUNTS[account_index]['name']} account")
-    
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            url = "https://atlas.mappls.com/api/places/nearby/json"
-            
-            params = {
-                "keywords": keyword,
-                "refLocation": f"{lat},{lon}",
-                "radius": MAX_RADIUS,
-                "page": 1
-            }
-            
-            headers = {
-                "Authorization": f"Bearer {access_token}"
-            }
-            
-            print(f"[Places] Calling Nearby API...")
-            print(f"[Places] URL: {url}")
-            print(f"[Places] Params: {params}")
-            
-            response = await client.get(url, params=params, headers=headers)
-            
-            print(f"[Places] Response Status: {response.status_code}")
-            print(f"[Places] Response Headers: {dict(response.headers)}")
-            
-            # Log response body for errors
-            if response.status_code != 200:
-                print(f"[Places] Response Body: {response.text[:500]}")
-            
-            # Handle rate limiting (429) or unauthorized (401)
-            if response.status_code == 429:
-                print(f"[Places] ❌ Rate limited (429) - daily limit exceeded")
-                
-                # Try fallback account
-                print(f"[Places] Trying fallback account...")
-                access_token, account_index = await get_access_token(account_index + 1)
-                
-                if not access_token:
-                    return {
-                        "places": [],
-                        "total": 0,
-                        "error": "rate_limited",
-                        "message": "Daily API limit reached on all accounts. Please try again tomorrow or add more fallback accounts."
-                    }
-                
-                # Retry with fallback
-                headers["Authorization"] = f"Bearer {access_token}"
-                print(f"[Places] Retrying with {MAPPLS_ACCOUNTS[account_index]['name']}...")
-                response = await client.get(url, params=params, headers=headers)
-                print(f"[Places] Retry Status: {response.status_code}")
-            
-            if response.status_code == 401:
-                print(f"[Places] ❌ Unauthorized (401)")
-                return {
-                    "places": [],
-                    "total": 0,
-                    "error": "authentication_failed",
-                    "message": "Authentication failed. Please check API credentials."
-                }
-            
-            if response.status_code == 204:
-                print(f"[Places] No results (204)")
-                return {
-                    "places": [],
-                    "total": 0,
-                    "error": "no_results",
-                    "message": f"No {keyword}s found within 10km."
-                }
-            
-            if response.status_code != 200:
-                print(f"[Places] ❌ API Error: {response.status_code}")
-                return {
-                    "places": [],
-                    "total": 0,
-                    "error": "api_error",
-                    "message": f"Service error ({response.status_code}). Please try again."
-                }
-            
-            # Success
-            data = response.json()
-            results = data.get("suggestedLocations", [])
-            
-            print(f"[Places] ✅ Found {len(results)} results")
-            
-            places = []
-            
-            for idx, item in enumerate(results[:10]):
-                distance = int(item.get("distance", 0))
-                
-                place_data = {
-                    "id": item.get("eLoc", f"{category}_{idx}"),
-                    "name": item.get("placeName", "Unknown"),
-                    "address": item.get("placeAddress", "No address"),
-                    "latitude": float(item.get("latitude", lat)),
-                    "longitude": float(item.get("longitude", lon)),
-                    "distance": distance,
-                    "eloc": item.get("eLoc", ""),
-                    "type": item.get("type", category)
-                }
-                
-                places.append(place_data)
-                print(f"  {idx+1}. {place_data['name']} - {distance}m")
-            
-            print(f"\n[Places] ✅ Returned {len(places)} places")
-            print(f"{'='*60}\n")
-            
-            return {
-                "places": places,
-                "total": len(places),
-                "category": category
-            }
-            
+        outcome = await mappls.nearby_search(keyword, lat, lon, MAX_RADIUS, page=1)
+        status = outcome["status"]
+        results = outcome.get("results", []) if status == "ok" else []
+        
+        if status in ("ok", "no_results"):
+            # Empty answers are stored too, as a negative entry for the cell
+            try:
+                await places_store.save(category, lat, lon, results, _total_pages(outcome.get("page_info") or {}))
+            except Exception as e:
+                print(f"[Places] Failed to store results locally: {str(e)}")
+        
+        if status == "ok" and not results:
+            status = "no_results"
+        if status != "ok":
+            print(f"[Places] ❌ Upstream status: {status} {outcome.get('code', '')}")
+            return error_response(status, keyword, outcome.get("code"))
+        
+        # Success
+        print(f"[Places] ✅ Found {len(results)} results via {outcome['account']}")
+        
+        places = []
+        
+        for idx, item in enumerate(results[:10]):
+            place_data = format_place(item, idx, category, lat, lon)
+            places.append(place_data)
+            print(f"  {idx+1}. {place_data['name']} - {place_data['distance']}m")
+        
+        print(f"\n[Places] ✅ Returned {len(places)} places")
+        print(f"{'='*60}\n")
+        
+        return {
+            "places": places,
+            "total": len(places),
+            "category": category
+        }
+        
     except Exception as e:
         print(f"[Places] ❌ Exception: {str(e)}")
         import traceback
         traceback.print_exc()
-        return {
-            "places": [],
-            "total": 0,
-            "error": "server_error",
-            "message": "Something went wrong. Please try again."
-        }
+        return error_response("server_error", keyword)
 
+def _place_key(place: dict) -> str:
+    return place["eloc"] or place["id"]
 
+def _seen_hash(key: str) -> str:
+    """Short digest of a place key, carried in cursors to dedupe across pages."""
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:10]
 
+def _encode_cursor(lat: float, lon: float, pages: dict, seen: list) -> Optional[str]:
+    """Cursor bound to the search's lat/lon, with the pages to fetch next and places already sent."""
+    pending = {cat: page for cat, page in pages.items() if page}
+    if not pending:
+        return None
+    state = {"lat": lat, "lon": lon, "pages": pending, "seen": seen[-MAX_SEEN:]}
+    raw = json.dumps(state, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
 
+def _decode_cursor(cursor: str, lat: float, lon: float) -> tuple:
+    """(pages, seen) from a cursor; 400 if it is malformed or from another search."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        state = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(state, dict):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    pages, seen = state.get("pages"), state.get("seen")
+    if not isinstance(pages, dict) or not isinstance(seen, list) or not all(
+        cat in PLACE_CATEGORIES and isinstance(page, int) and 1 < page <= MAX_PAGES
+        for cat, page in pages.items()
+    ):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if len(seen) > MAX_SEEN or not all(
+        isinstance(digest, str) and _SEEN_HASH.fullmatch(digest) for digest in seen
+    ):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if state.get("lat") != lat or state.get("lon") != lon:
+        raise HTTPException(status_code=400, detail="Cursor does not match this search's lat/lon")
+    return pages, seen
 
+def _total_pages(page_info: dict) -> Optional[int]:
+    try:
+        return int(page_info.get("totalPages") or page_info.get("pageCount"))
+    except (TypeError, ValueError):
+        return None
 
+def _next_page(page: int, total_pages: Optional[int], results: list) -> Optional[int]:
+    if not results or total_pages is None or total_pages <= page or page >= MAX_PAGES:
+        return None
+    return page + 1
 
+async def _search_category(category: str, page: int, lat: float, lon: float) -> dict:
+    """One category's page for /search: {"places", "next_page"} or {"error", "message"}."""
+    keyword = PLACE_CATEGORIES[category]
+    if page == 1:
+        try:
+            local_places = await places_store.lookup(category, lat, lon, MAX_RADIUS)
+        except Exception as e:
+            print(f"[Places] Local store lookup failed: {str(e)}")
+            local_places = None
+        if local_places is not None:
+            # The local store answers with everything it has for the area; upstream
+            # pages after the first may still add more (repeats are deduped by the caller).
+            try:
+                total_pages = await places_store.covered_pages(category, lat, lon)
+            except Exception as e:
+                print(f"[Places] Coverage lookup failed: {str(e)}")
+                total_pages = None
+            if total_pages is None and local_places:
+                total_pages = MAX_PAGES  # covered before page counts were recorded: let upstream say
+            return {"places": local_places, "next_page": _next_page(1, total_pages, local_places)}
 
+    outcome = await mappls.nearby_search(keyword, lat, lon, MAX_RADIUS, page=page)
+    status = outcome["status"]
+    if status != "ok":
+        if status == "no_results" and page > 1:
+            return {"places": [], "next_page": None}
+        return {"error": status, "message": error_message(status, keyword, outcome.get("code"))}
 
+    results = outcome["results"]
+    total_pages = _total_pages(outcome["page_info"])
+    try:
+        await places_store.save(category, lat, lon, results, total_pages if page == 1 else None)
+    except Exception as e:
+        print(f"[Places] Failed to store results locally: {str(e)}")
 
+    return {
+        "places": [format_place(item, idx, category, lat, lon) for idx, item in enumerate(results)],
+        "next_page": _next_page(page, total_pages, results),
+    }
+
+@router.get("/search")
+async def search_places(
+    lat: float = Query(..., description="User latitude"),
+    lon: float = Query(..., description="User longitude"),
+    categories: Optional[str] = Query(None, description="Comma-separated categories, e.g. vet,pet_store,shelter"),
+    cursor: Optional[str] = Query(None, description="next_cursor from a previous response"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Nearby places for several categories in one round trip. Categories are
+    fetched concurrently, merged, de-duplicated by eLoc and sorted by
+    distance. Pass `next_cursor` back (with the same lat/lon) for the next
+    upstream page of every category that has one; places already returned
+    on earlier pages are left out.
+    """
+    seen = []
+    if cursor:
+        pages, seen = _decode_cursor(cursor, lat, lon)
+    else:
+        requested = [c.strip() for c in (categories or "").split(",") if c.strip()]
+        if not requested:
+            raise HTTPException(status_code=400, detail="At least one category is required")
+        invalid = [c for c in requested if c not in PLACE_CATEGORIES]
+        if invalid:
+            raise HTTPException(status_code=400, detail=f"Invalid category: {', '.join(invalid)}")
+        pages = {c: 1 for c in dict.fromkeys(requested)}
+
+    print(f"[Places] Search {pages} at {lat}, {lon}")
 
+    outcomes = await asyncio.gather(
+        *(_search_category(cat, page, lat, lon) for cat, page in pages.items()),
+        return_exceptions=True,
+    )
 
+    already_sent = set(seen)
+    places_by_eloc = {}
+    next_pages = {}
+    errors = {}
+    for (category, page), outcome in zip(pages.items(), outcomes):
+        if isinstance(outcome, Exception):
+            print(f"[Places] ❌ {category} page {page} exception: {str(outcome)}")
+            outcome = {"error": "server_error", "message": error_message("server_error", PLACE_CATEGORIES[category])}
+        if "error" in outcome:
+            errors[category] = {"error": outcome["error"], "message": outcome["message"]}
+            continue
+        next_pages[category] = outcome["next_page"]
+        for place in outcome["places"]:
+            key = _place_key(place)
+            if _seen_hash(key) in already_sent:
+                continue
+            merged = places_by_eloc.get(key)
+            if merged is None:
+                places_by_eloc[key] = dict(place, categories=[category])
+            elif category not in merged["categories"]:
+                merged["categories"].append(category)
+
+    places = sorted(places_by_eloc.values(), key=lambda place: place["distance"])
+    seen = seen + [_seen_hash(key) for key in places_by_eloc]
+    print(f"[Places] ✅ Search returned {len(places)} places ({len(errors)} categories failed)")
+
+    return {
+        "places": places,
+        "total": len(places),
+        "categories": list(pages),
+        "errors": errors,
+        "next_cursor": _encode_cursor(lat, lon, next_pages, seen),
+    }
+
+@router.get("/accounts")
+async def get_account_usage(current_user: dict = Depends(get_current_user)):
+    """Per-account Mappls usage counters and health (admin only)."""
+    payload = current_user["payload"]
+    public_metadata = payload.get("public_metadata", {})
+    role = public_metadata.get("role") or payload.get("role")
+    
+    if role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return {"accounts": mappls.usage()}
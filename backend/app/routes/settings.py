@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
 from typing import Optional
 
 from ..auth import get_current_user
 from ..database import db
+from ..http_cache import PRIVATE_REVALIDATE, bump_user_version, check, json_response, user_etag
 
 router = APIRouter(prefix="/api/settings", tags=["settings"])
 
@@ -14,9 +15,13 @@ class UserSettings(BaseModel):
     language: str = "en"
 
 @router.get("")
-async def get_settings(current_user: dict = Depends(get_current_user)):
-    """Get user settings"""
+async def get_settings(request: Request, current_user: dict = Depends(get_current_user)):
+    """Get user settings (ETag-validated; If-None-Match gets a 304)"""
     user_id = current_user["user_id"]
+    etag = await user_etag(request, user_id, "settings")
+    unchanged = check(request, etag, PRIVATE_REVALIDATE, private=True)
+    if unchanged is not None:
+        return unchanged
     
     # Try to find existing settings
     settings = await db["user_settings"].find_one({"user_id": user_id})
@@ -27,14 +32,14 @@ async def get_settings(current_user: dict = Depends(get_current_user)):
         settings.pop("user_id", None)
         # Remove old anonymousMode field if it exists
         settings.pop("anonymousMode", None)
-        return settings
-    
-    # Return default settings if none exist
-    return {
-        "imageQuality": "high",
-        "saveHistory": True,
-        "language": "en"
-    }
+    else:
+        # Return default settings if none exist
+        settings = {
+            "imageQuality": "high",
+            "saveHistory": True,
+            "language": "en"
+        }
+    return json_response(settings, etag, PRIVATE_REVALIDATE, private=True)
 
 @router.post("")
 async def save_settings(
@@ -55,6 +60,7 @@ async def save_settings(
         {"$set": settings_doc},
         upsert=True
     )
+    await bump_user_version(user_id, "settings")
     
     return {
         "message": "Settings saved successfully",
@@ -78,6 +84,7 @@ async def reset_settings(current_user: dict = Depends(get_current_user)):
         {"$set": default_settings},
         upsert=True
     )
+    await bump_user_version(user_id, "settings")
     
     return {
         "message": "Settings reset to defaults",
@@ -0,0 +1,181 @@
+# backend/app/trending.py
+"""
+Trending-breed leaderboards served from memory.
+
+Searches land in hourly buckets (`breed_search_hourly`, written by
+app/breed_tracking.py). A background task keeps the buckets of the longest
+window in memory and, every TRENDING_REFRESH_INTERVAL seconds, re-reads only
+the hours that can still change (the last two), then recomputes each
+window's top N. The all-time board comes from `breed_searches` via the
+`count` index. GET /api/breeds/top just returns the current snapshot.
+
+Each window's response body and ETag are built once per refresh, and a
+board whose ranking didn't change keeps its previous body (and generated_at),
+so clients revalidating with If-None-Match get 304 until it actually moves.
+"""
+import asyncio
+import os
+import re
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from .breed_tracking import hour_bucket
+from .database import breed_search_hourly_collection, breed_searches_collection
+from .http_cache import body_etag, serialize
+
+# Comma-separated windows: "<n>h", "<n>d" or "all"
+TRENDING_WINDOWS = os.getenv("TRENDING_WINDOWS", "24h,7d,all")
+TRENDING_REFRESH_INTERVAL = float(os.getenv("TRENDING_REFRESH_INTERVAL", 60))
+TRENDING_TOP_N = int(os.getenv("TRENDING_TOP_N", 10))
+# Hourly buckets are expired by a TTL index after this many days (see app/indexes.py)
+TRENDING_RETENTION_DAYS = int(os.getenv("TRENDING_RETENTION_DAYS", 35))
+
+
+def parse_windows(spec: str, retention: timedelta = timedelta(days=TRENDING_RETENTION_DAYS)) -> Dict[str, Optional[timedelta]]:
+    """
+    Parse TRENDING_WINDOWS. Windows must be non-empty and fit in `retention`:
+    older hourly buckets have been expired by the TTL index, so a longer
+    window would silently show less than it says.
+    """
+    windows = {}
+    for name in (part.strip().lower() for part in spec.split(",")):
+        if not name:
+            continue
+        if name == "all":
+            windows[name] = None
+            continue
+        match = re.fullmatch(r"(\d+)([hd])", name)
+        if not match:
+            raise ValueError(f"Invalid trending window {name!r}; use e.g. 24h, 7d or all")
+        amount = int(match.group(1))
+        span = timedelta(hours=amount) if match.group(2) == "h" else timedelta(days=amount)
+        if span <= timedelta(0):
+            raise ValueError(f"Invalid trending window {name!r}: must be longer than zero")
+        if span > retention:
+            raise ValueError(
+                f"Invalid trending window {name!r}: longer than TRENDING_RETENTION_DAYS ({retention.days}d)"
+            )
+        windows[name] = span
+    return windows
+
+
+class TrendingLeaderboard:
+    def __init__(self, windows: Dict[str, Optional[timedelta]], top_n: int = TRENDING_TOP_N,
+                 refresh_interval: float = TRENDING_REFRESH_INTERVAL):
+        self.windows = windows
+        self.top_n = top_n
+        self.refresh_interval = refresh_interval
+        spans = [span for span in windows.values() if span is not None]
+        self.max_span = max(spans) if spans else None
+
+        # hour -> {breed_id: count}, covering max_span
+        self._hours: Dict[datetime, Dict[str, int]] = {}
+        self._names: Dict[str, str] = {}
+        self._loaded_through: Optional[datetime] = None
+        # window -> {"top_searched": [...], "generated_at": iso, "body": bytes, "etag": str}
+        self._snapshot: Dict[str, dict] = {}
+        self._refresh_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def get(self, window: str) -> dict:
+        """Current leaderboard for `window`; only the very first call may hit MongoDB."""
+        if window not in self._snapshot:
+            await self.refresh()
+        return self._snapshot[window]
+
+    async def refresh(self):
+        async with self._refresh_lock:
+            now = datetime.utcnow()
+            if self.max_span is not None:
+                await self._load_hours(now)
+            generated_at = now.isoformat()
+            snapshot = {}
+            for name, span in self.windows.items():
+                if span is None:
+                    top = await self._all_time()
+                else:
+                    top = self._top_since(hour_bucket(now - span) + timedelta(hours=1))
+                previous = self._snapshot.get(name)
+                if previous is not None and previous["top_searched"] == top:
+                    snapshot[name] = previous
+                else:
+                    snapshot[name] = self._board(name, top, generated_at)
+            self._snapshot = snapshot
+
+    @staticmethod
+    def _board(window: str, top: List[dict], generated_at: str) -> dict:
+        body = serialize({
+            "top_searched": top,
+            "count": len(top),
+            "window": window,
+            "generated_at": generated_at
+        })
+        return {"top_searched": top, "generated_at": generated_at, "body": body, "etag": body_etag(body)}
+
+    async def _load_hours(self, now: datetime):
+        oldest = hour_bucket(now - self.max_span)
+        # Buckets before the previous hour no longer change (flushes lag by seconds), so
+        # after the first load only the last two hours are re-read.
+        since = oldest if self._loaded_through is None else max(oldest, self._loaded_through - timedelta(hours=1))
+        fresh: Dict[datetime, Dict[str, int]] = {}
+        cursor = breed_search_hourly_collection.find(
+            {"hour": {"$gte": since}}, {"_id": 0, "breed_id": 1, "breed_name": 1, "hour": 1, "count": 1}
+        )
+        async for doc in cursor:
+            fresh.setdefault(doc["hour"], {})[doc["breed_id"]] = doc["count"]
+            self._names[doc["breed_id"]] = doc.get("breed_name", doc["breed_id"])
+        for hour in [h for h in self._hours if h >= since or h < oldest]:
+            del self._hours[hour]
+        self._hours.update(fresh)
+        self._loaded_through = hour_bucket(now)
+
+    def _top_since(self, start: datetime) -> List[dict]:
+        totals: Dict[str, int] = {}
+        for hour, counts in self._hours.items():
+            if hour < start:
+                continue
+            for breed_id, count in counts.items():
+                totals[breed_id] = totals.get(breed_id, 0) + count
+        ranked = sorted(totals.items(), key=lambda item: (-item[1], item[0]))[: self.top_n]
+        return [
+            {"breed_id": breed_id, "breed_name": self._names.get(breed_id, breed_id), "count": count}
+            for breed_id, count in ranked
+        ]
+
+    async def _all_time(self) -> List[dict]:
+        cursor = breed_searches_collection.find(
+            {}, {"_id": 0, "breed_id": 1, "breed_name": 1, "count": 1, "last_searched": 1}
+        ).sort("count", -1).limit(self.top_n)
+        return [
+            {
+                "breed_id": item["breed_id"],
+                "breed_name": item["breed_name"],
+                "count": item["count"],
+                "last_searched": item.get("last_searched")
+            }
+            async for item in cursor
+        ]
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"[Trending] Refresh failed: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+
+LEADERBOARD = TrendingLeaderboard(parse_windows(TRENDING_WINDOWS))
@@ -0,0 +1,119 @@
+# backend/scripts/benchmark_cascade.py
+"""
+Measure what the confidence-gated cascade buys on a labelled sample.
+
+    # from backend/
+    python -m scripts.benchmark_cascade --images ./eval_images \\
+        --cascade-model ./app/model/small_224.keras --thresholds 0.7,0.8,0.85,0.9
+
+Each image runs through both models once. For every threshold the report
+simulates the cascade (small model, plus the full model when the small
+model's top probability is below the threshold) and shows the share answered
+by the small model, mean/p50/p95 latency against full-model-only, agreement
+with the full model, and accuracy when images sit in breed-named sub-dirs.
+"""
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+from dotenv import load_dotenv
+
+from app.inference_backends import main_tflite_path
+from app.preprocessing import decode_image_bytes, load_model_from_path, predict_top, preprocess_image
+from scripts.common import APP_DIR, iter_images, latency_summary
+
+
+def main(argv=None):
+    load_dotenv(dotenv_path=APP_DIR.parent.joinpath(".env"))
+    parser = argparse.ArgumentParser(description="Benchmark the small-model-first cascade.")
+    parser.add_argument("--images", required=True)
+    parser.add_argument("--model-path", default=os.getenv("MODEL_PATH", str(APP_DIR.joinpath("model/efficientnetv2b2_320.keras"))))
+    parser.add_argument("--cascade-model", default=os.getenv("CASCADE_MODEL_PATH"))
+    parser.add_argument("--cascade-size", type=int, default=int(os.getenv("CASCADE_IMG_SIZE", 224)))
+    parser.add_argument("--thresholds", default=os.getenv("CASCADE_THRESHOLD", "0.85"))
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--json", help="Also write the report as JSON to this path")
+    args = parser.parse_args(argv)
+    if not args.cascade_model:
+        raise SystemExit("--cascade-model (or CASCADE_MODEL_PATH) is required")
+
+    full_model = load_model_from_path(args.model_path, tflite_path=main_tflite_path())
+    small_model = load_model_from_path(
+        args.cascade_model, os.getenv("CASCADE_BACKEND", "keras"), os.getenv("CASCADE_TFLITE_PATH") or None
+    )
+    small_size = (args.cascade_size, args.cascade_size)
+
+    rows = []  # (label, small_idx, small_prob, small_s, full_idx, full_s)
+    for i, (path, label) in enumerate(iter_images(args.images, limit=args.limit)):
+        try:
+            img = decode_image_bytes(path.read_bytes())
+        except Exception as e:
+            print(f"[cascade] skipping {path}: {e}")
+            continue
+        small_arr = preprocess_image(img, size=small_size)
+        full_arr = preprocess_image(img)
+        if i == 0:  # warm up both graphs outside the timings
+            predict_top(small_model, small_arr)
+            predict_top(full_model, full_arr)
+
+        start = time.perf_counter()
+        s_idx, s_prob = predict_top(small_model, small_arr)
+        small_s = time.perf_counter() - start
+        start = time.perf_counter()
+        f_idx, _ = predict_top(full_model, full_arr)
+        full_s = time.perf_counter() - start
+        rows.append((label, s_idx, s_prob, small_s, f_idx, full_s))
+
+    if not rows:
+        raise SystemExit(f"No usable images under {args.images}")
+
+    labelled = [r for r in rows if r[0] is not None]
+    full_lat = [r[5] for r in rows]
+    report = {
+        "images": len(rows),
+        "labelled": len(labelled),
+        "full_only": {"latency": latency_summary(full_lat)},
+        "cascade": {},
+    }
+    if labelled:
+        report["full_only"]["accuracy"] = round(float(np.mean([r[4] == r[0] for r in labelled])), 4)
+
+    for th in [float(t) for t in args.thresholds.split(",") if t.strip()]:
+        answers, lat, early = [], [], 0
+        for label, s_idx, s_prob, small_s, f_idx, full_s in rows:
+            if s_prob >= th:
+                answers.append(s_idx)
+                lat.append(small_s)
+                early += 1
+            else:
+                answers.append(f_idx)
+                lat.append(small_s + full_s)
+        entry = {
+            "answered_by_small": round(early / len(rows), 4),
+            "agreement_with_full": round(float(np.mean([a == r[4] for a, r in zip(answers, rows)])), 4),
+            "latency": latency_summary(lat),
+            "mean_latency_saved_pct": round(100.0 * (1 - sum(lat) / sum(full_lat)), 2),
+        }
+        if labelled:
+            entry["accuracy"] = round(float(np.mean([a == r[0] for a, r in zip(answers, rows) if r[0] is not None])), 4)
+        report["cascade"][str(th)] = entry
+
+    full = report["full_only"]
+    print(f"\nfull model only: p50 {full['latency']['p50_ms']} ms, mean {full['latency']['mean_ms']} ms"
+          + (f", accuracy {full['accuracy']:.3f}" if "accuracy" in full else ""))
+    print(f"{'threshold':>9} {'small%':>7} {'p50 ms':>8} {'mean ms':>8} {'saved%':>7} {'agree':>7} {'acc':>7}")
+    for th, e in report["cascade"].items():
+        acc = f"{e['accuracy']:.3f}" if "accuracy" in e else "-"
+        print(f"{th:>9} {100 * e['answered_by_small']:>7.1f} {e['latency']['p50_ms']:>8} "
+              f"{e['latency']['mean_ms']:>8} {e['mean_latency_saved_pct']:>7} {e['agreement_with_full']:>7.3f} {acc:>7}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+        print(f"\n[cascade] wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
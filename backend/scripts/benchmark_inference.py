@@ -0,0 +1,213 @@
+# backend/scripts/benchmark_inference.py
+"""
+Micro-benchmarks for the prediction hot path.
+
+    # from backend/
+    python -m scripts.benchmark_inference --output bench.json
+    python -m scripts.benchmark_inference --baseline bench.json   # compare, exit 1 on regression
+
+Times preprocess_image_bytes (per image size / format / PREPROCESS_MODE),
+predict_top and predict_top_batch, the probability post-processing, and
+end-to-end POST /predict through FastAPI's TestClient. Runs on CPU; when
+MODEL_PATH does not exist a tiny stand-in Keras model with the same input
+and output shape is used, so numbers are comparable run-to-run on one
+machine but not with the real model. Output is JSON with p50/p95/p99
+latency and throughput per benchmark.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from io import BytesIO
+from pathlib import Path
+
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "-1")  # CPU only, comparable across machines
+
+import numpy as np
+from PIL import Image
+
+from scripts.common import APP_DIR, NUM_CLASSES, build_stand_in_model, latency_summary
+
+IMAGE_SIZES = {"small": (640, 480), "medium": (1920, 1080), "large": (4032, 3024)}
+IMAGE_FORMATS = ("JPEG", "PNG", "WEBP")
+
+
+def make_image(size, fmt: str) -> bytes:
+    w, h = size
+    x = np.linspace(0, 255, w, dtype=np.float32)
+    y = np.linspace(0, 255, h, dtype=np.float32)
+    arr = np.stack([np.add.outer(y, x) / 2, np.tile(x, (h, 1)), np.tile(y[:, None], (1, w))], axis=-1)
+    buf = BytesIO()
+    Image.fromarray(arr.astype(np.uint8)).save(buf, format=fmt, quality=90)
+    return buf.getvalue()
+
+
+def timed(fn, iterations: int, warmup: int = 2, items: int = 1):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    summary = latency_summary(samples)
+    if items > 1 and summary.get("throughput_per_s"):
+        summary["throughput_per_s"] = round(summary["throughput_per_s"] * items, 3)
+        summary["items_per_call"] = items
+    return summary
+
+
+def bench_preprocess(results, iterations):
+    from app.preprocessing import preprocess_image_bytes
+
+    for size_name, size in IMAGE_SIZES.items():
+        for fmt in IMAGE_FORMATS:
+            data = make_image(size, fmt)
+            for mode in ("exact", "fast"):
+                fast = mode == "fast"
+                results[f"preprocess/{size_name}/{fmt.lower()}/{mode}"] = timed(
+                    lambda: preprocess_image_bytes(data, fast=fast), iterations
+                )
+
+
+def bench_predict(results, model, iterations, batch_sizes):
+    from app.preprocessing import predict_top, predict_top_batch, preprocess_image_bytes
+
+    arr = preprocess_image_bytes(make_image(IMAGE_SIZES["small"], "JPEG"))
+    results["predict_top/single"] = timed(lambda: predict_top(model, arr), iterations)
+    for bs in batch_sizes:
+        batch = np.repeat(arr, bs, axis=0)
+        results[f"predict_top_batch/{bs}"] = timed(lambda: predict_top_batch(model, batch), iterations, items=bs)
+
+
+def bench_postprocess(results, iterations):
+    from app.preprocessing import _is_probabilities, _probabilities
+
+    rng = np.random.default_rng(0)
+    logits = rng.normal(size=NUM_CLASSES).astype(np.float32)
+    probs = np.exp(logits) / np.exp(logits).sum()
+    results["postprocess/is_probabilities"] = timed(lambda: _is_probabilities(probs), iterations * 20)
+    results["postprocess/probabilities/probs"] = timed(lambda: _probabilities(probs), iterations * 20)
+    results["postprocess/probabilities/logits_softmax"] = timed(lambda: _probabilities(logits), iterations * 20)
+
+
+def bench_endpoint(results, model_path, iterations):
+    # Configure app.main before it is imported: local model, no cache/cascade/model server.
+    os.environ["MODEL_PATH"] = model_path
+    os.environ["MODEL_SERVER_ADDRESS"] = ""
+    os.environ["CASCADE_MODEL_PATH"] = ""
+    os.environ["PREDICTION_CACHE_SIZE"] = "0"
+    from fastapi.testclient import TestClient
+    import app.main as main_module
+
+    # Only load the model: the real lifespan also builds Mongo indexes, refreshes
+    # JWKS and runs job workers/migrations, which would add external calls and
+    # background load to the /predict numbers.
+    @asynccontextmanager
+    async def model_only_lifespan(_app):
+        await main_module._load_model_in_background()
+        yield
+        await main_module.BATCHER.stop()
+
+    app = main_module.app
+    app.router.lifespan_context = model_only_lifespan
+
+    data = make_image(IMAGE_SIZES["medium"], "JPEG")
+    with TestClient(app) as client:
+        deadline = time.time() + 300
+        while client.get("/readyz").status_code != 200:
+            if time.time() > deadline:
+                raise RuntimeError("model did not become ready")
+            time.sleep(0.2)
+
+        def call():
+            r = client.post("/predict", files={"file": ("dog.jpg", data, "image/jpeg")})
+            r.raise_for_status()
+
+        results["endpoint/predict/medium_jpeg"] = timed(call, iterations)
+
+
+def compare(results, baseline_path, tolerance):
+    baseline = json.loads(Path(baseline_path).read_text())["results"]
+    regressions = []
+    print(f"\n{'benchmark':<48} {'base p50':>9} {'now p50':>9} {'change':>8}")
+    for name, now in results.items():
+        base = baseline.get(name)
+        if not base or not base.get("p50_ms") or not now.get("p50_ms"):
+            continue
+        change = now["p50_ms"] / base["p50_ms"] - 1
+        flag = " REGRESSION" if change > tolerance else ""
+        print(f"{name:<48} {base['p50_ms']:>9} {now['p50_ms']:>9} {100 * change:>7.1f}%{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark preprocessing and prediction.")
+    parser.add_argument("--model-path", default=os.getenv("MODEL_PATH", str(APP_DIR.joinpath("model/efficientnetv2b2_320.keras"))))
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--batch-sizes", default="1,4,8,16")
+    parser.add_argument("--only", default="preprocess,predict,postprocess,endpoint",
+                        help="Comma-separated subset of benchmark groups")
+    parser.add_argument("--output", help="Write JSON results here (default: stdout)")
+    parser.add_argument("--baseline", help="Compare p50 latencies against a stored results file")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed p50 slowdown vs baseline")
+    args = parser.parse_args(argv)
+    groups = {g.strip() for g in args.only.split(",") if g.strip()}
+
+    stand_in = not Path(args.model_path).exists()
+    model_path = args.model_path
+    if stand_in:
+        model_path = build_stand_in_model(str(Path(tempfile.mkdtemp()).joinpath("stand_in.keras")))
+        print(f"[bench] {args.model_path} not found; using stand-in model", file=sys.stderr)
+
+    results = {}
+    if "preprocess" in groups:
+        bench_preprocess(results, args.iterations)
+    if "predict" in groups:
+        from app.inference_backends import main_tflite_path
+        from app.preprocessing import load_model_from_path
+        model = load_model_from_path(model_path, tflite_path=main_tflite_path())
+        bench_predict(results, model, args.iterations, [int(b) for b in args.batch_sizes.split(",")])
+    if "postprocess" in groups:
+        bench_postprocess(results, args.iterations)
+    if "endpoint" in groups:
+        bench_endpoint(results, model_path, args.iterations)
+
+    import tensorflow as tf
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "model": "stand-in" if stand_in else args.model_path,
+            "inference_backend": os.getenv("INFERENCE_BACKEND", "keras"),
+            "python": platform.python_version(),
+            "tensorflow": tf.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "iterations": args.iterations,
+        },
+        "results": results,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text)
+        print(f"[bench] wrote {args.output}", file=sys.stderr)
+    elif not args.baseline:
+        print(text)
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) slower than baseline by > {args.tolerance:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
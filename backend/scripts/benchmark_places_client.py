@@ -0,0 +1,75 @@
+# backend/scripts/benchmark_places_client.py
+"""
+Compare a fresh httpx.AsyncClient per call (the old places.py behaviour)
+with the shared pooled client from app.http_clients, against the local fake
+Mappls server (TLS by default, so handshake cost is included).
+
+    # from backend/
+    python -m scripts.benchmark_places_client --requests 200
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from app.http_clients import build_client
+from scripts.common import latency_summary
+from scripts.fake_mappls import run_in_thread
+
+PARAMS = {"keywords": "veterinary clinic", "refLocation": "28.6139,77.2090", "radius": 10000, "page": 1}
+HEADERS = {"Authorization": "Bearer fake-bench"}
+
+
+async def per_call_clients(base_url: str, n: int):
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        async with httpx.AsyncClient(timeout=30.0, verify=False) as client:
+            r = await client.get(f"{base_url}/api/places/nearby/json", params=PARAMS, headers=HEADERS)
+            r.raise_for_status()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def pooled_client(base_url: str, n: int):
+    client = build_client(base_url, verify=False)
+    samples = []
+    try:
+        for _ in range(n):
+            start = time.perf_counter()
+            r = await client.get("/api/places/nearby/json", params=PARAMS, headers=HEADERS)
+            r.raise_for_status()
+            samples.append(time.perf_counter() - start)
+    finally:
+        await client.aclose()
+    return samples
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark per-call vs pooled Mappls HTTP clients.")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--no-tls", action="store_true")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated upstream processing time")
+    args = parser.parse_args(argv)
+
+    server, base_url = run_in_thread(args.port, tls=not args.no_tls, latency_ms=args.latency_ms)
+    try:
+        per_call = latency_summary(asyncio.run(per_call_clients(base_url, args.requests)))
+        pooled = latency_summary(asyncio.run(pooled_client(base_url, args.requests)))
+    finally:
+        server.should_exit = True
+
+    report = {
+        "base_url": base_url,
+        "per_call_client": per_call,
+        "pooled_client": pooled,
+        "p50_improvement_pct": round(100 * (1 - pooled["p50_ms"] / per_call["p50_ms"]), 1),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+# backend/scripts/check_preprocess_parity.py
+"""
+Regression check: PREPROCESS_MODE=fast must keep predictions the same as the
+exact path.
+
+    # from backend/
+    python -m scripts.check_preprocess_parity                 # synthetic photos + EXIF cases
+    python -m scripts.check_preprocess_parity --images ./eval_images
+
+For every image the fast path is compared with the reference: the exact path
+run on the upright image. Upright means EXIF orientation applied; the exact
+path itself ignores EXIF. The check covers mean absolute pixel difference
+(0..255 scale), top-1 agreement and confidence drift.
+
+The synthetic set includes JPEGs stored sideways/flipped with an EXIF
+orientation tag; their reference is the known upright original, so the fast
+path must produce the expected orientation. Predictions use MODEL_PATH when
+it exists, otherwise the seeded stand-in model that benchmark_inference also
+uses (same input/output signature, so input drift shows up the same way).
+Exits non-zero when a tolerance is exceeded.
+"""
+import argparse
+import os
+import sys
+import tempfile
+from io import BytesIO
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageOps
+
+from app.preprocessing import predict_top, preprocess_image, preprocess_image_bytes
+from scripts.common import APP_DIR, build_stand_in_model, iter_images
+
+# EXIF orientation -> transpose that turns the upright image into the stored pixels
+# (the inverse of what ImageOps.exif_transpose applies when decoding)
+EXIF_CASES = {
+    2: Image.FLIP_LEFT_RIGHT,
+    3: Image.ROTATE_180,
+    6: Image.ROTATE_90,
+    8: Image.ROTATE_270,
+}
+
+
+def _synthetic_image(w: int, h: int, rng) -> Image.Image:
+    x = np.linspace(0, 255, w, dtype=np.float32)
+    y = np.linspace(0, 255, h, dtype=np.float32)
+    base = np.stack([
+        np.add.outer(y, x) / 2,
+        np.tile(x, (h, 1)),
+        np.tile(y[:, None], (1, w)),
+    ], axis=-1).astype(np.uint8)
+    img = Image.fromarray(base)
+    draw = ImageDraw.Draw(img)
+    for _ in range(12):
+        cx, cy = rng.integers(0, w), rng.integers(0, h)
+        r = int(rng.integers(min(w, h) // 20, min(w, h) // 4))
+        draw.ellipse([cx - r, cy - r, cx + r, cy + r], fill=tuple(int(c) for c in rng.integers(0, 255, 3)))
+    return img
+
+
+def synthetic_photos(count: int = 6):
+    """Yield (name, jpeg_bytes, upright) for smooth, photo-sized test images."""
+    rng = np.random.default_rng(0)
+    sizes = [(4032, 3024), (3024, 4032), (1920, 1080), (800, 600), (640, 640), (321, 480)]
+    for i in range(count):
+        w, h = sizes[i % len(sizes)]
+        img = _synthetic_image(w, h, rng)
+        buf = BytesIO()
+        img.save(buf, format="JPEG", quality=90)
+        yield f"synthetic_{w}x{h}_{i}.jpg", buf.getvalue(), img
+
+
+def exif_oriented_photos():
+    """Yield (name, jpeg_bytes, upright): pixels stored transformed, EXIF tag says how to undo it."""
+    rng = np.random.default_rng(1)
+    # Landscape and asymmetric, so a missed or wrong rotation can't go unnoticed.
+    upright = _synthetic_image(1600, 1000, rng)
+    ImageDraw.Draw(upright).rectangle([0, 0, 400, 250], fill=(255, 0, 0))
+    for orientation, transpose in EXIF_CASES.items():
+        exif = Image.Exif()
+        exif[0x0112] = orientation
+        buf = BytesIO()
+        upright.transpose(transpose).save(buf, format="JPEG", quality=90, exif=exif.tobytes())
+        yield f"exif_orientation_{orientation}.jpg", buf.getvalue(), upright
+
+
+def file_photos(image_dir: str, limit: int):
+    for path, _ in iter_images(image_dir, limit=limit):
+        yield path.name, path.read_bytes(), None
+
+
+def reference_array(data: bytes, upright: Image.Image = None) -> np.ndarray:
+    """Exact-path array of the image as it should be seen (EXIF orientation applied)."""
+    if upright is None:
+        upright = ImageOps.exif_transpose(Image.open(BytesIO(data)))
+    return preprocess_image(upright.convert("RGB"), fast=False)
+
+
+def load_model():
+    from app.inference_backends import main_tflite_path
+    from app.preprocessing import load_model_from_path
+
+    model_path = os.getenv("MODEL_PATH", str(APP_DIR.joinpath("model/efficientnetv2b2_320.keras")))
+    if not Path(model_path).exists():
+        print(f"[parity] {model_path} not found; using stand-in model", file=sys.stderr)
+        model_path = build_stand_in_model(str(Path(tempfile.mkdtemp()).joinpath("stand_in.keras")))
+        return load_model_from_path(model_path, "keras")
+    return load_model_from_path(model_path, tflite_path=main_tflite_path())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check fast vs exact preprocessing parity.")
+    parser.add_argument("--images", help="Directory of real photos (default: synthetic images)")
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--pixel-tolerance", type=float, default=3.0,
+                        help="Max allowed mean absolute pixel difference (0..255)")
+    parser.add_argument("--pixels-only", action="store_true", help="Skip the prediction comparison")
+    parser.add_argument("--min-agreement", type=float, default=0.98)
+    parser.add_argument("--prob-tolerance", type=float, default=0.05)
+    args = parser.parse_args(argv)
+
+    if args.images:
+        samples = file_photos(args.images, args.limit)
+    else:
+        samples = list(synthetic_photos()) + list(exif_oriented_photos())
+
+    model = None if args.pixels_only else load_model()
+
+    failures, agree, prob_diffs, checked = 0, 0, [], 0
+    for name, data, upright in samples:
+        reference = reference_array(data, upright)
+        fast = preprocess_image_bytes(data, fast=True)
+        if fast.shape != reference.shape:
+            print(f"  FAIL  {name}: shape {fast.shape} != {reference.shape}")
+            failures += 1
+            checked += 1
+            continue
+        mad = float(np.mean(np.abs(reference - fast)))
+        ok = mad <= args.pixel_tolerance
+        failures += not ok
+        checked += 1
+        line = f"  {'ok  ' if ok else 'FAIL'}  {name}: mean |diff| = {mad:.3f}"
+
+        if model is not None:
+            (ri, rp), (fi, fp) = predict_top(model, reference), predict_top(model, fast)
+            agree += ri == fi
+            prob_diffs.append(abs(rp - fp))
+            line += f", top1 {ri}/{fi}, conf {rp:.3f}/{fp:.3f}"
+        print(line)
+
+    if checked == 0:
+        print("No images checked.")
+        return 1
+
+    if model is not None:
+        agreement = agree / checked
+        max_prob_diff = max(prob_diffs)
+        print(f"\nTop-1 agreement: {agreement:.3f}, max confidence drift: {max_prob_diff:.3f}")
+        if agreement < args.min_agreement or max_prob_diff > args.prob_tolerance:
+            failures += 1
+
+    if failures:
+        print(f"\nParity check FAILED ({failures} failure(s) over {checked} images)")
+    else:
+        print(f"\nAll {checked} images within tolerance")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
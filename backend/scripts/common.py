@@ -0,0 +1,72 @@
+# backend/scripts/common.py
+"""Helpers shared by the conversion / benchmark scripts (run from backend/)."""
+import json
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+APP_DIR = Path(__file__).resolve().parent.parent.joinpath("app")
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".bmp"}
+NUM_CLASSES = 120
+
+
+def normalize_label(name: str) -> str:
+    return name.replace("-", " ").replace("_", " ").strip().lower()
+
+
+def breed_label_map() -> Dict[str, int]:
+    """Map normalized breed name -> class id, from breed_info_final.json."""
+    with open(APP_DIR.joinpath("breed_info_final.json"), "r", encoding="utf-8") as f:
+        breeds = json.load(f).get("breeds", [])
+    return {normalize_label(item["name"]): int(item["id"]) for item in breeds}
+
+
+def iter_images(image_dir: str, limit: Optional[int] = None) -> Iterator[Tuple[Path, Optional[int]]]:
+    """
+    Yield (path, label_id) for images under image_dir. Images inside a
+    sub-directory named after a breed (e.g. `golden_retriever/`) are labelled
+    with that breed's id; anything else gets None.
+    """
+    labels = breed_label_map()
+    root = Path(image_dir)
+    count = 0
+    for path in sorted(root.rglob("*")):
+        if path.suffix.lower() not in IMAGE_EXTENSIONS:
+            continue
+        label = labels.get(normalize_label(path.parent.name)) if path.parent != root else None
+        yield path, label
+        count += 1
+        if limit is not None and count >= limit:
+            return
+
+
+def latency_summary(samples_s: List[float]) -> dict:
+    """p50/p95/p99/mean in milliseconds plus throughput (items/s)."""
+    if not samples_s:
+        return {"n": 0}
+    ms = np.asarray(samples_s) * 1000.0
+    return {
+        "n": int(ms.size),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "throughput_per_s": round(float(ms.size / (ms.sum() / 1000.0)), 3) if ms.sum() > 0 else None,
+    }
+
+
+def build_stand_in_model(path: str):
+    """Small CNN with the real model's (320, 320, 3) -> 120-way softmax signature (seeded, so runs repeat)."""
+    import tensorflow as tf
+
+    tf.keras.utils.set_random_seed(0)
+    inputs = tf.keras.Input(shape=(320, 320, 3))
+    x = tf.keras.layers.Rescaling(1.0 / 255)(inputs)
+    x = tf.keras.layers.Conv2D(16, 3, strides=4, activation="relu")(x)
+    x = tf.keras.layers.Conv2D(32, 3, strides=2, activation="relu")(x)
+    x = tf.keras.layers.GlobalAveragePooling2D()(x)
+    outputs = tf.keras.layers.Dense(NUM_CLASSES, activation="softmax")(x)
+    model = tf.keras.Model(inputs, outputs)
+    model.save(path)
+    return path
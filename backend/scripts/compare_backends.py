@@ -0,0 +1,131 @@
+# backend/scripts/compare_backends.py
+"""
+Accuracy / latency comparison between inference backends.
+
+    # from backend/
+    python -m scripts.compare_backends --images ./eval_images --json report.json
+
+Every image is classified by each backend. The first backend (default `keras`)
+is the reference: the report shows top-1 agreement with it, top-1 accuracy
+when images sit in breed-named sub-directories, single-image and batched
+latency, and model file size. The converted models default to the files
+next to --model-path (see tflite_path_for); point at others with
+--tflite-path / --tflite-int8-path.
+"""
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+from dotenv import load_dotenv
+
+from app.inference_backends import BACKENDS, load_backend, tflite_path_for
+from app.preprocessing import predict_top, predict_top_batch, preprocess_image_bytes
+from scripts.common import APP_DIR, iter_images, latency_summary
+
+
+def _backend_paths(args) -> dict:
+    """File each backend loads; the two TFLite variants never share one."""
+    return {
+        "keras": args.model_path,
+        "keras_xla": args.model_path,
+        "tflite": args.tflite_path or tflite_path_for(args.model_path),
+        "tflite_int8": args.tflite_int8_path or tflite_path_for(args.model_path, int8=True),
+    }
+
+
+def _model_size_mb(path: str):
+    return round(Path(path).stat().st_size / (1024 * 1024), 2)
+
+
+def evaluate(model, arrays, batch_size: int, warmup: int = 3):
+    for arr in arrays[:warmup]:
+        predict_top(model, arr)
+
+    preds, single = [], []
+    for arr in arrays:
+        start = time.perf_counter()
+        preds.append(predict_top(model, arr))
+        single.append(time.perf_counter() - start)
+
+    batched = []
+    for i in range(0, len(arrays), batch_size):
+        batch = np.concatenate(arrays[i:i + batch_size], axis=0)
+        start = time.perf_counter()
+        predict_top_batch(model, batch)
+        # per-image latency inside a batch
+        batched.extend([(time.perf_counter() - start) / batch.shape[0]] * batch.shape[0])
+    return preds, latency_summary(single), latency_summary(batched)
+
+
+def main(argv=None):
+    load_dotenv(dotenv_path=APP_DIR.parent.joinpath(".env"))
+    default_model = os.getenv("MODEL_PATH", str(APP_DIR.joinpath("model/efficientnetv2b2_320.keras")))
+
+    parser = argparse.ArgumentParser(description="Compare inference backends for accuracy and latency.")
+    parser.add_argument("--images", required=True, help="Image directory (breed-named sub-dirs for accuracy)")
+    parser.add_argument("--model-path", default=default_model)
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--tflite-path", help="Float TFLite model (default: <model stem>.tflite)")
+    parser.add_argument("--tflite-int8-path", help="Int8 TFLite model (default: <model stem>_int8.tflite)")
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--json", help="Also write the report as JSON to this path")
+    args = parser.parse_args(argv)
+    paths = _backend_paths(args)
+    if paths["tflite"] == paths["tflite_int8"]:
+        raise SystemExit("--tflite-path and --tflite-int8-path point at the same file")
+
+    arrays, labels = [], []
+    for path, label in iter_images(args.images, limit=args.limit):
+        try:
+            arrays.append(preprocess_image_bytes(path.read_bytes()))
+            labels.append(label)
+        except Exception as e:
+            print(f"[compare] skipping {path}: {e}")
+    if not arrays:
+        raise SystemExit(f"No usable images under {args.images}")
+
+    report = {"images": len(arrays), "labelled": sum(l is not None for l in labels), "backends": {}}
+    reference = None
+    for backend in [b.strip() for b in args.backends.split(",") if b.strip()]:
+        try:
+            tflite_path = paths.get(backend) if backend.startswith("tflite") else None
+            model = load_backend(args.model_path, backend, tflite_path)
+        except Exception as e:
+            print(f"[compare] {backend}: unavailable ({e})")
+            report["backends"][backend] = {"error": str(e)}
+            continue
+
+        preds, single, batched = evaluate(model, arrays, args.batch_size)
+        top_ids = [idx for idx, _ in preds]
+        entry = {"model_size_mb": _model_size_mb(paths.get(backend, args.model_path)), "single": single, "batched": batched}
+        if reference is None:
+            reference = top_ids
+            entry["reference"] = True
+        else:
+            entry["agreement"] = round(float(np.mean([a == b for a, b in zip(top_ids, reference)])), 4)
+        scored = [(idx, label) for idx, label in zip(top_ids, labels) if label is not None]
+        if scored:
+            entry["accuracy"] = round(float(np.mean([idx == label for idx, label in scored])), 4)
+        report["backends"][backend] = entry
+
+    print(f"\n{'backend':<12} {'size MB':>8} {'p50 ms':>8} {'p95 ms':>8} {'batch p50':>10} {'agree':>7} {'acc':>7}")
+    for backend, entry in report["backends"].items():
+        if "error" in entry:
+            print(f"{backend:<12} unavailable")
+            continue
+        agree = "ref" if entry.get("reference") else f"{entry['agreement']:.3f}"
+        acc = f"{entry['accuracy']:.3f}" if "accuracy" in entry else "-"
+        print(f"{backend:<12} {entry['model_size_mb']:>8} {entry['single']['p50_ms']:>8} "
+              f"{entry['single']['p95_ms']:>8} {entry['batched']['p50_ms']:>10} {agree:>7} {acc:>7}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+        print(f"\n[compare] wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
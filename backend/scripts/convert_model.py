@@ -0,0 +1,86 @@
+# backend/scripts/convert_model.py
+"""
+Convert the .keras classifier to TFLite for the `tflite` / `tflite_int8`
+inference backends.
+
+    # from backend/
+    python -m scripts.convert_model --calibration-dir ./calib_images
+
+Writes <model>.tflite (float) and <model>_int8.tflite next to MODEL_PATH.
+Full-integer int8 quantization needs a few hundred representative images
+(--calibration-dir); without them only weights are quantized (dynamic range).
+"""
+import argparse
+import os
+from pathlib import Path
+
+import tensorflow as tf
+from dotenv import load_dotenv
+
+from app.inference_backends import tflite_path_for
+from app.preprocessing import preprocess_image_bytes
+from scripts.common import APP_DIR, iter_images
+
+
+def _representative_dataset(calibration_dir: str, limit: int):
+    def gen():
+        for path, _ in iter_images(calibration_dir, limit=limit):
+            try:
+                arr = preprocess_image_bytes(path.read_bytes())
+            except Exception as e:
+                print(f"[convert] skipping {path}: {e}")
+                continue
+            yield [arr.astype("float32")]
+    return gen
+
+
+def convert(model_path: str, out_path: str, int8: bool, calibration_dir: str = None,
+            calibration_limit: int = 300, int8_io: bool = False):
+    model = tf.keras.models.load_model(model_path)
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+
+    if int8:
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        if calibration_dir:
+            converter.representative_dataset = _representative_dataset(calibration_dir, calibration_limit)
+            converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+            if int8_io:
+                converter.inference_input_type = tf.int8
+                converter.inference_output_type = tf.int8
+        else:
+            print("[convert] no --calibration-dir: falling back to dynamic-range (weight-only) quantization")
+
+    tflite_model = converter.convert()
+    Path(out_path).write_bytes(tflite_model)
+    size_mb = len(tflite_model) / (1024 * 1024)
+    print(f"[convert] wrote {out_path} ({size_mb:.1f} MB)")
+
+
+def main(argv=None):
+    load_dotenv(dotenv_path=APP_DIR.parent.joinpath(".env"))
+    default_model = os.getenv("MODEL_PATH", str(APP_DIR.joinpath("model/efficientnetv2b2_320.keras")))
+
+    parser = argparse.ArgumentParser(description="Convert the Keras model to float and int8 TFLite.")
+    parser.add_argument("--model-path", default=default_model)
+    parser.add_argument("--calibration-dir", help="Directory of representative images for int8 calibration")
+    parser.add_argument("--calibration-limit", type=int, default=300)
+    parser.add_argument("--int8-io", action="store_true", help="Also quantize model input/output tensors")
+    parser.add_argument("--skip-float", action="store_true")
+    parser.add_argument("--skip-int8", action="store_true")
+    args = parser.parse_args(argv)
+
+    if not args.skip_float:
+        convert(args.model_path, tflite_path_for(args.model_path), int8=False)
+    if not args.skip_int8:
+        convert(
+            args.model_path,
+            tflite_path_for(args.model_path, int8=True),
+            int8=True,
+            calibration_dir=args.calibration_dir,
+            calibration_limit=args.calibration_limit,
+            int8_io=args.int8_io,
+        )
+
+
+if __name__ == "__main__":
+    main()
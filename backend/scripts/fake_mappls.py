@@ -0,0 +1,145 @@
+# backend/scripts/fake_mappls.py
+"""
+Local stand-in for the Mappls OAuth + Nearby APIs.
+
+    # from backend/
+    python -m scripts.fake_mappls --port 8765 [--tls] [--quota 100]
+
+Then point the backend at it:
+    MAPPLS_OAUTH_URL=http://127.0.0.1:8765 MAPPLS_ATLAS_URL=http://127.0.0.1:8765
+    MAPPLS_CLIENT_ID=fake MAPPLS_CLIENT_SECRET=fake
+
+Nearby results are deterministic for a given location/keyword/page. With
+--quota, each client_id gets that many Nearby calls before answering 429.
+"""
+import argparse
+import asyncio
+import hashlib
+import math
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import uvicorn
+from fastapi import FastAPI, Form, Header, Query
+from fastapi.responses import JSONResponse, Response
+
+
+def create_app(latency_ms: float = 0.0, per_page: int = 10, max_pages: int = 3, quota: int = 0) -> FastAPI:
+    app = FastAPI(title="Fake Mappls")
+    app.state.calls = {}
+
+    @app.post("/api/security/oauth/token")
+    async def token(client_id: str = Form(...), client_secret: str = Form(...), grant_type: str = Form(...)):
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        return {"access_token": f"fake-{client_id}", "expires_in": 3600, "token_type": "bearer"}
+
+    @app.get("/api/places/nearby/json")
+    async def nearby(
+        keywords: str = Query(...),
+        refLocation: str = Query(...),
+        radius: int = Query(10000),
+        page: int = Query(1),
+        authorization: str = Header(""),
+    ):
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        if not authorization.startswith("Bearer fake-"):
+            return JSONResponse({"error": "unauthorized"}, status_code=401)
+        client = authorization[len("Bearer fake-"):]
+        app.state.calls[client] = app.state.calls.get(client, 0) + 1
+        if quota and app.state.calls[client] > quota:
+            return JSONResponse({"error": "daily limit exceeded"}, status_code=429)
+        if page > max_pages:
+            return Response(status_code=204)
+
+        lat, lon = (float(v) for v in refLocation.split(","))
+        places = []
+        for i in range(per_page):
+            n = (page - 1) * per_page + i
+            seed = hashlib.sha1(f"{keywords}|{round(lat, 2)}|{round(lon, 2)}|{n}".encode()).digest()
+            bearing = seed[0] / 255 * 2 * math.pi
+            dist = 200 + n * 400 + seed[1] * 2  # metres, increasing with n
+            dlat = dist * math.cos(bearing) / 111_320
+            dlon = dist * math.sin(bearing) / (111_320 * max(math.cos(math.radians(lat)), 1e-6))
+            places.append({
+                "eLoc": seed.hex()[:6].upper(),
+                "placeName": f"{keywords.title()} #{n + 1}",
+                "placeAddress": f"{n + 1} Fake Street",
+                "latitude": lat + dlat,
+                "longitude": lon + dlon,
+                "distance": dist,
+                "type": "POI",
+            })
+        return {"suggestedLocations": places, "pageInfo": {"pageCount": max_pages, "page": page}}
+
+    return app
+
+
+def self_signed_cert(directory: str):
+    """Write a throwaway localhost cert/key pair (needs `cryptography`)."""
+    import datetime
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from cryptography.x509.oid import NameOID
+    import ipaddress
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name).issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now).not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([
+            x509.DNSName("localhost"), x509.IPAddress(ipaddress.ip_address("127.0.0.1")),
+        ]), critical=False)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path, key_path = Path(directory, "cert.pem"), Path(directory, "key.pem")
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.TraditionalOpenSSL, serialization.NoEncryption()
+    ))
+    return str(cert_path), str(key_path)
+
+
+def run_in_thread(port: int, tls: bool = False, **app_options):
+    """Start the fake server in a daemon thread; returns (server, base_url)."""
+    ssl_options = {}
+    if tls:
+        cert, key = self_signed_cert(tempfile.mkdtemp())
+        ssl_options = {"ssl_certfile": cert, "ssl_keyfile": key}
+    config = uvicorn.Config(create_app(**app_options), host="127.0.0.1", port=port, log_level="warning", **ssl_options)
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, f"{'https' if tls else 'http'}://127.0.0.1:{port}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a fake Mappls OAuth/Nearby server.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--tls", action="store_true", help="Serve HTTPS with a self-signed certificate")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--per-page", type=int, default=10)
+    parser.add_argument("--max-pages", type=int, default=3)
+    parser.add_argument("--quota", type=int, default=0, help="Nearby calls per client_id before 429 (0 = unlimited)")
+    args = parser.parse_args(argv)
+
+    ssl_options = {}
+    if args.tls:
+        cert, key = self_signed_cert(tempfile.mkdtemp())
+        ssl_options = {"ssl_certfile": cert, "ssl_keyfile": key}
+    app = create_app(args.latency_ms, args.per_page, args.max_pages, args.quota)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, **ssl_options)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 import { useState } from 'react';
 import { useTranslation } from 'react-i18next';
 
-export default function PetDetailsModal({ isOpen, onClose, pet, onAddNote, onDeleteNote }) {
+export default function PetDetailsModal({ isOpen, onClose, pet, onAddNote, onDeleteNote, onLoadMoreNotes }) {
   const { t } = useTranslation();
   const [newNote, setNewNote] = useState('');
   const [selectedCategory, setSelectedCategory] = useState('other');
@@ -83,11 +83,20 @@ export default function PetDetailsModal({ isOpen, onClose, pet, onAddNote, onDel
         >
           {/* Header */}
           <div className="flex items-start gap-6 mb-6 pb-6 border-b" style={{ borderColor: 'var(--color-auth-divider)' }}>
-            <img 
-              src={pet.image || pet.image_url} 
-              alt={pet.name}
-              className="w-32 h-32 object-cover rounded-lg"
-            />
+            {pet.image || pet.image_url ? (
+              <img 
+                src={pet.image || pet.image_url} 
+                alt={pet.name}
+                className="w-32 h-32 object-cover rounded-lg"
+              />
+            ) : (
+              <div
+                className="w-32 h-32 rounded-lg flex items-center justify-center text-center text-sm p-2"
+                style={{ backgroundColor: 'var(--color-auth-divider)', color: 'var(--color-auth-subtitle)' }}
+              >
+                {pet.imageStatus === 'failed' ? t('dashboard.pets.imageFailed') : t('dashboard.pets.imagePending')}
+              </div>
+            )}
             <div className="flex-1">
               <h2 
                 className="text-3xl mb-2"
@@ -322,6 +331,15 @@ export default function PetDetailsModal({ isOpen, onClose, pet, onAddNote, onDel
                   </p>
                 </div>
               )}
+              {pet.notesCursor && (
+                <button
+                  onClick={onLoadMoreNotes}
+                  className="w-full py-2 rounded-lg text-sm font-medium"
+                  style={{ color: 'var(--color-auth-subtitle)', border: '1px solid var(--color-auth-card-border)' }}
+                >
+                  {t('dashboard.pets.petDetails.loadMoreNotes')}
+                </button>
+              )}
             </div>
           </div>
         </div>
@@ -130,42 +130,13 @@ const Settings = ({ onBack }) => {
           try {
             const token = await getToken();
             
-            const petsRes = await fetch(`${API_URL}/api/pets`, {
-              headers: { Authorization: `Bearer ${token}` }
-            });
-            
-            if (petsRes.ok) {
-              const pets = await petsRes.json();
-              await Promise.all(
-                pets.map(pet => 
-                  fetch(`${API_URL}/api/pets/${pet._id || pet.id}`, {
-                    method: 'DELETE',
-                    headers: { Authorization: `Bearer ${token}` }
-                  })
-                )
-              );
-            }
-            
-            const historyRes = await fetch(`${API_URL}/api/history`, {
-              headers: { Authorization: `Bearer ${token}` }
-            });
-            
-            if (historyRes.ok) {
-              const history = await historyRes.json();
-              await Promise.all(
-                history.map(item => 
-                  fetch(`${API_URL}/api/history/${item._id || item.id}`, {
-                    method: 'DELETE',
-                    headers: { Authorization: `Bearer ${token}` }
-                  })
-                )
-              );
-            }
-            
-            await fetch(`${API_URL}/api/settings`, {
+            // One request wipes pets, images, history, settings and feedback server-side;
+            // large accounts are finished by a background job (202).
+            const res = await fetch(`${API_URL}/api/account/data`, {
               method: 'DELETE',
               headers: { Authorization: `Bearer ${token}` }
             });
+            if (!res.ok) throw new Error(`Wipe failed: ${res.status}`);
             
           } catch (error) {
             console.error('Failed to clear backend data:', error);
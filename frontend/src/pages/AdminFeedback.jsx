@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { useAuth, useUser } from '@clerk/clerk-react';
 import { useTranslation } from 'react-i18next';
 import LoadingSpinner from "../components/LoadingSpinner";
+import { fetchPage } from '../utils/pagination';
 
 
 const API_URL = import.meta.env.VITE_API_URL || "http://localhost:8000";
@@ -13,6 +14,8 @@ export default function AdminFeedback() {
   const [feedbacks, setFeedbacks] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   // Check if user is admin
   const isAdmin = user?.publicMetadata?.role === 'admin';
@@ -26,20 +29,11 @@ export default function AdminFeedback() {
     const fetchFeedbacks = async () => {
       try {
         const token = await getToken();
-        const response = await fetch(`${API_URL}/api/admin/feedbacks`, {
-          headers: {
-            'Authorization': `Bearer ${token}`
-          }
-        });
-
-        if (response.ok) {
-          const data = await response.json();
-          setFeedbacks(data);
-        } else {
-          setError(t('admin.feedback.fetchError'));
-        }
+        const data = await fetchPage(`${API_URL}/api/admin/feedbacks`, token);
+        setFeedbacks(data.items || []);
+        setNextCursor(data.next_cursor);
       } catch (err) {
-        setError(t('admin.feedback.networkError'));
+        setError(t('admin.feedback.fetchError'));
       } finally {
         setLoading(false);
       }
@@ -48,6 +42,20 @@ export default function AdminFeedback() {
     fetchFeedbacks();
   }, [user, isAdmin, getToken, t]);
 
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const token = await getToken();
+      const data = await fetchPage(`${API_URL}/api/admin/feedbacks`, token, { cursor: nextCursor });
+      setFeedbacks((prev) => [...prev, ...(data.items || [])]);
+      setNextCursor(data.next_cursor);
+    } catch (err) {
+      setError(t('admin.feedback.fetchError'));
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   if (!isAdmin) {
     return (
       <div className="min-h-screen py-8 px-4 flex items-center justify-center" style={{ backgroundColor: 'var(--color-admin-page-bg)' }}>
@@ -151,6 +159,18 @@ export default function AdminFeedback() {
               {t('admin.feedback.noFeedbacks')}
             </div>
           )}
+          {nextCursor && (
+            <div className="text-center py-4">
+              <button
+                onClick={loadMore}
+                disabled={loadingMore}
+                className="px-6 py-2 rounded-lg text-sm font-medium"
+                style={{ backgroundColor: 'var(--color-admin-table-header-bg)', color: 'var(--color-admin-table-header-text)' }}
+              >
+                {loadingMore ? t('common.loading') : t('admin.feedback.loadMore')}
+              </button>
+            </div>
+          )}
         </div>
       </div>
     </div>
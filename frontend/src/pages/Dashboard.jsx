@@ -5,9 +5,29 @@ import { useTranslation } from 'react-i18next';
 import { motion, AnimatePresence } from 'framer-motion';
 import AddPetModal from '../components/AddPetModal';
 import PetDetailsModal from '../components/PetDetailsModal';
+import { fetchPage } from '../utils/pagination';
 
 const API_URL = import.meta.env.VITE_API_URL || "http://localhost:8000";
 
+const LoadMoreButton = ({ onClick, loading, label, loadingLabel }) => (
+  <div className="text-center mt-8">
+    <motion.button
+      onClick={onClick}
+      disabled={loading}
+      className="px-8 py-3 rounded-xl font-archivo font-semibold"
+      style={{
+        backgroundColor: 'transparent',
+        color: '#8c52ff',
+        border: '2px solid #8c52ff'
+      }}
+      whileHover={{ scale: 1.05 }}
+      whileTap={{ scale: 0.95 }}
+    >
+      {loading ? loadingLabel : label}
+    </motion.button>
+  </div>
+);
+
 // Toast Component
 const Toast = ({ message, type = 'success', onClose }) => {
   useEffect(() => {
@@ -52,6 +72,9 @@ export default function Dashboard() {
   const [selectedPet, setSelectedPet] = useState(null);
   const [pets, setPets] = useState([]);
   const [history, setHistory] = useState([]);
+  // next_cursor of the last page loaded for each list; null once it is complete
+  const [cursors, setCursors] = useState({ pets: null, history: null });
+  const [loadingMore, setLoadingMore] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
   const [toast, setToast] = useState(null);
@@ -84,15 +107,14 @@ export default function Dashboard() {
       setLoading(true);
       try {
         const token = await getToken();
-        const [petsRes, historyRes] = await Promise.all([
-          fetch(`${API_URL}/api/pets`, { headers: { Authorization: `Bearer ${token}` } }),
-          fetch(`${API_URL}/api/history`, { headers: { Authorization: `Bearer ${token}` } }),
+        // First page only; the rest is fetched on demand (see loadMore).
+        const [petsPage, historyPage] = await Promise.all([
+          fetchPage(`${API_URL}/api/pets`, token),
+          fetchPage(`${API_URL}/api/history`, token),
         ]);
-        if (!petsRes.ok || !historyRes.ok) throw new Error("Failed to fetch data");
-        const petsData = await petsRes.json();
-        const historyData = await historyRes.json();
-        setPets(petsData);
-        setHistory(historyData);
+        setPets(petsPage.items || []);
+        setHistory(historyPage.items || []);
+        setCursors({ pets: petsPage.next_cursor, history: historyPage.next_cursor });
         setError('');
       } catch (e) {
         console.error('Failed to load data:', e);
@@ -103,6 +125,26 @@ export default function Dashboard() {
     fetchData();
   }, [getToken]);
 
+  const loadMore = async (list) => {
+    setLoadingMore(list);
+    try {
+      const token = await getToken();
+      const page = await fetchPage(`${API_URL}/api/${list}`, token, { cursor: cursors[list] });
+      const setItems = list === 'pets' ? setPets : setHistory;
+      // Skip anything already shown, e.g. a pet added since the first page loaded.
+      setItems((prev) => {
+        const shown = new Set(prev.map(getItemId));
+        return [...prev, ...(page.items || []).filter((item) => !shown.has(getItemId(item)))];
+      });
+      setCursors((prev) => ({ ...prev, [list]: page.next_cursor }));
+    } catch (e) {
+      console.error(`Failed to load more ${list}:`, e);
+      setToast({ message: 'Failed to load more. Please try again.', type: 'error' });
+    } finally {
+      setLoadingMore(null);
+    }
+  };
+
   const handleSavePet = async (petData) => {
     try {
       const token = await getToken();
@@ -121,6 +163,10 @@ export default function Dashboard() {
       if (!res.ok) throw new Error('Failed to add pet');
       
       const newPet = await res.json();
+      // The upload to image storage finishes in the background; show the local file meanwhile.
+      if (!newPet.image && petData.image instanceof Blob) {
+        newPet.image = URL.createObjectURL(petData.image);
+      }
       setPets((prev) => [...prev, newPet]);
       setIsAddPetModalOpen(false);
       setError('');
@@ -132,9 +178,26 @@ export default function Dashboard() {
     }
   };
 
-  const handleViewPetDetails = (pet) => {
+  const handleViewPetDetails = async (pet) => {
     setSelectedPet(pet);
     setIsPetDetailsModalOpen(true);
+    // Listings only carry the latest few notes; load a full page for the details view.
+    if ((pet.notesCount ?? 0) <= (pet.notes ?? []).length) return;
+    await loadNotes(pet, null);
+  };
+
+  const loadNotes = async (pet, cursor) => {
+    try {
+      const token = await getToken();
+      const page = await fetchPage(`${API_URL}/api/pets/${getItemId(pet)}/notes`, token, { cursor });
+      setSelectedPet(prev => (prev && getItemId(prev) === getItemId(pet)) ? {
+        ...prev,
+        notes: cursor ? [...prev.notes, ...(page.items || [])] : (page.items || []),
+        notesCursor: page.next_cursor,
+      } : prev);
+    } catch (e) {
+      console.error('Failed to load notes:', e);
+    }
   };
 
   const handleDeletePet = async (petId) => {
@@ -172,10 +235,14 @@ export default function Dashboard() {
       });
       if (!res.ok) throw new Error('Failed to add note');
       const note = await res.json();
-      setPets(pets.map(pet => (getItemId(pet) === petId) ? { ...pet, notes: [...(pet.notes ?? []), note] } : pet));
+      // Notes are listed newest first
+      setPets(pets.map(pet => (getItemId(pet) === petId)
+        ? { ...pet, notes: [note, ...(pet.notes ?? [])], notesCount: (pet.notesCount ?? 0) + 1 }
+        : pet
+      ));
       setSelectedPet(prev =>
         prev && (getItemId(prev) === petId)
-          ? { ...prev, notes: [...(prev.notes ?? []), note] }
+          ? { ...prev, notes: [note, ...(prev.notes ?? [])], notesCount: (prev.notesCount ?? 0) + 1 }
           : prev
       );
       setError('');
@@ -196,12 +263,12 @@ export default function Dashboard() {
       });
       if (!res.ok) throw new Error('Failed to delete note');
       setPets(pets.map(pet => (getItemId(pet) === petId)
-        ? { ...pet, notes: (pet.notes ?? []).filter(note => note.id !== noteId) }
+        ? { ...pet, notes: (pet.notes ?? []).filter(note => note.id !== noteId), notesCount: Math.max((pet.notesCount ?? 1) - 1, 0) }
         : pet
       ));
       setSelectedPet(prev =>
         prev && (getItemId(prev) === petId)
-          ? { ...prev, notes: (prev.notes ?? []).filter(note => note.id !== noteId) }
+          ? { ...prev, notes: (prev.notes ?? []).filter(note => note.id !== noteId), notesCount: Math.max((prev.notesCount ?? 1) - 1, 0) }
           : prev
       );
       setError('');
@@ -354,7 +421,7 @@ export default function Dashboard() {
           whileHover={{ scale: 1.05, borderColor: 'rgba(140, 82, 255, 0.4)' }}
         >
           <div className="text-2xl font-alfa mb-1" style={{ color: '#8c52ff' }}>
-            {pets.length}
+            {pets.length}{cursors.pets ? '+' : ''}
           </div>
           <div className="text-sm font-archivo font-semibold" style={{ color: 'var(--color-text-secondary)' }}>
             {pets.length === 1 ? t('dashboard.profile.pet') : t('dashboard.profile.pets')}
@@ -369,7 +436,7 @@ export default function Dashboard() {
           whileHover={{ scale: 1.05, borderColor: 'rgba(140, 82, 255, 0.4)' }}
         >
           <div className="text-2xl font-alfa mb-1" style={{ color: '#8c52ff' }}>
-            {history.length}
+            {history.length}{cursors.history ? '+' : ''}
           </div>
           <div className="text-sm font-archivo font-semibold" style={{ color: 'var(--color-text-secondary)' }}>
             {t('dashboard.profile.searches')}
@@ -471,15 +538,25 @@ export default function Dashboard() {
                         }}
                         initial={{ opacity: 0, scale: 0.9 }}
                         animate={{ opacity: 1, scale: 1 }}
-                        transition={{ delay: index * 0.1 }}
+                        transition={{ delay: Math.min(index, 5) * 0.1 }}
                         whileHover={{ y: -8, boxShadow: '0 20px 40px rgba(140, 82, 255, 0.25)' }}
                       >
                         <div className="relative h-56 overflow-hidden">
-                          <img
-                            src={pet.image ?? pet.image_url}
-                            alt={pet.name}
-                            className="w-full h-full object-cover transition-transform duration-300 hover:scale-110"
-                          />
+                          {pet.image ?? pet.image_url ? (
+                            <img
+                              src={pet.image ?? pet.image_url}
+                              alt={pet.name}
+                              className="w-full h-full object-cover transition-transform duration-300 hover:scale-110"
+                            />
+                          ) : (
+                            // The photo is still uploading in the background (or the upload failed).
+                            <div
+                              className="w-full h-full flex items-center justify-center font-archivo"
+                              style={{ backgroundColor: 'var(--color-card-border)', color: 'var(--color-text-secondary)' }}
+                            >
+                              {pet.imageStatus === 'failed' ? t('dashboard.pets.imageFailed') : t('dashboard.pets.imagePending')}
+                            </div>
+                          )}
                           <div className="absolute bottom-0 left-0 right-0 p-4" style={{ background: 'linear-gradient(to top, rgba(0,0,0,0.7), transparent)' }}>
                             <h3 className="text-2xl font-alfa text-white">{pet.name}</h3>
                           </div>
@@ -524,6 +601,14 @@ export default function Dashboard() {
                       </motion.div>
                     ))}
                   </div>
+                  {cursors.pets && (
+                    <LoadMoreButton
+                      onClick={() => loadMore('pets')}
+                      loading={loadingMore === 'pets'}
+                      label={t('dashboard.loadMore')}
+                      loadingLabel={t('common.loading')}
+                    />
+                  )}
                 </>
               ) : (
                 <div className="space-y-6">
@@ -642,7 +727,7 @@ export default function Dashboard() {
                       }}
                       initial={{ opacity: 0, x: -20 }}
                       animate={{ opacity: 1, x: 0 }}
-                      transition={{ delay: index * 0.1 }}
+                      transition={{ delay: Math.min(index, 5) * 0.1 }}
                       whileHover={{ scale: 1.02, boxShadow: '0 12px 30px rgba(140, 82, 255, 0.2)' }}
                     >
                       <div className="flex items-center gap-6">
@@ -685,6 +770,14 @@ export default function Dashboard() {
                       </div>
                     </motion.div>
                   ))}
+                  {cursors.history && (
+                    <LoadMoreButton
+                      onClick={() => loadMore('history')}
+                      loading={loadingMore === 'history'}
+                      label={t('dashboard.loadMore')}
+                      loadingLabel={t('common.loading')}
+                    />
+                  )}
                 </div>
               ) : (
                 <motion.div
@@ -734,6 +827,7 @@ export default function Dashboard() {
         pet={selectedPet}
         onAddNote={handleAddNote}
         onDeleteNote={handleDeleteNote}
+        onLoadMoreNotes={() => loadNotes(selectedPet, selectedPet.notesCursor)}
       />
 
       <AnimatePresence>
@@ -0,0 +1,18 @@
+// src/utils/pagination.js
+
+/**
+ * Fetch one page of a cursor-paginated list endpoint.
+ * @param {string} url - Endpoint URL (may already have query params)
+ * @param {string} token - Clerk session token
+ * @param {object} options - { cursor, limit }
+ * @returns {Promise<{items: Array, next_cursor: string|null}>}
+ */
+export const fetchPage = async (url, token, { cursor = null, limit = null } = {}) => {
+  const pageUrl = new URL(url);
+  if (cursor) pageUrl.searchParams.set('cursor', cursor);
+  if (limit) pageUrl.searchParams.set('limit', limit);
+
+  const res = await fetch(pageUrl, { headers: { Authorization: `Bearer ${token}` } });
+  if (!res.ok) throw new Error(`Request failed: ${res.status}`);
+  return res.json();
+};